@@ -0,0 +1,193 @@
+"""
+LLM 과부하 상황에서 CRUD 요청 지연을 측정합니다.
+
+임시 디렉터리에서 서버 프로세스를 띄우고, 여러 클라이언트가 /interact와 /interact/stream을 계속 요청하는 동안
+GET /notes/<type>/<id>의 p50/p99 지연을 허용 제어(admission) 적용 전후로 비교합니다.
+스텁 모델은 대기 시간 동안 CPU를 사용해 실제 모델의 CPU 점유를 흉내냅니다.
+
+    python -m benchmark.bench_admission
+    python -m benchmark.bench_admission --clients 32 --duration 10 --target-ms 100
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+from werkzeug.serving import make_server
+
+from benchmark.common import percentile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def serve(workdir: str, admission: dict, stub: dict, ports):
+    """
+    서버 프로세스: workdir에 설정을 복사하고 그 안에서 server.main을 불러와 실행합니다.
+    부하 생성 스레드와 GIL을 나누지 않도록 별도 프로세스에서 실행합니다.
+    """
+    shutil.copytree(
+        os.path.join(PROJECT_ROOT, "config"), os.path.join(workdir, "config")
+    )
+    config_path = os.path.join(workdir, "config", "server_config.json")
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    # LLM 부하만 측정하도록 빠른 경로와 미리 요약 작업은 끔
+    config["llm"]["router"] = {"enabled": False}
+    config["llm"]["worker"] = {"enabled": False}
+    config["jobs"]["eager_actions"] = {}
+    config["admission"] = admission
+    with open(config_path, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+
+    os.chdir(workdir)
+    sys.path.insert(0, PROJECT_ROOT)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    import server.main as main
+    from server.llm_backend import StubModel
+
+    model = main.llm_handler.model
+    if isinstance(model, StubModel):
+        model.busy = True
+        model.token_delay = stub["token_ms"] / 1000
+        model.batch_delay = stub["batch_ms"] / 1000
+
+    server = make_server("127.0.0.1", 0, main.app, threaded=True)
+    ports.put(server.server_port)
+    server.serve_forever()
+
+
+def run_phase(base_url: str, note_ids, args) -> dict:
+    stop = threading.Event()
+    crud_latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def overload(client: int):
+        session = requests.Session()
+        headers = {"X-Client-Id": f"client-{client}"}
+        i = 0
+        while not stop.is_set():
+            note_id = note_ids[(client + i) % len(note_ids)]
+            endpoint = "/interact/stream" if i % 2 else "/interact"
+            payload = {"note_id": note_id, "type": "memo", "action": "summarize"}
+            response = session.post(
+                base_url + endpoint, json=payload, headers=headers, stream=True
+            )
+            response.content  # 스트림 끝까지 읽기
+            with lock:
+                statuses[response.status_code] = (
+                    statuses.get(response.status_code, 0) + 1
+                )
+            if response.status_code == 429:
+                # 실제 클라이언트처럼 Retry-After를 따르되 측정 시간 안에서 다시 시도
+                stop.wait(min(float(response.headers.get("Retry-After", 1)), 0.5))
+            i += 1
+
+    def crud():
+        session = requests.Session()
+        i = 0
+        while not stop.is_set():
+            note_id = note_ids[i % len(note_ids)]
+            start = time.perf_counter()
+            session.get(f"{base_url}/notes/memo/{note_id}")
+            crud_latencies.append(time.perf_counter() - start)
+            i += 1
+            time.sleep(args.crud_interval)
+
+    threads = [
+        threading.Thread(target=overload, args=(c,)) for c in range(args.clients)
+    ]
+    threads.append(threading.Thread(target=crud))
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "crud_p50_ms": percentile(crud_latencies, 50) * 1000,
+        "crud_p99_ms": percentile(crud_latencies, 99) * 1000,
+        "crud_requests": len(crud_latencies),
+        "llm_statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--clients", type=int, default=24, help="LLM 과부하 클라이언트 수"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=5.0, help="단계별 측정 시간(초)"
+    )
+    parser.add_argument("--crud-interval", type=float, default=0.01)
+    parser.add_argument(
+        "--target-ms", type=float, default=100.0, help="CRUD p99 목표(ms)"
+    )
+    parser.add_argument("--max-concurrent", type=int, default=2)
+    parser.add_argument("--per-client", type=int, default=1)
+    parser.add_argument(
+        "--token-ms", type=float, default=5.0, help="스텁 모델 토큰당 CPU 시간"
+    )
+    parser.add_argument(
+        "--batch-ms", type=float, default=50.0, help="스텁 모델 배치당 CPU 시간"
+    )
+    args = parser.parse_args()
+
+    phases = {
+        "no admission": {
+            "max_concurrent": 10**6,
+            "max_queue": {"interactive": 10**6, "background": 10**6},
+            "per_client": 10**6,
+        },
+        "admission": {
+            "max_concurrent": args.max_concurrent,
+            "per_client": args.per_client,
+        },
+    }
+    stub = {"token_ms": args.token_ms, "batch_ms": args.batch_ms}
+    for name, admission in phases.items():
+        workdir = tempfile.mkdtemp()
+        ports = multiprocessing.Queue()
+        process = multiprocessing.Process(
+            target=serve, args=(workdir, admission, stub, ports), daemon=True
+        )
+        process.start()
+        try:
+            base_url = f"http://127.0.0.1:{ports.get(timeout=60)}"
+            note_ids = [
+                requests.post(
+                    f"{base_url}/notes",
+                    json={
+                        "type": "memo",
+                        "name": f"메모 {i}",
+                        "content": f"회의 내용 {i} " * 20,
+                    },
+                ).json()["id"]
+                for i in range(20)
+            ]
+            result = run_phase(base_url, note_ids, args)
+        finally:
+            process.terminate()
+            process.join()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        verdict = "OK" if result["crud_p99_ms"] <= args.target_ms else "OVER TARGET"
+        print(
+            f"{name:<13} CRUD p50 {result['crud_p50_ms']:7.1f} ms  "
+            f"p99 {result['crud_p99_ms']:7.1f} ms ({verdict}, n={result['crud_requests']})  "
+            f"LLM responses {result['llm_statuses']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+노트 대량 가져오기/내보내기의 처리량을 측정합니다.
+
+임시 SQLite 데이터베이스에 메모/일정/할 일을 섞은 노트를 import_notes로 가져오고,
+export_notes로 다시 NDJSON으로 내보내며 걸린 시간, 초당 노트 수, 최대 메모리를 보고합니다.
+비교를 위해 노트 하나씩 create()로 넣는 기존 방식도 --baseline개만 재어 같은 수로 환산합니다.
+
+    python -m benchmark.bench_bulk
+    python -m benchmark.bench_bulk --notes 1000000 --batch-size 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmark.common import format_mb, peak_rss_mb
+from server.database import NoteRepository
+
+
+def make_notes(count: int, seed: int = 0):
+    """
+    export_notes() 형식의 노트를 count개 만듭니다. (ID는 1부터, 타입은 섞어서)
+    """
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    for note_id in range(1, count + 1):
+        created = (base + timedelta(minutes=note_id)).isoformat()
+        note = {
+            "id": note_id,
+            "type": rng.choice(("memo", "memo", "event", "task")),
+            "name": f"노트 {note_id}",
+            "content": f"내용 {note_id} " * rng.randint(1, 20),
+            "tags": rng.sample(["work", "home", "idea", "plan"], k=rng.randint(0, 2)),
+            "created": created,
+            "updated": created,
+            "version": 1,
+        }
+        if note["type"] == "event":
+            note["date"] = (base + timedelta(days=note_id % 365)).isoformat()
+        elif note["type"] == "task":
+            note["done"] = note_id % 3 == 0
+        yield note
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--baseline", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        baseline = NoteRepository(f"sqlite:///{os.path.join(workdir, 'baseline.db')}")
+        start = time.perf_counter()
+        for note in make_notes(args.baseline):
+            baseline.create(
+                {
+                    key: value
+                    for key, value in note.items()
+                    if key not in ("id", "created", "updated", "version")
+                }
+            )
+        per_note = (time.perf_counter() - start) / args.baseline
+        baseline.engine.dispose()
+
+        repository = NoteRepository(f"sqlite:///{os.path.join(workdir, 'notes.db')}")
+        start = time.perf_counter()
+        imported = repository.import_notes(
+            make_notes(args.notes), batch_size=args.batch_size
+        )
+        import_seconds = time.perf_counter() - start
+
+        path = os.path.join(workdir, "notes.ndjson")
+        start = time.perf_counter()
+        exported = 0
+        with open(path, "wb") as f:
+            for note in repository.export_notes(batch_size=args.batch_size):
+                f.write(json.dumps(note, ensure_ascii=False).encode() + b"\n")
+                exported += 1
+        export_seconds = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+
+    print(
+        f"create() one by one    {1 / per_note:10,.0f} notes/s  "
+        f"(~{per_note * args.notes:,.0f} s for {args.notes:,})"
+    )
+    print(
+        f"import_notes           {imported / import_seconds:10,.0f} notes/s  "
+        f"{import_seconds:8.1f} s for {imported:,}"
+    )
+    print(
+        f"export_notes (NDJSON)  {exported / export_seconds:10,.0f} notes/s  "
+        f"{export_seconds:8.1f} s for {exported:,} ({size_mb:.0f} MB)"
+    )
+    print(f"peak memory            {format_mb(peak_rss_mb())}")
+
+
+if __name__ == "__main__":
+    main()
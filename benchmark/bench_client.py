@@ -0,0 +1,127 @@
+"""
+클라이언트 Repository의 연결 재사용 효과를 측정합니다.
+
+keep-alive를 지원하는 로컬 대역 서버에 작은 요청(GET /notes/<id>, PUT /notes/<id>)을 수천 번 보내고,
+요청마다 새 연결을 여는 방식(requests.get 등 모듈 함수)과 Repository의 연결 풀 세션을 비교합니다.
+
+    python -m benchmark.bench_client
+    python -m benchmark.bench_client --calls 5000 --concurrency 4
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from benchmark.common import percentile
+
+# client 패키지가 Kivy를 불러오므로 Kivy가 명령행 인자를 가로채지 않게 함
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+from client.repository import Repository  # noqa: E402
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    노트 API처럼 작은 JSON을 돌려주는 대역 서버
+    """
+
+    protocol_version = "HTTP/1.1"
+    # 헤더와 본문을 따로 쓰므로 Nagle 지연(~40ms)이 keep-alive 연결 측정에 섞이지 않게 함
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        note_id = self.path.rsplit("/", 1)[-1]
+        body = json.dumps(
+            {"id": note_id, "type": "memo", "name": "메모", "content": "내용"}
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_PUT = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def run_calls(call, calls: int, concurrency: int) -> dict:
+    latencies = []
+    lock = threading.Lock()
+
+    def request(i: int):
+        start = time.perf_counter()
+        call(i)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(request, range(calls)))
+    wall = time.perf_counter() - start
+    return {
+        "calls_per_second": calls / wall,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--pool-size", type=int, default=10)
+    args = parser.parse_args()
+    # 요청마다 남기는 성공 로그가 측정에 섞이지 않게 함
+    logging.getLogger().setLevel(logging.WARNING)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    def per_call(i: int):
+        # 기존 방식: 요청마다 새 TCP 연결
+        if i % 2:
+            requests.put(f"{base_url}/notes/{i}", json={"content": "수정"})
+        else:
+            requests.get(f"{base_url}/notes/{i}")
+
+    repository = Repository(
+        "http", "127.0.0.1", server.server_port, pool_size=args.pool_size
+    )
+
+    def pooled(i: int):
+        if i % 2:
+            repository.update_note(i, content="수정")
+        else:
+            repository.get_note(i)
+
+    results = {
+        "per-call": run_calls(per_call, args.calls, args.concurrency),
+        "pooled": run_calls(pooled, args.calls, args.concurrency),
+    }
+    for name, result in results.items():
+        print(
+            f"{name:<9} {result['calls_per_second']:8.1f} calls/s  "
+            f"p50 {result['p50_ms']:6.2f} ms  p99 {result['p99_ms']:6.2f} ms"
+        )
+    for key, stats in repository.latency_stats().items():
+        print(f"  {key:<18} {stats}")
+
+    repository.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
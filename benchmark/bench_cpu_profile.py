@@ -0,0 +1,107 @@
+"""
+추론 프로필별 모델 로드 시간, 상주 메모리, 생성 속도(tokens/s)를 비교합니다.
+프로필마다 새 프로세스에서 측정하므로 서로의 메모리 사용량이 섞이지 않습니다.
+
+    python -m benchmark.bench_cpu_profile --backend transformers --model Qwen/Qwen2.5-0.5B-Instruct
+    python -m benchmark.bench_cpu_profile --profiles default cpu-int8 --runs 10
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from benchmark.common import current_rss_mb, format_mb, peak_rss_mb
+from server.llm_backend import INFERENCE_PROFILES, load_model
+
+PROMPTS = [
+    "내일 오전 10시 팀 회의. 분기 목표 점검과 신규 기능 일정 논의.",
+    "장보기: 우유, 계란, 사과, 세제. 주말 전에 다녀오기.",
+    "보고서 초안 작성 후 금요일까지 팀장님께 공유. 참고 자료는 공유 폴더에 있음.",
+]
+
+
+def run_profile(args) -> dict:
+    """
+    현재 프로세스에서 한 프로필을 측정합니다.
+    """
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    model = load_model(args.backend, args.model, profile=args.profile)
+    load_time = time.perf_counter() - start
+    rss_loaded = current_rss_mb()
+
+    system = "당신은 개인 노트 비서입니다. 사용자의 노트를 한두 문장으로 요약하세요."
+    tokens = 0
+    start = time.perf_counter()
+    for i in range(args.runs):
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": PROMPTS[i % len(PROMPTS)]},
+        ]
+        output = model.generate([messages], max_new_tokens=args.max_new_tokens)[0]
+        tokens += model.count_tokens(output)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "profile": args.profile,
+        "load_time": load_time,
+        "rss_model": (
+            rss_loaded - rss_before if None not in (rss_loaded, rss_before) else None
+        ),
+        "rss_peak": peak_rss_mb(),
+        "tokens_per_second": tokens / elapsed if elapsed else float("inf"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", default="stub", choices=["stub", "transformers"])
+    parser.add_argument("--model", default="placeholder")
+    parser.add_argument(
+        "--profiles", nargs="+", default=list(INFERENCE_PROFILES), metavar="PROFILE"
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--profile", help=argparse.SUPPRESS)  # 자식 프로세스용
+    args = parser.parse_args()
+
+    if args.profile:
+        print(json.dumps(run_profile(args)))
+        return
+
+    print(
+        f"{'profile':<10} {'load':>8} {'model RSS':>12} {'peak RSS':>12} {'tok/s':>8}"
+    )
+    for profile in args.profiles:
+        command = [
+            sys.executable,
+            "-m",
+            "benchmark.bench_cpu_profile",
+            "--backend",
+            args.backend,
+            "--model",
+            args.model,
+            "--runs",
+            str(args.runs),
+            "--max-new-tokens",
+            str(args.max_new_tokens),
+            "--profile",
+            profile,
+        ]
+        output = subprocess.run(command, capture_output=True, text=True)
+        if output.returncode != 0:
+            print(f"{profile:<10} failed: {output.stderr.strip().splitlines()[-1]}")
+            continue
+
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        print(
+            f"{profile:<10} {result['load_time']:7.2f}s "
+            f"{format_mb(result['rss_model']):>12} {format_mb(result['rss_peak']):>12} "
+            f"{result['tokens_per_second']:8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
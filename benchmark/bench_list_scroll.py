@@ -0,0 +1,150 @@
+"""
+메모/할 일 목록 스크롤 성능을 측정합니다.
+
+로컬 사본에 노트 1만 개를 넣고 각 탭 목록을 프레임마다 일정 픽셀씩 스크롤한 뒤 맨 아래로 건너뛰면서
+프레임 간격 p50/p99/최대값, 목록 행 위젯 수, 메모리를 보고합니다.
+
+    python -m benchmark.bench_list_scroll
+    python -m benchmark.bench_list_scroll --notes 10000 --scroll-frames 300 --pixels-per-frame 40
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from benchmark.common import current_rss_mb, format_mb, percentile
+
+# client 패키지가 Kivy를 불러오므로 Kivy가 명령행 인자를 가로채지 않게 함
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+from kivy.app import App  # noqa: E402
+from kivy.clock import Clock  # noqa: E402
+from kivy.uix.tabbedpanel import TabbedPanel  # noqa: E402
+
+from client.memo_tab import MemoTab  # noqa: E402
+from client.repository import Repository  # noqa: E402
+from client.todo_tab import TodoTab  # noqa: E402
+from client.worker import Worker  # noqa: E402
+
+
+class ScrollBenchApp(App):
+    def __init__(self, args, **kwargs):
+        super().__init__(**kwargs)
+        self.args = args
+        self.results = []
+        self.workdir = tempfile.TemporaryDirectory()
+
+    def build(self):
+        self.repository = Repository(
+            "http",
+            "127.0.0.1",
+            1,
+            local_store=os.path.join(self.workdir.name, "local.db"),
+            sync_interval=0,
+        )
+        for i in range(self.args.notes):
+            note_type = "task" if i % 2 else "memo"
+            self.repository.store.create(
+                {
+                    "type": note_type,
+                    "name": f"{note_type} {i}",
+                    "content": f"내용 {i}",
+                    "tags": [f"tag{i % 8}"],
+                    "done": False,
+                }
+            )
+        self.worker = Worker()
+        self.panel = TabbedPanel(do_default_tab=False)
+        self.tabs = [
+            (MemoTab(self.repository, self.worker, text="메모"), "memo_list"),
+            (TodoTab(self.repository, self.worker), "task_list"),
+        ]
+        for tab, _ in self.tabs:
+            self.panel.add_widget(tab)
+
+        Clock.schedule_once(lambda dt: self.run_tab(0), self.args.warmup)
+        return self.panel
+
+    def run_tab(self, index: int):
+        if index == len(self.tabs):
+            self.stop()
+            return
+        tab, list_name = self.tabs[index]
+        self.panel.switch_to(tab)
+        view = getattr(tab, list_name)
+        frames, widgets = [], []
+        state = {"frame": 0, "last": None}
+
+        def scroll(dt):
+            now = time.perf_counter()
+            if state["last"] is not None:
+                frames.append(now - state["last"])
+            state["last"] = now
+            state["frame"] += 1
+            scrollable = max(1.0, view.layout_manager.height - view.height)
+            if state["frame"] == self.args.scroll_frames // 2:
+                view.scroll_y = 0.5  # 목록 중간으로 건너뛰기
+            else:
+                view.scroll_y = max(
+                    0.0, view.scroll_y - self.args.pixels_per_frame / scrollable
+                )
+            widgets.append(len(view.layout_manager.children))
+            if state["frame"] > self.args.scroll_frames:
+                self.results.append(
+                    {
+                        "tab": tab.text,
+                        "rows": len(view.data),
+                        "frames": frames,
+                        "max_widgets": max(widgets),
+                        "rss_mb": current_rss_mb(),
+                    }
+                )
+                Clock.schedule_once(lambda dt: self.run_tab(index + 1), 0.5)
+                return False
+
+        # 목록 데이터가 채워진 뒤 시작
+        Clock.schedule_interval(scroll, 0)
+
+    def on_stop(self):
+        self.worker.shutdown()
+        self.repository.close()
+        self.workdir.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=10000)
+    parser.add_argument("--scroll-frames", type=int, default=300)
+    parser.add_argument(
+        "--pixels-per-frame",
+        type=float,
+        default=40.0,
+        help="프레임당 스크롤 거리 (40px = 60fps에서 초당 2400px의 빠른 스크롤)",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=3.0,
+        help="스크롤 전 대기 시간(초): 창 생성, 목록 로드, 첫 GL 그리기 준비",
+    )
+    parser.add_argument("--target-ms", type=float, default=16.0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    app = ScrollBenchApp(args)
+    app.run()
+    for result in app.results:
+        frames = [frame * 1000 for frame in result["frames"]]
+        p99 = percentile(frames, 99)
+        verdict = "OK" if p99 <= args.target_ms else "OVER TARGET"
+        print(
+            f"{result['tab']:<6} {result['rows']} rows  "
+            f"p50 {percentile(frames, 50):6.2f} ms  p99 {p99:6.2f} ms  "
+            f"max {max(frames):6.2f} ms ({verdict})  "
+            f"row widgets {result['max_widgets']}  memory {format_mb(result['rss_mb'])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+LLMHandler 처리량/지연 벤치마크.
+
+합성 노트에 대해 /interact 액션을 지정한 비율로 섞어 동시에 요청하고,
+첫 토큰 지연(TTFT), tokens/s, 종단 지연 p50/p95, 배치 대기열 대기 시간, 최대 메모리를 보고합니다.
+
+    python -m benchmark.bench_llm
+    python -m benchmark.bench_llm --requests 500 --concurrency 16 --mix summarize=0.7,estimate_priority=0.3
+    python -m benchmark.bench_llm --backend transformers --model Qwen/Qwen2.5-0.5B-Instruct --profile cpu-int8
+"""
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from benchmark.common import format_mb, peak_rss_mb, percentile
+from server.database import NoteRepository
+from server.embedding import EmbeddingIndex, HashingEmbedder
+from server.llm import LLMHandler
+from server.llm_backend import StubModel, load_model
+from server.llm_cache import LLMResultCache
+
+WORDS = (
+    "회의 보고서 일정 프로젝트 검토 공유 준비 발표 예산 계약 고객 디자인 테스트 배포 "
+    "운동 병원 장보기 여행 독서 정리 청소 가족 친구 저녁 점심 아침 주말 마감 확인 연락"
+).split()
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    "summarize=0.7,estimate_priority=0.3" 형식의 액션 비율을 읽습니다.
+    """
+    mix = {}
+    for item in text.split(","):
+        action, _, weight = item.partition("=")
+        mix[action.strip()] = float(weight or 1)
+    return mix
+
+
+def build_corpus(repository: NoteRepository, size: int, words: int, rng) -> List[Dict]:
+    """
+    메모/이벤트/할 일이 섞인 합성 노트를 만듭니다.
+    """
+    note_types = ["memo", "event", "task"]
+    for i in range(size):
+        note_type = note_types[i % len(note_types)]
+        length = rng.randint(words // 2, words * 3 // 2)
+        note = {
+            "type": note_type,
+            "name": f"{note_type} {i}",
+            "content": " ".join(rng.choice(WORDS) for _ in range(length)),
+            "tags": rng.sample(["work", "home", "health", "study"], 2),
+        }
+        if note_type == "event":
+            note["date"] = "2024-12-01T10:00:00"
+        repository.create(note)
+    return [
+        note
+        for note_type in repository.note_types
+        for note in repository.read_all(note_type)
+    ]
+
+
+def run(args) -> Dict:
+    rng = random.Random(args.seed)
+    workdir = tempfile.TemporaryDirectory()
+    repository = NoteRepository(f"sqlite:///{workdir.name}/notes.db")
+    notes = build_corpus(repository, args.notes, args.note_words, rng)
+
+    index = EmbeddingIndex(f"{workdir.name}/embeddings", HashingEmbedder())
+    index.sync(notes)
+
+    if args.backend == "stub":
+        model = StubModel(
+            batch_delay=args.stub_batch_ms / 1000,
+            token_delay=args.stub_token_ms / 1000,
+            prefill_delay=args.stub_prefill_ms / 1000,
+        )
+    else:
+        model = load_model(args.backend, args.model, profile=args.profile)
+
+    cache = LLMResultCache(repository.engine) if args.cache else None
+    handler = LLMHandler(
+        model_name=args.model,
+        model=model,
+        generation_config={"max_new_tokens": args.max_new_tokens},
+        cache=cache,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        embedding_index=index,
+    )
+
+    mix = parse_mix(args.mix)
+    actions = rng.choices(list(mix), weights=list(mix.values()), k=args.requests)
+    targets = [rng.choice(notes) for _ in range(args.requests)]
+    streamed = [rng.random() < args.stream_ratio for _ in range(args.requests)]
+
+    latencies: Dict[str, List[float]] = {action: [] for action in mix}
+    ttfts: List[float] = []
+    output_tokens = [0]
+    errors = [0]
+    lock = threading.Lock()
+
+    def request(i: int):
+        action, note = actions[i], targets[i]
+        start = time.perf_counter()
+        first = None
+        if streamed[i]:
+            text = ""
+            for event in handler.stream(note, action):
+                if "token" in event:
+                    if first is None:
+                        first = time.perf_counter() - start
+                    text += event["token"]
+                elif "error" in event:
+                    result = event
+                else:
+                    result = event["result"]
+        else:
+            result = handler.process(note, action)
+            text = result.get("summary") or result.get("priority", "")
+        elapsed = time.perf_counter() - start
+
+        with lock:
+            latencies[action].append(elapsed)
+            if first is not None:
+                ttfts.append(first)
+            output_tokens[0] += model.count_tokens(text)
+            errors[0] += "error" in result
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(request, range(args.requests)))
+    wall = time.perf_counter() - start
+
+    queue_waits = list(handler.scheduler.queue_waits)
+    handler.close()
+    repository.engine.dispose()
+    workdir.cleanup()
+
+    everything = [value for values in latencies.values() for value in values]
+    return {
+        "backend": args.backend,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "errors": errors[0],
+        "wall_seconds": wall,
+        "requests_per_second": args.requests / wall,
+        "tokens_per_second": output_tokens[0] / wall,
+        "ttft_ms": _summary(ttfts),
+        "latency_ms": _summary(everything),
+        "latency_ms_by_action": {
+            action: _summary(values) for action, values in latencies.items()
+        },
+        "queue_wait_ms": _summary(queue_waits),
+        "batch_sizes": _batch_stats(model),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _summary(values: List[float]) -> Dict:
+    if not values:
+        return {}
+    return {
+        "count": len(values),
+        "mean": statistics.mean(values) * 1000,
+        "p50": percentile(values, 50) * 1000,
+        "p95": percentile(values, 95) * 1000,
+        "max": max(values) * 1000,
+    }
+
+
+def _batch_stats(model) -> Dict:
+    sizes = getattr(model, "batch_sizes", None)
+    if not sizes:
+        return {}
+    return {"batches": len(sizes), "mean": statistics.mean(sizes), "max": max(sizes)}
+
+
+def print_report(report: Dict):
+    print(
+        f"{report['backend']}: {report['requests']} requests, "
+        f"concurrency {report['concurrency']}, {report['errors']} errors"
+    )
+    print(
+        f"  throughput   {report['requests_per_second']:8.1f} req/s, "
+        f"{report['tokens_per_second']:8.1f} tok/s"
+    )
+    rows = [("TTFT", report["ttft_ms"]), ("latency", report["latency_ms"])]
+    rows += [
+        (f"  {action}", values)
+        for action, values in report["latency_ms_by_action"].items()
+    ]
+    rows.append(("queue wait", report["queue_wait_ms"]))
+    for label, values in rows:
+        if values:
+            print(
+                f"  {label:<18} p50 {values['p50']:8.1f} ms  p95 {values['p95']:8.1f} ms"
+                f"  max {values['max']:8.1f} ms  (n={values['count']})"
+            )
+    if report["batch_sizes"]:
+        batches = report["batch_sizes"]
+        print(f"  batches      {batches['batches']}, mean size {batches['mean']:.2f}")
+    print(f"  peak memory  {format_mb(report['peak_rss_mb'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", default="stub", choices=["stub", "transformers"])
+    parser.add_argument("--model", default="placeholder")
+    parser.add_argument("--profile", default="default", help="transformers 추론 프로필")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--mix",
+        default="summarize=0.6,link_suggestion=0.2,estimate_priority=0.2",
+        help="액션=비율 목록",
+    )
+    parser.add_argument(
+        "--stream-ratio",
+        type=float,
+        default=0.3,
+        help="stream으로 요청할 비율 (TTFT 측정)",
+    )
+    parser.add_argument("--notes", type=int, default=100)
+    parser.add_argument("--note-words", type=int, default=60)
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=20)
+    parser.add_argument("--cache", action="store_true", help="결과 캐시 사용")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stub-batch-ms", type=float, default=30)
+    parser.add_argument("--stub-token-ms", type=float, default=2)
+    parser.add_argument("--stub-prefill-ms", type=float, default=0.2)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    report = run(args)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+시스템 프롬프트 KV 캐시 재사용 전후의 첫 토큰 지연(TTFT)을 비교합니다.
+
+    python -m benchmark.bench_prefix_cache
+    python -m benchmark.bench_prefix_cache --backend transformers --model Qwen/Qwen2.5-0.5B-Instruct
+"""
+
+import argparse
+import statistics
+import time
+
+from server.llm import LLMHandler
+from server.llm_backend import StubModel, load_model
+
+NOTE_CONTENT = (
+    "내일 오전 10시 팀 회의. 분기 목표 점검과 신규 기능 일정 논의. 발표 자료 준비 필요."
+)
+
+
+def measure_ttft(handler: LLMHandler, action: str, runs: int) -> list:
+    """
+    stream을 호출해 첫 토큰이 나올 때까지의 시간(ms)을 측정합니다.
+    """
+    samples = []
+    for i in range(runs):
+        # 매번 다른 노트로 결과 캐시를 피함
+        note = {"type": "memo", "id": i, "content": f"{NOTE_CONTENT} ({i})"}
+        start = time.perf_counter()
+        for event in handler.stream(note, action):
+            if "token" in event or "done" in event:
+                samples.append((time.perf_counter() - start) * 1000)
+                break
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", default="stub", choices=["stub", "transformers"])
+    parser.add_argument("--model", default="placeholder")
+    parser.add_argument("--action", default="summarize")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument(
+        "--prefill-ms",
+        type=float,
+        default=2.0,
+        help="스텁 모델의 프롬프트 토큰당 지연(ms)",
+    )
+    args = parser.parse_args()
+
+    if args.backend == "stub":
+        model = StubModel(prefill_delay=args.prefill_ms / 1000)
+    else:
+        model = load_model(args.backend, args.model)
+
+    generation_config = {"max_new_tokens": 16}
+    for prefix_cache in (False, True):
+        if hasattr(model, "prefix_cache"):
+            model.prefix_cache.clear()
+        handler = LLMHandler(
+            model_name=args.model,
+            model=model,
+            generation_config=generation_config,
+            prefix_cache=prefix_cache,
+        )
+        # 첫 호출(모델 워밍업)은 측정에서 제외
+        measure_ttft(handler, args.action, 1)
+        samples = measure_ttft(handler, args.action, args.runs)
+        handler.close()
+
+        label = "prefix cache on " if prefix_cache else "prefix cache off"
+        print(
+            f"{label}: TTFT mean {statistics.mean(samples):7.1f} ms, "
+            f"p50 {statistics.median(samples):7.1f} ms, "
+            f"max {max(samples):7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
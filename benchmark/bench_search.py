@@ -0,0 +1,96 @@
+"""
+클라이언트 메모 검색 색인의 성능을 측정합니다.
+
+한국어 단어로 만든 메모를 색인한 뒤, 단어를 한 글자씩(초성 입력 단계 포함) 입력하듯 질의하며
+색인 생성 시간, 질의 지연 p50/p99, 노트 하나의 증분 갱신 시간과 메모리를 보고합니다.
+
+    python -m benchmark.bench_search
+    python -m benchmark.bench_search --notes 50000 --queries 300
+"""
+
+import argparse
+import random
+import time
+
+from benchmark.common import current_rss_mb, format_mb, percentile
+from client.search import CHOSEONG, HANGUL_START, SearchIndex
+
+# 받침 없는 글자 일부로 가짜 한국어 단어를 만듦
+SYLLABLES = [chr(HANGUL_START + i * 28) for i in range(0, 399, 7)]
+
+
+def make_words(count: int, rng: random.Random):
+    return list(
+        {"".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(count)}
+    )
+
+
+def typed_prefixes(word: str):
+    """한 단어를 입력하는 동안 검색창에 보이는 글자들 ("회" -> "회ㅇ" -> "회의")"""
+    for i in range(1, len(word) + 1):
+        if i > 1:
+            choseong = CHOSEONG[(ord(word[i - 1]) - HANGUL_START) // 588]
+            yield word[: i - 1] + choseong
+        yield word[:i]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=50000)
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--words-per-note", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = make_words(args.vocabulary, rng)
+    notes = [
+        {
+            "id": i,
+            "type": "memo",
+            "name": " ".join(rng.choices(words, k=3)),
+            "content": " ".join(rng.choices(words, k=args.words_per_note)),
+            "tags": rng.choices(words[:50], k=2),
+        }
+        for i in range(1, args.notes + 1)
+    ]
+
+    before = current_rss_mb()
+    start = time.perf_counter()
+    index = SearchIndex(notes)
+    build = time.perf_counter() - start
+    after = current_rss_mb()
+
+    latencies, results = [], []
+    for word in rng.sample(words, args.queries):
+        for query in typed_prefixes(word):
+            start = time.perf_counter()
+            found = index.search(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+            results.append(len(found))
+
+    updates = []
+    for note in rng.sample(notes, 200):
+        changed = {**note, "content": " ".join(rng.choices(words, k=10))}
+        start = time.perf_counter()
+        index.apply("update", changed)
+        updates.append((time.perf_counter() - start) * 1000)
+
+    print(
+        f"{args.notes} notes  build {build:.2f} s  "
+        f"index memory {format_mb(after - before if before and after else None)}"
+    )
+    print(
+        f"{len(latencies)} queries  p50 {percentile(latencies, 50):6.2f} ms  "
+        f"p99 {percentile(latencies, 99):6.2f} ms  max {max(latencies):6.2f} ms  "
+        f"results p50 {percentile(results, 50)}"
+    )
+    print(
+        f"update  p50 {percentile(updates, 50):6.3f} ms  "
+        f"p99 {percentile(updates, 99):6.3f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Kivy 클라이언트의 시작 시간을 측정합니다.
+
+새 프로세스에서 NoteApp을 띄워 프로세스 시작부터 첫 프레임까지의 시간(time-to-first-frame)과
+client.main 모듈을 불러오는 시간, 첫 프레임 후 --open-delay초 뒤(사용자가 탭을 누르는 시점)
+메모 탭을 열어 탭이 처음 그려지고 목록이 채워지기까지의 시간을 여러 번 재어 중앙값을 보고합니다.
+서버는 연결할 수 없는 주소로 두고, 로컬 사본에 노트를 미리 채워 둡니다. (창 없이 실행 가능)
+
+    python -m benchmark.bench_startup
+    python -m benchmark.bench_startup --runs 10 --notes 2000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# client 패키지가 Kivy를 불러오면 Kivy가 명령행 인자를 가로채지 않게 함
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+
+
+def child(spawned: float, open_delay: float):
+    """
+    측정용 하위 프로세스: 결과를 JSON 한 줄로 출력합니다.
+    """
+    start = time.time()
+    import client.main
+
+    imported = time.time()
+    from kivy.clock import Clock
+    from kivy.core.window import Window
+
+    result = {"import": imported - start}
+
+    class StartupBenchApp(client.main.NoteApp):
+        def build(self):
+            root = super().build()
+            Window.bind(on_flip=self.on_flip)
+            return root
+
+        def on_flip(self, *args):
+            now = time.time()
+            if "first_frame" not in result:
+                result["first_frame"] = now - spawned
+                Clock.schedule_once(self.open_tab, open_delay)
+            elif "tab_opened" in self.__dict__ and "tab_frame" not in result:
+                result["tab_frame"] = now - self.tab_opened
+
+        def open_tab(self, dt):
+            self.tab_opened = time.time()
+            self.add_tab("메모")
+            self.tab_panel.switch_to(self.tab_panel.tab_list[0])
+            Clock.schedule_interval(self.wait_loaded, 0)
+
+        def wait_loaded(self, dt):
+            tab = self.tab_panel.tab_list[0]
+            memos = getattr(getattr(tab, "tab", tab), "memos", None)
+            if memos:
+                result["tab_loaded"] = time.time() - self.tab_opened
+                self.stop()
+                return False
+
+    StartupBenchApp().run()
+    print(json.dumps(result))
+
+
+def seed(workdir: str, notes: int):
+    """
+    벤치마크용 설정 파일과 노트를 채운 로컬 사본을 만듭니다.
+    """
+    sys.path.insert(0, ROOT)
+    from client.local_store import LocalStore
+
+    os.makedirs(os.path.join(workdir, "config"))
+    with open(
+        os.path.join(ROOT, "config", "network_config.json"), encoding="utf-8"
+    ) as f:
+        network_config = json.load(f)
+    network_config.update(
+        port=1, retries=0, local_store=os.path.join(workdir, "local.db")
+    )
+    with open(
+        os.path.join(workdir, "config", "network_config.json"), "w", encoding="utf-8"
+    ) as f:
+        json.dump(network_config, f)
+
+    store = LocalStore(network_config["local_store"])
+    for i in range(notes):
+        store.create({"type": "memo", "name": f"메모 {i}", "content": f"내용 {i}"})
+    store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--notes", type=int, default=1000)
+    parser.add_argument("--open-delay", type=float, default=0.5)
+    parser.add_argument("--child", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        child(args.child, args.open_delay)
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        seed(workdir, args.notes)
+        for run in range(args.runs):
+            env = {
+                **os.environ,
+                "PYTHONPATH": ROOT,
+                "KIVY_NO_ARGS": "1",
+                "KIVY_NO_CONSOLELOG": "1",
+                # 사용자 설정 파일(~/.kivy)을 건드리지 않도록 실행마다 새 설정 디렉터리
+                "KIVY_HOME": os.path.join(workdir, f"kivy{run}"),
+            }
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmark.bench_startup",
+                    "--child",
+                    str(time.time()),
+                    "--open-delay",
+                    str(args.open_delay),
+                ],
+                cwd=workdir,
+                env=env,
+                capture_output=True,
+                text=True,
+                timeout=120,
+            )
+            if output.returncode != 0:
+                sys.exit(output.stderr)
+            results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    for key, label in (
+        ("import", "import client.main"),
+        ("first_frame", "time to first frame"),
+        ("tab_frame", "memo tab first frame"),
+        ("tab_loaded", "memo tab loaded"),
+    ):
+        values = [result[key] * 1000 for result in results if key in result]
+        if values:
+            print(
+                f"{label:<22} median {statistics.median(values):7.1f} ms  "
+                f"min {min(values):7.1f} ms  max {max(values):7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
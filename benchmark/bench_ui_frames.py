@@ -0,0 +1,111 @@
+"""
+동기화/로드 중 Kivy UI 프레임 시간을 측정합니다.
+
+로컬 사본에 노트를 채운 뒤 메모/할 일 탭을 열고, 백그라운드 동기화와 탭 로드가 진행되는 동안
+프레임 간격의 p50/p99/최대값을 보고합니다. 목표는 프레임당 16ms 이내입니다.
+
+    python -m benchmark.bench_ui_frames
+    python -m benchmark.bench_ui_frames --notes 2000 --seconds 5
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from benchmark.common import percentile
+
+# client 패키지가 Kivy를 불러오므로 Kivy가 명령행 인자를 가로채지 않게 함
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+from kivy.app import App  # noqa: E402
+from kivy.clock import Clock  # noqa: E402
+from kivy.uix.tabbedpanel import TabbedPanel  # noqa: E402
+
+from client.memo_tab import MemoTab  # noqa: E402
+from client.repository import Repository  # noqa: E402
+from client.todo_tab import TodoTab  # noqa: E402
+from client.worker import Worker  # noqa: E402
+
+
+class FrameBenchApp(App):
+    def __init__(self, args, **kwargs):
+        super().__init__(**kwargs)
+        self.args = args
+        self.frames = []
+        self.workdir = tempfile.TemporaryDirectory()
+
+    def build(self):
+        # 서버가 없는 주소로 두어 동기화는 계속 실패(재시도)하며 백그라운드에서 돌게 함
+        self.repository = Repository(
+            "http",
+            "127.0.0.1",
+            1,
+            local_store=os.path.join(self.workdir.name, "local.db"),
+            sync_interval=0.05,
+        )
+        for i in range(self.args.notes):
+            note_type = "task" if i % 2 else "memo"
+            self.repository.store.create(
+                {
+                    "type": note_type,
+                    "name": f"{note_type} {i}",
+                    "content": f"내용 {i}",
+                    "tags": [f"tag{i % 8}"],
+                    "done": False,
+                }
+            )
+        self.worker = Worker()
+        panel = TabbedPanel(do_default_tab=False)
+        for tab in (
+            MemoTab(self.repository, self.worker, text="메모"),
+            TodoTab(self.repository, self.worker),
+        ):
+            panel.add_widget(tab)
+
+        self.start = self.last = time.perf_counter()
+        Clock.schedule_interval(self.on_frame, 0)
+        Clock.schedule_once(
+            lambda dt: self.stop(), self.args.warmup + self.args.seconds
+        )
+        return panel
+
+    def on_frame(self, dt):
+        now = time.perf_counter()
+        if now - self.start >= self.args.warmup:
+            self.frames.append(now - self.last)
+        self.last = now
+
+    def on_stop(self):
+        self.worker.shutdown()
+        self.repository.close()
+        self.workdir.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument(
+        "--warmup",
+        type=float,
+        default=2.5,
+        help="측정에서 뺄 시작 구간(초): 창 생성과 첫 GL 그리기 준비 등 한 번뿐인 지연",
+    )
+    parser.add_argument("--target-ms", type=float, default=16.0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    app = FrameBenchApp(args)
+    app.run()
+    frames = [frame * 1000 for frame in app.frames]
+    p99 = percentile(frames, 99)
+    verdict = "OK" if p99 <= args.target_ms else "OVER TARGET"
+    print(
+        f"{len(frames)} frames  p50 {percentile(frames, 50):6.2f} ms  "
+        f"p99 {p99:6.2f} ms  max {max(frames):6.2f} ms ({verdict})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+벤치마크 공용 도구.
+"""
+
+import math
+import sys
+from typing import List, Optional
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    현재 프로세스의 최대 상주 메모리(MB). 측정할 수 없으면 None.
+    """
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS는 바이트, Linux는 KB 단위
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def current_rss_mb() -> Optional[float]:
+    """
+    현재 프로세스의 상주 메모리(MB). 측정할 수 없으면 None.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        import resource
+
+        return pages * resource.getpagesize() / (1024 * 1024)
+    except (OSError, ImportError):
+        pass
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        return peak_rss_mb()
+
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    nearest-rank 방식의 백분위수
+    """
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def format_mb(value: Optional[float]) -> str:
+    return "n/a" if value is None else f"{value:.1f} MB"
@@ -1,3 +1,16 @@
-from .memo_tab import MemoTab
-from .todo_tab import TodoTab
-from .repository import Repository
+import importlib
+
+# 탭 모듈은 Kivy 위젯을 불러오므로, 처음 쓸 때 불러와 client.local_store 같은 모듈만 쓸 때는 가볍게 유지
+_EXPORTS = {
+    "MemoTab": ".memo_tab",
+    "TodoTab": ".todo_tab",
+    "Repository": ".repository",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
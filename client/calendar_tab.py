@@ -0,0 +1,140 @@
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+from kivy.clock import Clock
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from client.simple_calendar import SimpleCalendar, month_range, shift_month
+from client.worker import Worker
+
+
+class CalendarTab(BoxLayout):
+    """
+    일정 탭
+
+    달별 일정을 LRU로 캐시하고, 현재 달을 보여 줄 때 이전/다음 달을 미리 불러와
+    달을 넘기면 캐시된 일정으로 바로 그립니다.
+    """
+
+    def __init__(self, repository, worker: Worker, cache_size: int = 12, **kwargs):
+        """
+        Args:
+            repository (Repository): 노트 저장소
+            worker (Worker): 일정 조회를 실행할 작업 스레드
+            cache_size (int): 일정을 기억할 달 수 (현재/이전/다음 달을 위해 3 이상)
+        """
+        super().__init__(orientation="vertical", **kwargs)
+        self.repository = repository
+        self.worker = worker
+        self.cache_size = max(cache_size, 3)
+        self.months: "OrderedDict[Tuple[int, int], List[Dict]]" = OrderedDict()
+        self.loading: Set[Tuple[int, int]] = set()
+        self.stale: Set[Tuple[int, int]] = set()  # 불러오는 중에 일정이 바뀐 달
+
+        nav_bar = BoxLayout(size_hint_y=None, height=50)
+        prev_button = Button(text="<", size_hint_x=0.2)
+        prev_button.bind(on_press=lambda instance: self.calendar.move_month(-1))
+        self.month_label = Label()
+        next_button = Button(text=">", size_hint_x=0.2)
+        next_button.bind(on_press=lambda instance: self.calendar.move_month(1))
+        nav_bar.add_widget(prev_button)
+        nav_bar.add_widget(self.month_label)
+        nav_bar.add_widget(next_button)
+        self.add_widget(nav_bar)
+
+        self.calendar = SimpleCalendar()
+        self.calendar.bind(on_month_change=self.on_month_change)
+        self.add_widget(self.calendar)
+
+        self.repository.add_listener(self.on_note_changed)
+        self.load_calendar()
+
+    def load_calendar(self):
+        """현재 달을 표시하고 현재/이전/다음 달 일정을 작업 스레드에서 로드"""
+        self.on_month_change(self.calendar, *self.calendar.month)
+
+    def on_month_change(self, calendar, year: int, month: int):
+        self.month_label.text = f"{year}년 {month}월"
+        self.show_cached()
+        for delta in (0, -1, 1):
+            self.load_month(*shift_month(year, month, delta))
+
+    def load_month(self, year: int, month: int):
+        """캐시에 없는 달의 일정을 작업 스레드에서 로드 (이미 불러오는 중이면 무시)"""
+        key = (year, month)
+        if key in self.months:
+            self.months.move_to_end(key)
+            return
+        if key in self.loading:
+            return
+        self.loading.add(key)
+        date_start, date_end = month_range(year, month)
+        self.worker.submit(
+            self.repository.filtered_notes,
+            note_type="event",
+            date_start=date_start,
+            date_end=date_end,
+            on_result=lambda events: self.on_month_loaded(key, events),
+            on_error=lambda error: self.loading.discard(key),
+            owner=self,
+        )
+
+    def on_month_loaded(self, key: Tuple[int, int], events):
+        self.loading.discard(key)
+        if key in self.stale:
+            # 조회 중에 바뀐 일정이 빠졌을 수 있으므로 다시 로드
+            self.stale.discard(key)
+            self.load_month(*key)
+            return
+        if isinstance(events, dict):
+            return  # 연결 오류: 다음에 그 달을 볼 때 다시 시도
+        self.months[key] = events
+        self.months.move_to_end(key)
+        while len(self.months) > self.cache_size:
+            self.months.popitem(last=False)
+        self.show_cached()
+
+    def show_cached(self):
+        """달력에 보이는 세 달(이전/현재/다음)의 캐시된 일정을 날짜 칸에 표시"""
+        year, month = self.calendar.month
+        events_by_day = {}
+        for delta in (-1, 0, 1):
+            for event in self.months.get(shift_month(year, month, delta), ()):
+                day = _event_day(event)
+                if day:
+                    events_by_day.setdefault(day, []).append(event)
+        self.calendar.set_events(events_by_day)
+
+    def on_note_changed(self, event: str, note: Dict, previous: Optional[Dict]):
+        """Repository 변경 알림 (동기화 스레드에서도 호출되므로 메인 스레드로 넘김)"""
+        Clock.schedule_once(lambda dt: self.apply_note_change(note, previous))
+
+    def apply_note_change(self, note: Dict, previous: Optional[Dict]):
+        """바뀐 일정이 속한 달의 캐시를 버리고, 화면에 보이는 달이면 다시 로드"""
+        keys = set()
+        for changed in (note, previous):
+            day = _event_day(changed) if changed else None
+            if day and changed.get("type") == "event":
+                keys.add((day.year, day.month))
+        visible = {shift_month(*self.calendar.month, delta) for delta in (-1, 0, 1)}
+        for key in keys:
+            self.months.pop(key, None)
+            if key in self.loading:
+                self.stale.add(key)
+            elif key in visible:
+                self.load_month(*key)
+
+    def close(self):
+        """탭을 닫을 때 진행 중인 요청을 취소하고 변경 알림 구독을 해제"""
+        self.repository.remove_listener(self.on_note_changed)
+        self.worker.cancel(self)
+
+
+def _event_day(event: Dict):
+    """일정의 날짜 (date). 날짜가 없거나 형식이 잘못되면 None"""
+    try:
+        return datetime.fromisoformat(event["date"]).date()
+    except (KeyError, TypeError, ValueError):
+        return None
@@ -0,0 +1,491 @@
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LocalStore:
+    """
+    서버 노트의 로컬 SQLite 사본과 서버로 보낼 변경 대기열(outbox)
+
+    - 읽기는 항상 로컬 사본에서 처리합니다.
+    - 쓰기는 로컬 사본에 바로 반영하고 outbox에 기록합니다. 동기화가 outbox를 서버로 보냅니다.
+    - 서버에 아직 없는 노트는 음수 임시 ID를 가지며, 생성이 동기화되면 서버 ID로 바뀝니다.
+    - outbox에는 노트당 하나의 작업만 남도록 연속된 변경을 합칩니다.
+    - 로컬 쓰기와 동기화로 사본이 바뀌면 등록된 리스너에 노트 단위로 알립니다.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): SQLite 파일 경로 (":memory:" 가능)
+        """
+        self.path = path
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.listeners: List[Callable[[str, Dict, Optional[Dict]], None]] = []
+        with self.lock, self.connection:
+            if path != ":memory:":
+                self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS notes (
+                    id INTEGER PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    created TEXT,
+                    updated TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_notes_type ON notes (type);
+                CREATE INDEX IF NOT EXISTS ix_notes_date
+                    ON notes (type, json_extract(data, '$.date'));
+                CREATE TABLE IF NOT EXISTS outbox (
+                    note_id INTEGER PRIMARY KEY,
+                    op TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    base_updated TEXT,
+                    base_version INTEGER,
+                    edited TEXT NOT NULL,
+                    seq INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_outbox_seq ON outbox (seq);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                """)
+            # base_version 컬럼이 없던 사본 파일
+            columns = {
+                row["name"]
+                for row in self.connection.execute("PRAGMA table_info(outbox)")
+            }
+            if "base_version" not in columns:
+                self.connection.execute(
+                    "ALTER TABLE outbox ADD COLUMN base_version INTEGER"
+                )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def add_listener(self, listener: Callable[[str, Dict, Optional[Dict]], None]):
+        """
+        로컬 사본 변경 리스너를 등록합니다. 쓰기를 한 스레드(동기화 스레드 포함)에서 호출됩니다.
+
+        Args:
+            listener: (event, note, previous) 형태로 호출되는 함수.
+                      event는 "create", "update", "delete" 중 하나이며,
+                      previous는 알 수 있을 때 바뀌기 전 노트입니다.
+                      생성이 동기화되어 임시 ID가 서버 ID로 바뀌면 "update"이고
+                      previous가 임시 ID를 가진 노트입니다.
+        """
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, Dict, Optional[Dict]], None]):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def _notify(self, changes: List[tuple]):
+        """
+        커밋이 끝난 변경을 리스너에 알립니다. 리스너 오류는 저장 결과에 영향을 주지 않습니다.
+        """
+        for event, note, previous in changes:
+            for listener in list(self.listeners):
+                try:
+                    listener(event, note, previous)
+                except Exception:
+                    logger.exception(f"Error in local note listener for {event}")
+
+    # 읽기
+
+    def get(self, note_id: int) -> Optional[Dict]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT data FROM notes WHERE id = ?", (note_id,)
+            ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def all(self) -> List[Dict]:
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT data FROM notes ORDER BY id"
+            ).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def filter(
+        self,
+        note_type: str,
+        created_start: Optional[str] = None,
+        created_end: Optional[str] = None,
+        updated_start: Optional[str] = None,
+        updated_end: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        date_start: Optional[str] = None,
+        date_end: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        서버의 /notes/filter와 같은 조건으로 로컬 사본을 조회합니다. (시각은 ISO 문자열)
+        """
+        query = "SELECT data FROM notes WHERE type = ?"
+        params: list = [note_type.lower()]
+        if created_start and created_end:
+            query += " AND created BETWEEN ? AND ?"
+            params += [created_start, created_end]
+        if updated_start and updated_end:
+            query += " AND updated BETWEEN ? AND ?"
+            params += [updated_start, updated_end]
+        if date_start and date_end:
+            query += " AND json_extract(data, '$.date') BETWEEN ? AND ?"
+            params += [date_start, date_end]
+        with self.lock:
+            rows = self.connection.execute(query + " ORDER BY id", params).fetchall()
+
+        notes = [json.loads(row["data"]) for row in rows]
+        if tags:
+            notes = [note for note in notes if set(tags) <= set(note.get("tags") or [])]
+        return notes
+
+    # 로컬 쓰기
+
+    def create(self, data: Dict) -> Dict:
+        """
+        임시 ID로 노트를 만들고 생성 작업을 outbox에 넣습니다.
+        """
+        now = _now()
+        with self.lock, self.connection:
+            note_id = self._next_temp_id()
+            note = {"tags": [], **data, "id": note_id, "created": now, "updated": now}
+            self._put(note)
+            self._queue(note_id, "create", note, None, None, now)
+        self._notify([("create", note, None)])
+        return note
+
+    def _next_temp_id(self) -> int:
+        """
+        새 임시 ID. 계속 줄어드는 카운터를 meta 테이블에 저장해, 동기화 중인 생성 작업의 노트를
+        지운 뒤에도 그 ID를 다시 쓰지 않습니다. (다시 쓰면 complete()가 다른 노트의 ID를 바꿈)
+        """
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'next_temp_id'"
+        ).fetchone()
+        smallest = self.connection.execute("SELECT MIN(id) FROM notes").fetchone()[0]
+        # 카운터가 없던 사본 파일은 남아 있는 임시 ID 다음부터 시작
+        note_id = min(row["value"] if row else 0, smallest or 0, 0) - 1
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_temp_id', ?)",
+            (note_id,),
+        )
+        return note_id
+
+    def update(self, note_id: int, updates: Dict) -> Optional[Dict]:
+        now = _now()
+        with self.lock, self.connection:
+            note = self.get(note_id)
+            if note is None:
+                return None
+            previous = dict(note)
+            base_updated = note.get("updated")
+            updates = {
+                key: value
+                for key, value in updates.items()
+                if key not in ("id", "type", "created", "updated", "version")
+            }
+            note.update(updates, updated=now)
+            self._put(note)
+            self._queue(
+                note_id, "update", updates, base_updated, previous.get("version"), now
+            )
+        self._notify([("update", note, previous)])
+        return note
+
+    def delete(self, note_id: int) -> bool:
+        now = _now()
+        with self.lock, self.connection:
+            note = self.get(note_id)
+            if note is None:
+                return False
+            self.connection.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+            self._queue(
+                note_id, "delete", {}, note.get("updated"), note.get("version"), now
+            )
+        self._notify([("delete", note, None)])
+        return True
+
+    # 동기화
+
+    def pending(self) -> List[Dict]:
+        """
+        서버로 보낼 작업 목록 (기록 순서)
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT * FROM outbox ORDER BY seq"
+            ).fetchall()
+        return [
+            {
+                "note_id": row["note_id"],
+                "op": row["op"],
+                "payload": json.loads(row["payload"]),
+                "base_updated": row["base_updated"],
+                "base_version": row["base_version"],
+                "edited": row["edited"],
+                "seq": row["seq"],
+            }
+            for row in rows
+        ]
+
+    def complete(self, entry: Dict, server_note: Optional[Dict] = None):
+        """
+        outbox 작업 하나를 끝냅니다. 그 사이 같은 노트가 다시 바뀌었다면 새 작업은 남겨 둡니다.
+
+        Args:
+            entry (dict): pending()이 반환한 작업
+            server_note (dict): 서버의 현재 노트. 주어지면 로컬 사본을 덮어씁니다.
+                                생성 작업이면 임시 ID를 서버 ID로 바꿉니다.
+        """
+        with self.lock, self.connection:
+            changes = self._complete(entry, server_note)
+        self._notify(changes)
+
+    def _complete(self, entry: Dict, server_note: Optional[Dict]) -> List[tuple]:
+        """
+        complete()의 트랜잭션 본문. 알릴 변경 목록을 반환합니다.
+        """
+        note_id = entry["note_id"]
+        current = self.connection.execute(
+            "SELECT seq FROM outbox WHERE note_id = ?", (note_id,)
+        ).fetchone()
+        superseded = current is not None and current["seq"] != entry["seq"]
+        if not superseded:
+            self.connection.execute("DELETE FROM outbox WHERE note_id = ?", (note_id,))
+
+        if server_note is None:
+            return []
+        local = self.get(note_id)
+        if entry["op"] == "create":
+            if local is None:
+                # 생성이 동기화되는 동안 지운 노트는 서버에서도 지움
+                self._queue(
+                    server_note["id"],
+                    "delete",
+                    {},
+                    server_note.get("updated"),
+                    server_note.get("version"),
+                    _now(),
+                )
+                return []
+            self.connection.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+            if superseded:
+                # 생성이 동기화되는 동안 바뀐 내용은 서버 ID의 수정 작업으로 옮김
+                self.connection.execute(
+                    "UPDATE outbox SET note_id = ?, op = CASE op WHEN 'create' "
+                    "THEN 'update' ELSE op END, base_updated = ?, base_version = ? "
+                    "WHERE note_id = ?",
+                    (
+                        server_note["id"],
+                        server_note.get("updated"),
+                        server_note.get("version"),
+                        note_id,
+                    ),
+                )
+                server_note = {**local, "id": server_note["id"]}
+            self._put(server_note)
+            return [("update", server_note, local)]
+        if superseded:
+            # 새 작업은 방금 반영한 서버 상태를 기준으로 충돌을 판단
+            self.connection.execute(
+                "UPDATE outbox SET base_updated = ?, base_version = ? WHERE note_id = ?",
+                (server_note.get("updated"), server_note.get("version"), note_id),
+            )
+            return []
+        self._put(server_note)
+        # 충돌로 서버 쪽을 따르면 로컬에서 지운 노트가 되살아날 수 있음
+        return [("update" if local else "create", server_note, local)]
+
+    def reject(self, entry: Dict):
+        """
+        서버가 거부한 작업을 버립니다. 생성 작업이면 로컬 노트도 지우고,
+        수정/삭제 작업이면 다음 merge에서 서버 상태로 되돌아갑니다.
+        """
+        changes = []
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM outbox WHERE note_id = ? AND seq = ?",
+                (entry["note_id"], entry["seq"]),
+            )
+            if entry["op"] == "create":
+                note = self.get(entry["note_id"])
+                self.connection.execute(
+                    "DELETE FROM notes WHERE id = ?", (entry["note_id"],)
+                )
+                if note:
+                    changes.append(("delete", note, None))
+        self._notify(changes)
+
+    def merge(self, server_notes: List[Dict]) -> int:
+        """
+        서버의 전체 노트 목록을 로컬 사본에 반영합니다.
+        outbox에 작업이 남아 있는 노트는 건드리지 않고, 서버에서 사라진 노트는 지웁니다.
+
+        Returns:
+            int: 바뀐 로컬 노트 수
+        """
+        changes = []
+        with self.lock, self.connection:
+            pending = {
+                row[0] for row in self.connection.execute("SELECT note_id FROM outbox")
+            }
+            local = {
+                row["id"]: row["updated"]
+                for row in self.connection.execute("SELECT id, updated FROM notes")
+            }
+            seen = set()
+            for note in server_notes:
+                seen.add(note["id"])
+                if note["id"] in pending:
+                    continue
+                if note["id"] not in local:
+                    self._put(note)
+                    changes.append(("create", note, None))
+                elif local[note["id"]] != note.get("updated"):
+                    self._put(note)
+                    changes.append(("update", note, None))
+            for note_id in local:
+                if note_id > 0 and note_id not in seen and note_id not in pending:
+                    note = self.get(note_id)
+                    self.connection.execute(
+                        "DELETE FROM notes WHERE id = ?", (note_id,)
+                    )
+                    changes.append(("delete", note, None))
+        self._notify(changes)
+        return len(changes)
+
+    def apply_event(self, message: Dict) -> Optional[bool]:
+        """
+        서버 변경 메시지 하나(/notes/events)를 로컬 사본에 반영합니다.
+        merge()처럼 outbox에 작업이 남아 있는 노트는 건드리지 않습니다.
+
+        Args:
+            message (dict): 변경 메시지 (server.events.compact_message 참고)
+        Returns:
+            bool: 반영했으면 True, 이미 반영된 버전이거나 대기 작업이 있어 건너뛰면 False.
+                  바뀐 필드만 왔는데 로컬 사본이 그 이전 버전이 아니면 None (노트 전체가 필요함)
+        """
+        event = message.get("event")
+        changes = []
+        with self.lock, self.connection:
+            if event == "delete_all":
+                query = (
+                    "SELECT id FROM notes WHERE id > 0 "
+                    "AND id NOT IN (SELECT note_id FROM outbox)"
+                )
+                params: tuple = ()
+                if message.get("type"):
+                    query += " AND type = ?"
+                    params = (message["type"].lower(),)
+                for row in self.connection.execute(query, params).fetchall():
+                    changes.append(("delete", self.get(row["id"]), None))
+                    self.connection.execute(
+                        "DELETE FROM notes WHERE id = ?", (row["id"],)
+                    )
+            elif event in ("create", "update", "delete"):
+                note_id = message["id"]
+                if self.connection.execute(
+                    "SELECT 1 FROM outbox WHERE note_id = ?", (note_id,)
+                ).fetchone():
+                    return False
+                local = self.get(note_id)
+                local_version = (local or {}).get("version") or 0
+                if event == "delete":
+                    if local is None:
+                        return False
+                    self.connection.execute(
+                        "DELETE FROM notes WHERE id = ?", (note_id,)
+                    )
+                    changes.append(("delete", local, None))
+                else:
+                    note = message.get("note")
+                    if note is None:
+                        version = message["changes"].get("version") or 0
+                        if local is not None and local_version >= version:
+                            return False
+                        if local is None or local_version != message["base_version"]:
+                            return None
+                        note = {**local, **message["changes"]}
+                    elif local is not None and local_version >= (
+                        note.get("version") or 0
+                    ):
+                        return False
+                    self._put(note)
+                    changes.append(("update" if local else "create", note, local))
+        self._notify(changes)
+        return bool(changes)
+
+    def _put(self, note: Dict):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO notes (id, type, created, updated, data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                note["id"],
+                (note.get("type") or "").lower(),
+                note.get("created"),
+                note.get("updated"),
+                json.dumps(note, ensure_ascii=False),
+            ),
+        )
+
+    def _queue(
+        self,
+        note_id: int,
+        op: str,
+        payload: Dict,
+        base_updated: Optional[str],
+        base_version: Optional[int],
+        edited: str,
+    ):
+        """
+        노트의 대기 작업과 새 작업을 하나로 합칩니다.
+        - 생성 + 수정 = 생성, 수정 + 수정 = 수정 (처음 기준 시각/버전 유지)
+        - 생성 + 삭제 = 없음 (서버에 보낼 필요 없음), 수정 + 삭제 = 삭제
+        """
+        seq = self.connection.execute(
+            "SELECT COALESCE(MAX(seq), 0) + 1 FROM outbox"
+        ).fetchone()[0]
+        row = self.connection.execute(
+            "SELECT * FROM outbox WHERE note_id = ?", (note_id,)
+        ).fetchone()
+        if row is not None:
+            if row["op"] == "create" and op == "delete":
+                self.connection.execute(
+                    "DELETE FROM outbox WHERE note_id = ?", (note_id,)
+                )
+                return
+            if op == "update":
+                payload = {**json.loads(row["payload"]), **payload}
+                op = row["op"]
+            base_updated = row["base_updated"]
+            base_version = row["base_version"]
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO outbox "
+            "(note_id, op, payload, base_updated, base_version, edited, seq) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                note_id,
+                op,
+                json.dumps(payload, ensure_ascii=False),
+                base_updated,
+                base_version,
+                edited,
+                seq,
+            ),
+        )
+
+
+def _now() -> str:
+    # 서버와 같은 형식 (UTC, ISO 8601)
+    return datetime.utcnow().isoformat()
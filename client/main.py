@@ -1,47 +1,48 @@
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.tabbedpanel import TabbedPanel, TabbedPanelItem
-from kivy.uix.textinput import TextInput
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.checkbox import CheckBox
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.togglebutton import ToggleButton
-from kivy.uix.popup import Popup
-from kivy.config import Config
-import requests
+from kivy.core.text import DEFAULT_FONT, LabelBase
+from kivy.core.window import Window
+from kivy.clock import Clock
+import importlib
 import json
+import os
 
-from client.memo_tab import MemoTab
-from client.todo_tab import TodoTab
-from client.repository import Repository
+NETWORK_CONFIG_PATH = "config/network_config.json"
+FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "fonts")
 
-Config.set(
-    "kivy",
-    "default_font",
-    [
-        "Nanum Square Round",
-        "client/assets/fonts/NanumSquareRoundR.ttf",
-        "client/assets/fonts/NanumSquareRoundR.ttf",
-        "client/assets/fonts/NanumSquareRoundEB.ttf",
-        "client/assets/fonts/NanumSquareRoundEB.ttf",
-    ],
-)
-Config.write()
 
+def register_fonts():
+    """
+    기본 글꼴을 한글이 있는 나눔스퀘어라운드로 바꿉니다.
+    경로만 등록하고 글꼴 파일은 글자를 처음 그릴 때 읽으므로, 굵은 글꼴은 쓰기 전까지 읽지 않습니다.
+    사용자 Kivy 설정 파일(config.ini)에는 쓰지 않습니다.
+    """
+    regular = os.path.join(FONT_DIR, "NanumSquareRoundR.ttf")
+    bold = os.path.join(FONT_DIR, "NanumSquareRoundEB.ttf")
+    LabelBase.register(DEFAULT_FONT, regular, regular, bold, bold)
 
-class NoteApp(App):
-    def build(self):
 
-        with open("config/network_config.json", "r", encoding="utf-8") as f:
-            network_config = json.load(f)
+class NoteApp(App):
+    # 필터 이름 -> (탭 모듈, 탭 클래스). 탭 모듈은 탭을 처음 열 때 불러옴
+    TABS = {
+        "메모": ("client.memo_tab", "MemoTab"),
+        "일정": ("client.calendar_tab", "CalendarTab"),
+        "할 일": ("client.todo_tab", "TodoTab"),
+    }
 
-        self.repository: Repository = Repository(**network_config)
+    def build(self):
+        register_fonts()
+        self.repository = None
+        self.worker = None
 
         root = BoxLayout(orientation="vertical")
         self.tab_panel = TabbedPanel()
         self.tab_panel.do_default_tab = False
+        self.tab_panel.bind(current_tab=self.on_tab_switch)
 
         # 필터 패널 추가
         self.filter_panel = BoxLayout(
@@ -52,8 +53,52 @@ class NoteApp(App):
 
         # TabbedPanel 추가
         root.add_widget(self.tab_panel)
+
+        # 저장소 연결과 동기화는 첫 프레임을 그린 뒤 시작
+        Window.bind(on_flip=self.on_first_frame)
         return root
 
+    def on_first_frame(self, window):
+        Window.unbind(on_flip=self.on_first_frame)
+        Clock.schedule_once(lambda dt: self.start_services())
+
+    def start_services(self):
+        """
+        저장소와 작업 스레드를 만듭니다. (처음 한 번만)
+        """
+        if self.repository is not None:
+            return
+        from client.repository import Repository
+        from client.worker import Worker
+
+        with open(NETWORK_CONFIG_PATH, "r", encoding="utf-8") as f:
+            network_config = json.load(f)
+
+        self.repository = Repository(**network_config)
+        # 서버/로컬 사본 호출은 작업 스레드에서 실행해 UI가 멈추지 않게 함
+        self.worker = Worker()
+
+        # 탭을 열 때 기다리지 않도록 탭 모듈을 한 프레임에 하나씩 미리 불러옴
+        modules = [module for module, _ in self.TABS.values()]
+        Clock.schedule_once(lambda dt: self.preload_modules(modules))
+
+    def preload_modules(self, modules):
+        importlib.import_module(modules[0])
+        if modules[1:]:
+            Clock.schedule_once(lambda dt: self.preload_modules(modules[1:]))
+
+    def on_stop(self):
+        # 열린 탭의 변경 알림 구독과 예약된 탭 생성을 정리
+        for tab in self.tab_panel.tab_list:
+            if isinstance(tab, LazyTab):
+                tab.close()
+        if self.repository is None:
+            return
+        # 남은 outbox를 한 번 더 보내고 동기화 스레드와 연결 정리
+        self.worker.shutdown()
+        self.repository.sync()
+        self.repository.close()
+
     def add_filter_controls(self):
         """필터 컨트롤(보기 버튼 및 체크박스) 추가"""
         self.view_button = Button(text="보기", size_hint=(None, 1), width=100)
@@ -95,39 +140,80 @@ class NoteApp(App):
             self.remove_tab(name)
 
     def add_tab(self, name):
-        """탭 추가"""
-        if name == "메모":
-            tab = MemoTab(self.repository)
-        elif name == "일정":
-            tab = CalendarTab(self.repository)
-        elif name == "할 일":
-            tab = TodoTab(self.repository)
-        else:
+        """탭 추가 (탭 머리만 만들고 내용은 처음 열 때 만듦)"""
+        if name not in self.TABS:
             return
-        tab.text = name
+        tab = LazyTab(*self.TABS[name], text=name)
         self.tab_panel.add_widget(tab)
 
+    def on_tab_switch(self, panel, tab):
+        """처음 연 탭은 안내 문구를 먼저 그리고 다음 프레임에 내용을 만듦"""
+        if isinstance(tab, LazyTab):
+            tab.schedule_build(lambda dt: self.build_tab(tab))
+
+    def build_tab(self, tab):
+        self.start_services()
+        tab.build(self.repository, self.worker)
+
     def remove_tab(self, name):
         """탭 제거"""
         for tab in self.tab_panel.tab_list:
             if tab.text == name:
+                tab.close()
                 self.tab_panel.remove_widget(tab)
                 break
 
 
-class CalendarTab(TabbedPanelItem):
-    """일정 탭"""
+class LazyTab(TabbedPanelItem):
+    """
+    처음 열 때 탭 모듈을 불러와 내용을 만드는 탭
 
-    def __init__(self, repository, **kwargs):
+    실제 탭(MemoTab 등, 일반 위젯)은 build()에서 만들어 이 탭의 내용으로 넣으므로,
+    데이터 조회도 탭을 처음 열 때 시작됩니다.
+    """
+
+    def __init__(self, module: str, class_name: str, **kwargs):
+        """
+        Args:
+            module (str): 탭 클래스가 있는 모듈 (예: "client.memo_tab")
+            class_name (str): 탭 클래스 이름. (repository, worker)로 만들 수 있어야 합니다.
+        """
         super().__init__(**kwargs)
-        self.repository = repository
-        layout = BoxLayout()
-        self.add_widget(layout)
-        self.load_calendar()
-
-    def load_calendar(self):
-        """서버에서 일정 데이터 로드"""
-        events = self.repository.filtered_notes(type="event")
+        self.module = module
+        self.class_name = class_name
+        self.tab = None
+        self.build_event = None
+        self.closed = False
+        self.add_widget(Label(text="불러오는 중..."))
+
+    def schedule_build(self, callback):
+        """
+        다음 프레임에 callback(dt)으로 탭을 만들도록 예약합니다. 이미 만들었거나 예약했으면 무시합니다.
+        """
+        if self.tab is None and self.build_event is None and not self.closed:
+            self.build_event = Clock.schedule_once(callback)
+
+    def build(self, repository, worker):
+        """
+        실제 탭을 만들고 그 내용을 이 탭에 표시합니다. (처음 한 번만, 닫은 탭은 만들지 않음)
+        """
+        self.build_event = None
+        if self.tab is not None or self.closed:
+            return
+        tab_class = getattr(importlib.import_module(self.module), self.class_name)
+        self.tab = tab_class(repository, worker)
+        self.add_widget(self.tab)
+
+    def close(self):
+        """
+        예약된 생성을 취소하고, 만든 탭이 있으면 닫아 변경 알림 구독을 해제합니다.
+        """
+        self.closed = True
+        if self.build_event is not None:
+            self.build_event.cancel()
+            self.build_event = None
+        if self.tab is not None:
+            self.tab.close()
 
 
 if __name__ == "__main__":
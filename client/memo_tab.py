@@ -1,65 +1,176 @@
-from kivy.uix.tabbedpanel import TabbedPanelItem
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.button import Button
 from kivy.uix.textinput import TextInput
 from kivy.uix.label import Label
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.gridlayout import GridLayout
 from kivy.uix.popup import Popup
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.clock import Clock
 import requests
 import json
+from typing import Dict, List, Optional
 
 from client.repository import Repository
+from client.search import SearchIndex
+from client.worker import Worker
 
 
-class MemoTab(TabbedPanelItem):
+class MemoTab(BoxLayout):
     """메모 탭"""
 
-    def __init__(self, repository: Repository, **kwargs):
-        super().__init__(**kwargs)
-        self.repository = repository
+    # 입력이 멈춘 뒤 검색할 때까지 기다리는 시간(초)
+    SEARCH_DELAY = 0.2
 
-        layout = BoxLayout(orientation="vertical")
+    def __init__(
+        self, repository: Repository, worker: Optional[Worker] = None, **kwargs
+    ):
+        super().__init__(orientation="vertical", **kwargs)
+        self.repository = repository
+        self.worker = worker or Worker()
+        self.memos: Dict[int, Dict] = {}  # 노트 ID -> 노트
+        self.index = SearchIndex()
+        self.indexing = False
+        self.search_seq = 0  # 늦게 도착한 이전 검색 결과를 버리기 위한 번호
+        self.search_trigger = Clock.create_trigger(self.run_search, self.SEARCH_DELAY)
 
         # 상단 - 검색 바와 메모 추가 버튼
         search_add_bar = BoxLayout(size_hint_y=None, height=50)
-        self.search_bar = TextInput(hint_text="검색", size_hint_x=0.8)
+        self.search_bar = TextInput(hint_text="검색", size_hint_x=0.8, multiline=False)
+        self.search_bar.bind(text=self.on_search_text)
         self.add_button = Button(text="메모 추가", size_hint_x=0.2)
         self.add_button.bind(on_press=self.add_new_memo)
         search_add_bar.add_widget(self.search_bar)
         search_add_bar.add_widget(self.add_button)
-        layout.add_widget(search_add_bar)
+        self.add_widget(search_add_bar)
 
-        # 하단 - 메모 리스트
-        self.scroll_view = ScrollView()
-        self.memo_container = GridLayout(cols=1, spacing=10, size_hint_y=None)
-        self.memo_container.bind(minimum_height=self.memo_container.setter("height"))
-        self.scroll_view.add_widget(self.memo_container)
-        layout.add_widget(self.scroll_view)
+        # 불러오는 중/오류 안내 문구 (목록이 있으면 숨김)
+        self.status_label = Label(size_hint_y=None, height=0, opacity=0)
+        self.add_widget(self.status_label)
 
-        # 메모 데이터 로드
-        self.load_memos()
+        # 하단 - 메모 리스트: 화면에 보이는 카드만 만들고 스크롤 시 데이터만 바꿔 끼움
+        self.memo_list = RecycleView()
+        list_layout = RecycleBoxLayout(
+            orientation="vertical",
+            spacing=10,
+            default_size=(None, 50),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+        )
+        list_layout.bind(minimum_height=list_layout.setter("height"))
+        self.memo_list.add_widget(list_layout)
+        # 레이아웃을 붙인 뒤에 지정해야 행 위젯이 만들어짐
+        self.memo_list.viewclass = MemoCard
+        self.add_widget(self.memo_list)
 
-        self.add_widget(layout)
+        # 메모 데이터 로드, 이후 변경은 알림으로 검색 색인과 목록에 반영
+        self.repository.add_listener(self.on_note_changed)
+        self.load_memos()
 
     def load_memos(self):
-        """서버에서 메모 데이터 로드"""
+        """작업 스레드에서 메모 데이터 로드 (불러오는 동안 안내 문구 표시)"""
+        self.show_message("불러오는 중...")
+        self.worker.submit(
+            self.repository.get_all_notes,
+            on_result=self.show_memos,
+            on_error=lambda error: self.show_message("서버에 연결할 수 없습니다!"),
+            owner=self,
+        )
+
+    def show_memos(self, memos):
+        """메모 목록 데이터 교체 (카드 위젯은 보이는 만큼만 만들어짐)"""
+        if isinstance(memos, dict):
+            self.show_message("서버에 연결할 수 없습니다!")
+            return
+
+        self.memos = {memo["id"]: memo for memo in memos}
+        # 색인은 작업 스레드에서 만들고, 다 만들어지면 입력 중인 검색어로 다시 검색
+        self.indexing = True
+        self.worker.submit(
+            self.index.rebuild, memos, on_result=self.on_index_built, owner=self
+        )
+        if not self.search_bar.text.strip():
+            self.show_list(memos)
+
+    def on_index_built(self, result):
+        self.indexing = False
+        self.run_search()
+
+    def show_list(self, memos: List[Dict]):
+        self.show_message("")
+        self.memo_list.data = [self._card_data(memo) for memo in memos]
+
+    def on_note_changed(self, event: str, note: Dict, previous: Optional[Dict]):
+        """Repository 변경 알림: 색인은 바로 고치고 목록은 메인 스레드에서 다시 그림"""
+        self.index.apply(event, note, previous)
+        Clock.schedule_once(lambda dt: self.apply_note_change(event, note, previous))
+
+    def apply_note_change(self, event: str, note: Dict, previous: Optional[Dict]):
+        if previous is not None:
+            self.memos.pop(previous["id"], None)
+        if event == "delete":
+            self.memos.pop(note["id"], None)
+        else:
+            self.memos[note["id"]] = note
+        # 변경이 몰려도 한 번만 다시 그림
+        self.search_trigger()
+
+    def on_search_text(self, instance, text):
+        """입력할 때마다 검색을 미뤄 입력이 멈췄을 때 한 번만 검색 (debounce)"""
+        self.search_trigger.cancel()
+        self.search_trigger()
+
+    def run_search(self, dt=None):
+        """검색어로 메모를 찾아 순위대로 표시 (검색어가 없으면 전체 목록)"""
+        self.search_seq += 1
+        query = self.search_bar.text.strip()
+        if not query:
+            self.show_list(list(self.memos.values()))
+            return
+        seq = self.search_seq
+        self.worker.submit(
+            self.index.search,
+            query,
+            on_result=lambda note_ids: self.show_search_results(seq, note_ids),
+            owner=self,
+        )
+
+    def show_search_results(self, seq: int, note_ids: List[int]):
+        if seq != self.search_seq:
+            return  # 그 사이 검색어가 바뀜
+        memos = [self.memos[note_id] for note_id in note_ids if note_id in self.memos]
+        self.show_list(memos)
+        if not memos:
+            self.show_message(
+                "검색 준비 중..." if self.indexing else "검색 결과가 없습니다."
+            )
 
-        memos = self.repository.get_all_notes()
-        for memo in memos:
-            self.add_memo_card(memo["name"], memo["content"])
+    def show_message(self, text):
+        """목록 위에 안내 문구 표시 (빈 문자열이면 숨김)"""
+        self.status_label.text = text
+        self.status_label.height = 50 if text else 0
+        self.status_label.opacity = 1 if text else 0
 
-    def add_memo_card(self, name, content):
+    def close(self):
+        """탭을 닫을 때 진행 중인 로드/검색/요약 스트림을 취소하고 변경 알림 구독을 해제"""
+        self.repository.remove_listener(self.on_note_changed)
+        self.search_trigger.cancel()
+        self.worker.cancel(self)
+
+    def add_memo_card(self, name, content, note_id=None, note_type="memo"):
         """메모 카드 추가"""
-        card = Button(text=name, size_hint_y=None, height=50)
-        card.bind(on_press=lambda instance: self.show_popup(name, content))
-        self.memo_container.add_widget(card)
+        memo = {"id": note_id, "type": note_type, "name": name, "content": content}
+        if note_id is not None:
+            self.memos[note_id] = memo
+            self.index.add(memo)
+        self.memo_list.data.append(self._card_data(memo))
+
+    def _card_data(self, memo):
+        return {"text": memo["name"], "note": memo, "tab": self}
 
     def add_new_memo(self, instance):
         """새 메모 추가"""
-        popup_content = MemoView(
-            note_url=self.note_url, repository=self.repository, parent_tab=self
-        )
+        popup_content = MemoView(repository=self.repository, parent_tab=self)
         popup = Popup(
             title="새 메모 추가",
             content=popup_content,
@@ -68,18 +179,88 @@ class MemoTab(TabbedPanelItem):
         popup_content.popup = popup
         popup.open()
 
-    def show_popup(self, name, content):
+    def show_popup(self, name, content, note_id=None, note_type="memo"):
         """팝업으로 메모 내용 보기"""
-        popup = Popup(title=name, content=Label(text=content), size_hint=(0.8, 0.8))
+        layout = BoxLayout(orientation="vertical")
+        layout.add_widget(Label(text=content))
+
+        if note_id is not None:
+            summary_label = Label(text="", size_hint_y=None, height=100)
+            summary_button = Button(text="요약", size_hint_y=None, height=50)
+            summary_button.bind(
+                on_press=lambda instance: self.stream_summary(
+                    note_id, note_type, summary_label, instance
+                )
+            )
+            layout.add_widget(summary_label)
+            layout.add_widget(summary_button)
+
+        popup = Popup(title=name, content=layout, size_hint=(0.8, 0.8))
         popup.open()
 
+    def stream_summary(self, note_id, note_type, summary_label, button):
+        """요약을 토큰 단위로 받아 팝업에 바로 표시 (탭을 닫으면 스트림을 멈춤)"""
+        button.disabled = True
+        summary_label.text = ""
+
+        def append(text):
+            # 탭이 닫힌 뒤 도착한 토큰은 버림
+            if self.worker.busy(self):
+                summary_label.text += text
+
+        def run():
+            streamed = False
+            events = self.repository.interact_stream(note_id, note_type, "summarize")
+            try:
+                for event in events:
+                    if not self.worker.busy(self):
+                        return  # close()로 취소됨: 남은 스트림은 읽지 않음
+                    if "token" in event:
+                        streamed = True
+                        Clock.schedule_once(lambda dt, t=event["token"]: append(t))
+                    elif "done" in event:
+                        # 캐시된 결과는 토큰 없이 한 번에 도착 (실패한 경우 오류 이벤트가 먼저 옴)
+                        if not streamed and "result" in event:
+                            summary = event["result"].get("summary", "")
+                            Clock.schedule_once(lambda dt: append(summary))
+                    elif "error" in event:
+                        Clock.schedule_once(lambda dt, e=event["error"]: append(e))
+            finally:
+                events.close()
+
+        def finished(result):
+            button.disabled = False
+
+        def failed(error):
+            print(f"요약 실패: {error!r}")
+            button.disabled = False
+
+        self.worker.submit(run, on_result=finished, on_error=failed, owner=self)
+
+
+class MemoCard(RecycleDataViewBehavior, Button):
+    """메모 카드: RecycleView가 스크롤할 때마다 다른 메모 데이터로 다시 씁니다."""
+
+    def __init__(self, **kwargs):
+        self.note = None
+        self.tab = None
+        super().__init__(**kwargs)
+
+    def on_press(self):
+        if self.note is not None:
+            self.tab.show_popup(
+                self.note["name"],
+                self.note["content"],
+                self.note.get("id"),
+                self.note.get("type", "memo"),
+            )
+
 
 class MemoView(BoxLayout):
     """메모 추가/수정 뷰"""
 
-    def __init__(self, note_url, repository: Repository, parent_tab, **kwargs):
+    def __init__(self, repository: Repository, parent_tab, **kwargs):
         super().__init__(orientation="vertical", **kwargs)
-        self.note_url = note_url
         self.repository = repository
         self.parent_tab = parent_tab
         self.popup = None  # 부모 팝업을 참조하기 위해 설정
@@ -119,25 +300,21 @@ class MemoView(BoxLayout):
             print("제목과 내용을 입력하세요!")
             return
 
-        # 서버로 데이터 전송
-        try:
-            self.repository.new_note(
-                **{
-                    "name": name,
-                    "type": "memo",
-                    "content": content,
-                    "tags": [tag.strip() for tag in tags.split(",")],
-                }
-            )
-            response = requests.post(
-                f"{self.note_url}",
-                json={"name": name, "type": "memo", "content": content},
-            )
-            if response.status_code == 201:
-                print("메모가 저장되었습니다!")
-                self.parent_tab.add_memo_card(name, content)
-                self.popup.dismiss()
-            else:
+        def saved(result):
+            if "error" in result:
                 print("메모 저장 실패!")
-        except requests.exceptions.ConnectionError:
-            print("서버에 연결할 수 없습니다!")
+                return
+            print("메모가 저장되었습니다!")
+            self.parent_tab.add_memo_card(name, content, result.get("id"))
+            self.popup.dismiss()
+
+        # 로컬 사본에 저장하면 서버와는 백그라운드에서 동기화
+        self.parent_tab.worker.submit(
+            self.repository.new_note,
+            name=name,
+            type="memo",
+            content=content,
+            tags=[tag.strip() for tag in tags.split(",") if tag.strip()],
+            on_result=saved,
+            owner=self.parent_tab,
+        )
@@ -0,0 +1,75 @@
+from bisect import bisect_left
+from typing import Dict, List, Set
+
+
+def reconcile(data: List[Dict], rows: List[Dict], key: str = "key") -> Dict[str, int]:
+    """
+    RecycleView.data를 새 행 목록과 같아지도록 바뀐 행만 고칩니다.
+
+    행은 key 값으로 짝을 맞춥니다. 새 목록에 없는 행은 지우고, 없던 행은 끼워 넣고,
+    순서가 어긋난 행만 옮기며, 내용이 달라진 행만 바꿔 씁니다.
+    data가 ObservableList이면 연산마다 RecycleView에 바뀐 위치만 알려지므로
+    전체 목록을 다시 대입할 때처럼 모든 행이 새로 그려지지 않습니다.
+
+    Args:
+        data (list): 현재 행 목록 (RecycleView.data). 제자리에서 고칩니다.
+        rows (list): 새 행 목록. 각 행은 key 값이 목록 안에서 유일해야 합니다.
+        key (str): 행을 식별하는 키 이름
+    Returns:
+        dict: {"inserted", "moved", "updated", "removed"} 연산 수
+    """
+    stats = {"inserted": 0, "moved": 0, "updated": 0, "removed": 0}
+    wanted = {row[key] for row in rows}
+
+    # 뒤에서부터 지워야 남은 행의 위치가 바뀌지 않음
+    for index in range(len(data) - 1, -1, -1):
+        if data[index][key] not in wanted:
+            del data[index]
+            stats["removed"] += 1
+
+    # 새 순서에서도 순서가 유지되는 가장 긴 행 묶음은 그대로 두고 나머지만 옮김
+    new_index = {row[key]: index for index, row in enumerate(rows)}
+    stay = _longest_increasing([new_index[row[key]] for row in data])
+    moving = set()
+    for index in range(len(data) - 1, -1, -1):
+        if new_index[data[index][key]] not in stay:
+            moving.add(data.pop(index)[key])
+
+    for index, row in enumerate(rows):
+        if index < len(data) and data[index][key] == row[key]:
+            if data[index] != row:
+                data[index] = row
+                stats["updated"] += 1
+            continue
+        if row[key] in moving:
+            stats["moved"] += 1
+        else:
+            stats["inserted"] += 1
+        data.insert(index, row)
+
+    return stats
+
+
+def _longest_increasing(values: List[int]) -> Set[int]:
+    """
+    values에서 가장 긴 증가 부분 수열의 값 집합 (O(n log n))
+    """
+    tails: List[int] = []  # 길이별 마지막 값
+    tail_at: List[int] = []  # 길이별 마지막 값의 위치
+    previous = [-1] * len(values)
+    for position, value in enumerate(values):
+        length = bisect_left(tails, value)
+        if length == len(tails):
+            tails.append(value)
+            tail_at.append(position)
+        else:
+            tails[length] = value
+            tail_at[length] = position
+        previous[position] = tail_at[length - 1] if length else -1
+
+    result = set()
+    position = tail_at[-1] if tail_at else -1
+    while position >= 0:
+        result.add(values[position])
+        position = previous[position]
+    return result
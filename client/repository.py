@@ -1,15 +1,48 @@
 import requests
 import logging
-from typing import Optional, List, Dict, Union
+import json
+import math
+import re
+import threading
+import time
+from collections import deque
+from typing import Optional, List, Dict, Union, Iterator, Deque, Callable
 from datetime import datetime
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from lib.http_helper import HTTPStatus
+from client.local_store import LocalStore
+
+# 지연 시간 통계에서 노트 ID를 묶기 위한 패턴 (/notes/3 -> /notes/<id>)
+ID_PATTERN = re.compile(r"/\d+")
 
 
 class Repository:
     """서버와 통신을 담당하는 Repository 클래스"""
 
-    def __init__(self, protocol: str, host: str, port: int):
+    # 재시도해도 서버 상태가 한 번 호출한 것과 같은 메서드
+    IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "PUT", "DELETE", "OPTIONS"])
+
+    def __init__(
+        self,
+        protocol: str,
+        host: str,
+        port: int,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 30.0,
+        stream_read_timeout: Optional[float] = 300.0,
+        retries: int = 3,
+        backoff_factor: float = 0.2,
+        stats_window: int = 1000,
+        local_store: Optional[str] = None,
+        sync_interval: float = 30.0,
+        write_delay: float = 0.5,
+        push: bool = True,
+        push_wait: float = 25.0,
+    ):
         """
         초기화 메서드
 
@@ -17,11 +50,118 @@ class Repository:
             protocol (str): 프로토콜 (예: "http")
             host (str): 서버 호스트명
             port (int): 서버 포트 번호
+            pool_size (int): 서버와 유지할 keep-alive 연결 수
+            connect_timeout (float): 연결 제한 시간(초)
+            read_timeout (float): 응답 대기 제한 시간(초)
+            stream_read_timeout (float): LLM 스트림에서 다음 데이터를 기다리는 제한 시간(초).
+                CPU 모델은 첫 토큰까지 오래 걸릴 수 있어 read_timeout보다 길게 둡니다. None이면 제한 없음
+            retries (int): 멱등 요청(GET/PUT/DELETE)의 최대 재시도 횟수
+            backoff_factor (float): 재시도 간격 (backoff_factor * 2^(n-1)초)
+            stats_window (int): 엔드포인트별로 보관할 최근 지연 시간 수
+            local_store (str): 로컬 사본 SQLite 경로. 지정하면 읽기/쓰기를 로컬에서 처리하고
+                               백그라운드에서 서버와 동기화합니다. (오프라인 사용 가능)
+            sync_interval (float): 백그라운드 동기화 간격(초). 0이면 sync()를 직접 호출해야 합니다.
+            write_delay (float): 로컬 쓰기 후 동기화까지 기다리는 시간(초). 그 사이 같은 노트의
+                                 연속된 변경(예: 체크박스 연타)은 outbox에서 요청 하나로 합쳐집니다.
+            push (bool): 백그라운드 동기화를 쓸 때 서버 변경 푸시(/notes/events)를 받아 바로 반영합니다.
+                         푸시를 받는 동안 주기적 동기화는 outbox만 보내고 전체 목록을 다시 받지 않습니다.
+                         서버가 푸시 요청을 받을 수 없으면(503) 다시 주기적 동기화로 전체 목록을 받습니다.
+            push_wait (float): 푸시 요청 하나가 서버에서 새 변경을 기다리는 최대 시간(초, long polling)
         """
         self.protocol = protocol
         self.host = host
         self.port = port
         self.server = f"{protocol}://{host}:{port}"
+        self.timeout = (connect_timeout, read_timeout)
+        self.stream_timeout = (connect_timeout, stream_read_timeout)
+
+        # 노트 생성/LLM 요청(POST)은 중복 실행될 수 있으므로 재시도하지 않음
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=self.IDEMPOTENT_METHODS,
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # 푸시(long polling)는 별도 연결로 보내고 재시도하지 않음:
+        # 서버가 바빠 503을 주면 Retry-After만큼 막히지 않고 바로 주기적 동기화로 돌아감
+        events_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+        self.events_session = requests.Session()
+        self.events_session.mount("http://", events_adapter)
+        self.events_session.mount("https://", events_adapter)
+        self.push_wait = push_wait
+
+        self.stats_window = stats_window
+        self.latencies: Dict[str, Deque[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.stats_lock = threading.Lock()
+
+        self.store = LocalStore(local_store) if local_store else None
+        self.online: Optional[bool] = None
+        self.conflicts = 0
+        self.write_delay = write_delay
+        self.sync_lock = threading.Lock()
+        self.sync_event = threading.Event()
+        self.closed = threading.Event()
+        # 서버 변경 푸시: 마지막으로 받은 메시지의 토큰 (재연결 시 놓친 변경만 받음)
+        self.events_token: Optional[str] = None
+        self.events_response: Optional[requests.Response] = None
+        self.pushing = False
+        # 푸시 중 받은 "reset": 다음 동기화에서 전체 목록을 다시 받음
+        self.resync = threading.Event()
+        self.sync_thread = None
+        self.events_thread = None
+        if self.store and sync_interval > 0:
+            self.sync_thread = threading.Thread(
+                target=self._sync_loop, args=(sync_interval,), daemon=True
+            )
+            self.sync_thread.start()
+        if self.store and sync_interval > 0 and push:
+            self.events_thread = threading.Thread(
+                target=self._events_loop, args=(sync_interval,), daemon=True
+            )
+            self.events_thread.start()
+
+    def close(self):
+        """
+        동기화를 멈추고 유지 중인 연결을 모두 닫습니다.
+        """
+        self.closed.set()
+        self.sync_event.set()
+        if self.sync_thread:
+            self.sync_thread.join()
+        # 기다리는 중인 푸시 요청을 닫으면 푸시 스레드도 끝남 (데몬 스레드)
+        if self.events_response is not None:
+            self.events_response.close()
+        with self.sync_lock:
+            if self.store:
+                self.store.close()
+        self.session.close()
+        self.events_session.close()
+
+    def add_listener(self, listener: Callable[[str, Dict, Optional[Dict]], None]):
+        """
+        노트 변경 리스너를 등록합니다. 로컬 쓰기와 서버 동기화로 로컬 사본이 바뀔 때마다
+        (event, note, previous) 형태로 호출됩니다. (LocalStore.add_listener 참고)
+        동기화 스레드에서도 호출되므로 UI는 Clock으로 메인 스레드에 넘겨야 합니다.
+        로컬 사본 없이 서버에 직접 요청하는 경우에는 알림이 없습니다.
+        """
+        if self.store:
+            self.store.add_listener(listener)
+
+    def remove_listener(self, listener: Callable[[str, Dict, Optional[Dict]], None]):
+        if self.store:
+            self.store.remove_listener(listener)
 
     def _build_url(self, endpoint: str) -> str:
         """
@@ -34,6 +174,68 @@ class Repository:
         """
         return f"{self.server}{endpoint}"
 
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        session: Optional[requests.Session] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        세션으로 요청을 보내고 지연 시간을 기록합니다.
+
+        Args:
+            method (str): HTTP 메서드 ("get", "post", "put", "delete")
+            endpoint (str): API 엔드포인트
+            session (requests.Session): 요청을 보낼 세션. None이면 self.session
+            **kwargs: requests에 넘길 인자 (json, params, stream 등)
+        Returns:
+            requests.Response: 서버 응답 객체
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        key = f"{method.upper()} {ID_PATTERN.sub('/<id>', endpoint)}"
+        start = time.perf_counter()
+        try:
+            return getattr(session or self.session, method)(
+                self._build_url(endpoint), **kwargs
+            )
+        except requests.exceptions.RequestException:
+            with self.stats_lock:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.stats_lock:
+                self.latencies.setdefault(key, deque(maxlen=self.stats_window)).append(
+                    elapsed
+                )
+
+    def latency_stats(self) -> Dict[str, Dict]:
+        """
+        엔드포인트별 최근 요청의 지연 시간 통계
+
+        Returns:
+            dict: {"GET /notes/<id>": {"count", "errors", "mean_ms", "p50_ms", "p95_ms", "max_ms"}, ...}
+        """
+        with self.stats_lock:
+            snapshot = {key: sorted(values) for key, values in self.latencies.items()}
+            errors = dict(self.errors)
+
+        def at(values: List[float], p: float) -> float:
+            return values[max(1, math.ceil(p / 100 * len(values))) - 1]
+
+        return {
+            key: {
+                "count": len(values),
+                "errors": errors.get(key, 0),
+                "mean_ms": round(sum(values) / len(values) * 1000, 3),
+                "p50_ms": round(at(values, 50) * 1000, 3),
+                "p95_ms": round(at(values, 95) * 1000, 3),
+                "max_ms": round(values[-1] * 1000, 3),
+            }
+            for key, values in snapshot.items()
+        }
+
     def _handle_response(
         self, response: requests.Response, success_message: str
     ) -> Union[Dict, List, None]:
@@ -72,8 +274,12 @@ class Repository:
         Returns:
             dict: 생성된 노트 정보
         """
+        if self.store:
+            note = self.store.create(kwargs)
+            self.sync_event.set()
+            return {"message": "Note created locally", "id": note["id"]}
         try:
-            response = requests.post(self._build_url("/notes"), json=kwargs)
+            response = self._request("post", "/notes", json=kwargs)
             return self._handle_response(response, f"Success: New {kwargs.get('type')}")
         except requests.exceptions.RequestException as e:
             logging.error(f"Failed to create note: {e}")
@@ -88,8 +294,10 @@ class Repository:
         Returns:
             dict: 노트 정보
         """
+        if self.store:
+            return self.store.get(note_id) or {"error": "Note not found"}
         try:
-            response = requests.get(self._build_url(f"/notes/{note_id}"))
+            response = self._request("get", f"/notes/{note_id}")
             return self._handle_response(response, f"Retrieved note with ID {note_id}")
         except requests.exceptions.RequestException as e:
             logging.error(f"Failed to retrieve note: {e}")
@@ -102,8 +310,10 @@ class Repository:
         Returns:
             list: 노트 리스트
         """
+        if self.store:
+            return self.store.all()
         try:
-            response = requests.get(self._build_url("/notes"))
+            response = self._request("get", "/notes")
             return self._handle_response(response, "Retrieved all notes")
         except requests.exceptions.RequestException as e:
             logging.error(f"Failed to retrieve all notes: {e}")
@@ -117,6 +327,8 @@ class Repository:
         updated_start: Optional[datetime] = None,
         updated_end: Optional[datetime] = None,
         tags: Optional[List[str]] = None,
+        date_start: Optional[datetime] = None,
+        date_end: Optional[datetime] = None,
     ) -> List[Dict]:
         """
         필터 조건을 기반으로 노트를 가져옵니다.
@@ -128,10 +340,24 @@ class Repository:
             updated_start (datetime): 선택, 업데이트 시작일.
             updated_end (datetime): 선택, 업데이트 종료일.
             tags (List[str]): 선택, 태그 리스트.
+            date_start (datetime): 선택, 일정 시작일 (event 타입만).
+            date_end (datetime): 선택, 일정 종료일 (event 타입만).
 
         Returns:
             list: 필터링된 노트 리스트
         """
+        if self.store:
+            return self.store.filter(
+                note_type,
+                created_start.isoformat() if created_start else None,
+                created_end.isoformat() if created_end else None,
+                updated_start.isoformat() if updated_start else None,
+                updated_end.isoformat() if updated_end else None,
+                tags,
+                date_start.isoformat() if date_start else None,
+                date_end.isoformat() if date_end else None,
+            )
+
         filter_params = {"type": note_type}
         if created_start and created_end:
             filter_params.update(
@@ -147,13 +373,18 @@ class Repository:
                     "updated_end": updated_end.isoformat(),
                 }
             )
+        if date_start and date_end:
+            filter_params.update(
+                {
+                    "date_start": date_start.isoformat(),
+                    "date_end": date_end.isoformat(),
+                }
+            )
         if tags:
             filter_params["tags"] = ",".join(tags)
 
         try:
-            response = requests.get(
-                self._build_url("/notes/filter"), params=filter_params
-            )
+            response = self._request("get", "/notes/filter", params=filter_params)
             return self._handle_response(
                 response, "Filtered notes retrieved successfully"
             )
@@ -171,10 +402,15 @@ class Repository:
         Returns:
             dict: 업데이트된 노트 정보
         """
+        if self.store:
+            if self.store.update(note_id, kwargs) is None:
+                return {"error": "Note not found"}
+            self.sync_event.set()
+            return {"message": "Note updated successfully"}
         try:
             if "id" in kwargs:
                 kwargs.update({"id": note_id})
-            response = requests.put(self._build_url(f"/notes/{note_id}"), json=kwargs)
+            response = self._request("put", f"/notes/{note_id}", json=kwargs)
             return self._handle_response(response, f"Updated note with ID {note_id}")
         except requests.exceptions.RequestException as e:
             logging.error(f"Failed to update note: {e}")
@@ -189,8 +425,13 @@ class Repository:
         Returns:
             dict: 삭제 결과
         """
+        if self.store:
+            if not self.store.delete(note_id):
+                return {"error": "Note not found"}
+            self.sync_event.set()
+            return {"message": "Note deleted successfully"}
         try:
-            response = requests.delete(self._build_url(f"/notes/{note_id}"))
+            response = self._request("delete", f"/notes/{note_id}")
             return self._handle_response(response, f"Deleted note with ID {note_id}")
         except requests.exceptions.RequestException as e:
             logging.error(f"Failed to delete note: {e}")
@@ -203,13 +444,110 @@ class Repository:
         Returns:
             dict: 삭제 결과
         """
+        if self.store:
+            for note in self.store.all():
+                self.store.delete(note["id"])
+            self.sync_event.set()
+            return {"message": "Note deleted successfully"}
         try:
-            response = requests.delete(self._build_url("/notes"))
+            response = self._request("delete", "/notes")
             return self._handle_response(response, "Deleted all notes")
         except requests.exceptions.RequestException as e:
             logging.error(f"Failed to delete all notes: {e}")
             return {"error": "Connection error"}
 
+    def interact(self, note_id: int, note_type: str, action: str) -> Optional[Dict]:
+        """
+        노트에 대해 LLM 액션 수행
+
+        Args:
+            note_id (int): 노트 ID
+            note_type (str): 노트 타입 ("memo", "event", "task")
+            action (str): LLM 액션 (예: "summarize")
+        Returns:
+            dict: LLM 처리 결과
+        """
+        if note_id < 0:
+            return {"error": "Note is not synced yet"}
+        try:
+            response = self._request(
+                "post",
+                "/interact",
+                json={"note_id": note_id, "type": note_type, "action": action},
+            )
+            return self._handle_response(response, f"{action} on note {note_id}")
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Failed to interact with LLM: {e}")
+            return {"error": "Connection error"}
+
+    def interact_notes(
+        self,
+        action: str,
+        note_type: Optional[str] = None,
+        filters: Optional[Dict] = None,
+        query: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """
+        여러 노트에 대해 LLM 액션 수행 (예: 이번 주 노트 요약)
+
+        Args:
+            action (str): 여러 노트 액션 (예: "summarize_notes")
+            note_type (str): 노트 타입. None이면 모든 타입
+            filters (dict): /notes/filter와 같은 조건 (예: {"updated_start": ..., "updated_end": ...})
+            query (str): 관련 노트를 우선할 질의
+        Returns:
+            dict: {"summary": ..., "notes": [...], "omitted": ...}
+        """
+        payload = {"action": action, "filters": filters or {}}
+        if note_type:
+            payload["type"] = note_type
+        if query:
+            payload["query"] = query
+        try:
+            response = self._request("post", "/interact/notes", json=payload)
+            return self._handle_response(response, f"{action} on notes")
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Failed to interact with LLM: {e}")
+            return {"error": "Connection error"}
+
+    def interact_stream(
+        self, note_id: int, note_type: str, action: str
+    ) -> Iterator[Dict]:
+        """
+        LLM 액션 결과를 토큰 단위로 받아오기 (Server-Sent Events)
+
+        Args:
+            note_id (int): 노트 ID
+            note_type (str): 노트 타입 ("memo", "event", "task")
+            action (str): LLM 액션 (예: "summarize")
+        Yields:
+            dict: {"token": "..."} 토큰 이벤트, 마지막으로 {"done": True, "result": {...}}.
+                  서버에서 생성이 실패하면 {"error": "..."} 뒤에 {"done": True, "error": "..."},
+                  연결 오류 시 {"error": "..."} 이벤트 하나를 반환합니다.
+        """
+        if note_id < 0:
+            yield {"error": "Note is not synced yet"}
+            return
+        try:
+            with self._request(
+                "post",
+                "/interact/stream",
+                json={"note_id": note_id, "type": note_type, "action": action},
+                stream=True,
+                timeout=self.stream_timeout,
+            ) as response:
+                if response.status_code not in range(200, 300):
+                    yield self._handle_response(response, "")
+                    return
+
+                response.encoding = "utf-8"
+                for line in response.iter_lines(decode_unicode=True):
+                    if line and line.startswith("data:"):
+                        yield json.loads(line[len("data:") :].strip())
+        except requests.exceptions.RequestException as e:
+            logging.error(f"Failed to stream LLM response: {e}")
+            yield {"error": "Connection error"}
+
     def ping(self) -> Optional[Dict]:
         """
         서버 상태 확인
@@ -218,8 +556,242 @@ class Repository:
             dict: 서버 상태
         """
         try:
-            response = requests.get(self._build_url("/ping"))
+            response = self._request("get", "/ping")
             return self._handle_response(response, "Server is reachable")
         except requests.exceptions.RequestException as e:
             logging.error(f"Failed to ping server: {e}")
             return {"error": "Connection error"}
+
+    def sync(self, pull: bool = True) -> bool:
+        """
+        outbox의 변경을 서버로 보내고, 서버의 노트 목록을 로컬 사본에 반영합니다.
+
+        Args:
+            pull (bool): False이면 outbox만 보내고 서버의 노트 목록은 받지 않습니다.
+        Returns:
+            bool: 서버와 동기화했으면 True, 서버에 연결할 수 없으면 False
+        """
+        if not self.store:
+            return False
+        with self.sync_lock:
+            try:
+                if self.closed.is_set():
+                    return False
+                for entry in self.store.pending():
+                    if not self._push(entry):
+                        self.online = True
+                        return False
+                if not pull:
+                    self.online = True
+                    return True
+                response = self._request("get", "/notes")
+                if response.status_code not in range(200, 300):
+                    logging.error(f"Sync failed: {response.status_code}")
+                    self.online = True
+                    return False
+                changed = self.store.merge(response.json())
+                logging.info(f"Synced with server ({changed} local changes)")
+                self.online = True
+                return True
+            except requests.exceptions.RequestException as e:
+                if self.online is not False:
+                    logging.warning(f"Server unreachable, working offline: {e}")
+                self.online = False
+                return False
+
+    def _sync_loop(self, interval: float):
+        while not self.closed.is_set():
+            # 푸시를 받는 동안에는 서버 변경이 이미 반영되어 있음
+            pull = not self.pushing or self.resync.is_set()
+            self.resync.clear()
+            self.sync(pull=pull)
+            written = self.sync_event.wait(interval)
+            self.sync_event.clear()
+            # write-behind: 쓰기가 write_delay 동안 멈출 때까지(최대 interval) 모아서 보냄
+            deadline = time.monotonic() + interval
+            while (
+                written
+                and not self.closed.is_set()
+                and time.monotonic() < deadline
+                and self.sync_event.wait(self.write_delay)
+            ):
+                self.sync_event.clear()
+
+    def _events_loop(self, interval: float):
+        """
+        서버 변경 푸시를 long polling으로 계속 받습니다. 요청이 실패하면 간격을 interval까지
+        늘려 가며 다시 시도하고, 서버가 바빠 거절하면(503) interval 뒤에 다시 시도합니다.
+        그동안은 주기적 동기화가 전체 목록을 받습니다.
+        (서버가 /notes/events를 지원하지 않으면 주기적 동기화만으로 동작합니다.)
+        """
+        delay = 1.0
+        while not self.closed.is_set():
+            try:
+                if self._poll_events():
+                    delay = 1.0
+                    continue
+                wait = interval
+            except Exception as e:
+                if not self.closed.is_set():
+                    logging.info(f"Note events unavailable, retrying in {delay}s: {e}")
+                wait, delay = delay, min(delay * 2, interval)
+            finally:
+                self.events_response = None
+            self.pushing = False
+            self.closed.wait(wait)
+
+    def _poll_events(self) -> bool:
+        """
+        /notes/events에 long polling 요청 하나를 보내고 받은 변경을 로컬 사본에 반영합니다.
+
+        Returns:
+            bool: 다음 요청을 바로 보내도 되면 True. 서버가 바빠 거절했거나 동기화에 실패하면 False
+        """
+        params = {"wait": self.push_wait}
+        if self.events_token:
+            params["since"] = self.events_token
+        with self._request(
+            "get",
+            "/notes/events",
+            session=self.events_session,
+            params=params,
+            stream=True,
+            timeout=(self.timeout[0], self.push_wait + self.timeout[1]),
+        ) as response:
+            self.events_response = response
+            if response.status_code == HTTPStatus.SERVICE_UNAVAILABLE:
+                logging.info("Note events busy, falling back to periodic sync")
+                return False
+            if response.status_code not in range(200, 300):
+                raise requests.exceptions.HTTPError(
+                    f"{response.status_code} {response.reason}", response=response
+                )
+            result = response.json()
+
+        events = result.get("events", [])
+        reset = result.get("reset") or any(
+            message.get("event") == "reset" for message in events
+        )
+        if self.events_token is None or reset:
+            if self.pushing:
+                # 푸시 중 reset (대량 가져오기 등): 이어지는 reset을 모아 한 번만 다시 받음
+                self.resync.set()
+                self.sync_event.set()
+            elif not self.sync():
+                # 처음이거나 놓친 변경을 알 수 없으면 전체 목록을 받은 뒤에 푸시를 믿음
+                return False
+        else:
+            for message in events:
+                self._apply_event(message)
+        self.events_token = result["token"]
+        self.pushing = True
+        return True
+
+    def _apply_event(self, message: Dict):
+        """
+        변경 메시지 하나를 로컬 사본에 반영합니다. 바뀐 필드만 와서 반영할 수 없으면 노트를 받아 옵니다.
+        동기화와 겹치지 않도록 sync_lock 안에서 처리합니다.
+        """
+        with self.sync_lock:
+            if self.closed.is_set():
+                return
+            if self.store.apply_event(message) is None:
+                note = self._fetch(message["id"])
+                if note is not None:
+                    self.store.apply_event({**message, "note": note})
+
+    def _push(self, entry: Dict) -> bool:
+        """
+        outbox 작업 하나를 서버로 보냅니다.
+        수정/삭제는 기준 시점 이후 서버에서도 바뀐 경우 `updated`가 더 늦은 쪽을 따릅니다.
+
+        Returns:
+            bool: 계속 다음 작업을 보내도 되면 True (서버 오류면 False)
+        """
+        note_id, op = entry["note_id"], entry["op"]
+        # 시각은 서버가 기록
+        payload = {
+            key: value
+            for key, value in entry["payload"].items()
+            if key not in ("id", "created", "updated")
+        }
+
+        if op == "create":
+            response = self._request("post", "/notes", json=payload)
+            if response.status_code >= 500:
+                return False
+            if response.status_code not in range(200, 300):
+                logging.error(f"Server rejected new note: {response.text}")
+                self.store.reject(entry)
+                return True
+            server_note = self._fetch(response.json()["id"])
+            self.store.complete(entry, server_note)
+            return True
+        if op == "update":
+            return self._patch(entry, payload)
+
+        server_note = self._fetch(note_id)
+        if server_note is None:
+            # 서버에서 이미 지워진 노트: 다음 merge에서 로컬 사본도 지워짐
+            self.store.reject(entry)
+            return True
+        if (
+            server_note.get("updated") != entry["base_updated"]
+            and (server_note.get("updated") or "") > entry["edited"]
+        ):
+            logging.warning(f"Conflict on note {note_id}: keeping newer server version")
+            self.conflicts += 1
+            self.store.complete(entry, server_note)
+            return True
+
+        response = self._request("delete", f"/notes/{note_id}")
+        if response.status_code >= 500:
+            return False
+        if response.status_code not in range(200, 300):
+            self.store.reject(entry)
+            return True
+        self.store.complete(entry)
+        return True
+
+    def _patch(self, entry: Dict, payload: Dict) -> bool:
+        """
+        수정 작업을 PATCH 한 번으로 보냅니다. 바뀐 필드만 보내고, 기준 버전(base_version)이
+        서버와 다르면 서버가 409와 현재 노트를 돌려주므로 그때만 충돌을 판단합니다.
+        """
+        note_id = entry["note_id"]
+        response = self._request(
+            "patch",
+            f"/notes/{note_id}",
+            json={"changes": payload, "version": entry.get("base_version")},
+        )
+        if response.status_code == 409:
+            server_note = response.json()["note"]
+            if (server_note.get("updated") or "") > entry["edited"]:
+                logging.warning(
+                    f"Conflict on note {note_id}: keeping newer server version"
+                )
+                self.conflicts += 1
+                self.store.complete(entry, server_note)
+                return True
+            # 로컬 수정이 더 나중: 서버의 현재 버전을 기준으로 다시 보냄
+            response = self._request(
+                "patch",
+                f"/notes/{note_id}",
+                json={"changes": payload, "version": server_note.get("version")},
+            )
+        if response.status_code >= 500 or response.status_code == 409:
+            return False
+        if response.status_code not in range(200, 300):
+            # 서버에서 지워졌거나 거부된 수정: 다음 merge에서 서버 상태로 되돌아감
+            logging.error(f"Server rejected update of note {note_id}: {response.text}")
+            self.store.reject(entry)
+            return True
+        self.store.complete(entry, response.json())
+        return True
+
+    def _fetch(self, note_id: int) -> Optional[Dict]:
+        response = self._request("get", f"/notes/{note_id}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
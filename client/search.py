@@ -0,0 +1,254 @@
+import re
+import sys
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 단어 분리: 한글/영문/숫자 연속 구간
+WORD_PATTERN = re.compile(r"\w+")
+
+HANGUL_START, HANGUL_END = 0xAC00, 0xD7A3
+# 한글 호환 자모 초성 (입력 중인 "회ㅇ" 같은 질의 처리용)
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+
+
+class SearchIndex:
+    """
+    메모 검색용 메모리 역색인
+
+    - 노트의 name/content/tags를 단어로 나눠 색인합니다. 필드별 가중치로 순위를 매깁니다.
+    - 단어 접두사로 찾습니다. ("회의" -> "회의록")
+    - 띄어쓰기 없이 붙여 쓰는 한국어를 위해 한글 단어는 두 글자 n-gram도 색인해
+      단어 중간도 찾습니다. ("주간회의록" <- "회의")
+    - 마지막 글자가 입력 중인 초성이면 다음 글자의 초성으로 맞춥니다. ("회ㅇ" -> "회의")
+    - add/remove로 노트 하나씩 갱신하며, 여러 스레드에서 써도 됩니다.
+      rebuild 도중 apply로 들어온 변경은 새 색인으로 바꾼 뒤 다시 적용하므로 사라지지 않습니다.
+    """
+
+    FIELD_WEIGHTS = {"name": 3, "tags": 2, "content": 1}
+    # 질의 단어가 노트 단어와 맞는 방식별 점수 비율
+    EXACT, PREFIX, INFIX = 1.0, 0.6, 0.3
+
+    def __init__(self, notes: Iterable[Dict] = ()):
+        """
+        Args:
+            notes (Iterable[dict]): 처음 색인할 노트 목록
+        """
+        self.lock = threading.RLock()
+        # 가중치는 작은 정수라 노트 수만큼 float 객체를 만들지 않음
+        self.words: Dict[str, Dict[int, int]] = {}  # 단어 -> {노트 ID: 가중치}
+        self.grams: Dict[str, Dict[int, int]] = {}  # 한글 2-gram -> {노트 ID: 가중치}
+        self.vocabulary: List[str] = []  # 접두사 검색용 정렬된 단어 목록
+        # 노트 ID -> (단어, 2-gram): 노트를 고치거나 지울 때 색인에서 뺄 항목
+        self.terms: Dict[int, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+        # 진행 중인 rebuild가 있을 때 apply된 변경 (새 색인에 다시 적용)
+        self.rebuilds = 0
+        self.pending: List[Tuple[str, Dict, Optional[Dict]]] = []
+        for note in notes:
+            self._add(note)
+        self.vocabulary = sorted(self.words)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def rebuild(self, notes: Iterable[Dict]):
+        """
+        노트 목록으로 색인을 새로 만듭니다. 만드는 동안에도 이전 색인으로 검색할 수 있고,
+        그 사이 apply된 변경은 새 색인으로 바꾼 뒤 다시 적용합니다.
+        """
+        with self.lock:
+            self.rebuilds += 1
+            start = len(self.pending)
+        try:
+            fresh = SearchIndex(notes)
+        except BaseException:
+            with self.lock:
+                self._finish_rebuild()
+            raise
+        with self.lock:
+            self.words, self.grams = fresh.words, fresh.grams
+            self.vocabulary, self.terms = fresh.vocabulary, fresh.terms
+            changes = self.pending[start:]
+            self._finish_rebuild()
+            for change in changes:
+                self._apply(*change)
+
+    def _finish_rebuild(self):
+        self.rebuilds -= 1
+        if not self.rebuilds:
+            self.pending = []
+
+    def add(self, note: Dict):
+        """
+        노트를 색인에 넣습니다. 이미 있는 노트면 새 내용으로 바꿉니다.
+        """
+        with self.lock:
+            self._remove(note["id"])
+            for word in self._add(note):
+                index = bisect_left(self.vocabulary, word)
+                if index == len(self.vocabulary) or self.vocabulary[index] != word:
+                    insort(self.vocabulary, word)
+
+    def remove(self, note_id: int):
+        with self.lock:
+            self._remove(note_id)
+
+    def apply(self, event: str, note: Dict, previous: Optional[Dict] = None):
+        """
+        Repository 변경 알림 (event, note, previous)을 색인에 반영합니다.
+        """
+        with self.lock:
+            if self.rebuilds:
+                self.pending.append((event, note, previous))
+            self._apply(event, note, previous)
+
+    def _apply(self, event: str, note: Dict, previous: Optional[Dict]):
+        with self.lock:
+            if previous is not None and previous["id"] != note["id"]:
+                self.remove(previous["id"])
+            if event == "delete":
+                self.remove(note["id"])
+            else:
+                self.add(note)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """
+        질의의 모든 단어와 맞는 노트 ID를 점수 순으로 반환합니다.
+
+        Args:
+            query (str): 검색어 (공백으로 단어 구분)
+            limit (int): 최대 결과 수. None이면 전부
+        Returns:
+            list: 노트 ID 목록 (점수가 같으면 최근 ID 먼저)
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        with self.lock:
+            scores: Optional[Dict[int, float]] = None
+            # 결과가 적은 단어부터 좁혀 나감
+            for word_scores in sorted((self._match(word) for word in words), key=len):
+                if scores is None:
+                    scores = dict(word_scores)
+                else:
+                    scores = {
+                        note_id: score + word_scores[note_id]
+                        for note_id, score in scores.items()
+                        if note_id in word_scores
+                    }
+                if not scores:
+                    return []
+
+        ranked = sorted(scores, key=lambda note_id: (-scores[note_id], -note_id))
+        return ranked[:limit] if limit is not None else ranked
+
+    def _match(self, word: str) -> Dict[int, float]:
+        """
+        질의 단어 하나에 맞는 노트별 점수 (정확히 일치 > 접두사 > 단어 중간)
+        """
+        scores: Dict[int, float] = {}
+
+        def take(postings: Dict[int, int], ratio: float):
+            for note_id, weight in postings.items():
+                if weight * ratio > scores.get(note_id, 0.0):
+                    scores[note_id] = weight * ratio
+
+        # 입력 중인 초성은 떼어 내고 다음 글자의 초성 조건으로 씀
+        pending = None
+        if len(word) > 1 and word[-1] in CHOSEONG:
+            word, pending = word[:-1], word[-1]
+
+        index = bisect_left(self.vocabulary, word)
+        while index < len(self.vocabulary) and self.vocabulary[index].startswith(word):
+            candidate = self.vocabulary[index]
+            index += 1
+            if pending is not None and (
+                len(candidate) == len(word)
+                or _choseong(candidate[len(word)]) != pending
+            ):
+                continue
+            exact = candidate == word and pending is None
+            take(self.words[candidate], self.EXACT if exact else self.PREFIX)
+
+        # 붙여 쓴 한글 단어의 중간: 질의의 모든 2-gram을 가진 노트 (드물게 떨어진 2-gram도 맞음)
+        grams = _bigrams(word) if pending is None else []
+        if grams:
+            postings = sorted(
+                (self.grams.get(gram, {}) for gram in set(grams)), key=len
+            )
+            for note_id, weight in postings[0].items():
+                if all(note_id in other for other in postings[1:]):
+                    if weight * self.INFIX > scores.get(note_id, 0.0):
+                        scores[note_id] = weight * self.INFIX
+        return scores
+
+    def _add(self, note: Dict) -> Tuple[str, ...]:
+        """
+        노트의 단어/2-gram을 색인에 넣고 단어 목록을 반환합니다. (lock 안에서 호출)
+        """
+        weights: Dict[str, int] = {}
+        gram_weights: Dict[str, int] = {}
+        for field, field_weight in self.FIELD_WEIGHTS.items():
+            value = note.get(field)
+            if isinstance(value, list):
+                value = " ".join(str(item) for item in value)
+            # 같은 단어가 노트마다 따로 남지 않도록 intern
+            field_words = {sys.intern(word) for word in tokenize(value or "")}
+            for word in field_words:
+                weights[word] = weights.get(word, 0) + field_weight
+            for gram in {gram for word in field_words for gram in _bigrams(word)}:
+                gram_weights[gram] = gram_weights.get(gram, 0) + field_weight
+
+        note_id = note["id"]
+        for word, weight in weights.items():
+            self.words.setdefault(word, {})[note_id] = weight
+        for gram, weight in gram_weights.items():
+            self.grams.setdefault(gram, {})[note_id] = weight
+        self.terms[note_id] = (tuple(weights), tuple(gram_weights))
+        return self.terms[note_id][0]
+
+    def _remove(self, note_id: int):
+        words, grams = self.terms.pop(note_id, ((), ()))
+        for word in words:
+            postings = self.words[word]
+            postings.pop(note_id, None)
+            if not postings:
+                del self.words[word]
+                index = bisect_left(self.vocabulary, word)
+                if index < len(self.vocabulary) and self.vocabulary[index] == word:
+                    del self.vocabulary[index]
+        for gram in grams:
+            postings = self.grams[gram]
+            postings.pop(note_id, None)
+            if not postings:
+                del self.grams[gram]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    검색용 단어 목록 (유니코드 정규화 + 소문자)
+    """
+    return WORD_PATTERN.findall(unicodedata.normalize("NFC", text).lower())
+
+
+def _is_hangul(char: str) -> bool:
+    return HANGUL_START <= ord(char) <= HANGUL_END
+
+
+def _choseong(char: str) -> Optional[str]:
+    if not _is_hangul(char):
+        return None
+    return CHOSEONG[(ord(char) - HANGUL_START) // 588]
+
+
+@lru_cache(maxsize=65536)
+def _bigrams(word: str) -> Tuple[str, ...]:
+    """
+    한글이 들어간 단어의 두 글자 n-gram (두 글자 미만이면 없음)
+    같은 단어가 노트마다 반복되므로 단어별로 캐시합니다.
+    """
+    if len(word) < 2 or not any(_is_hangul(char) for char in word):
+        return ()
+    return tuple(sys.intern(word[i : i + 2]) for i in range(len(word) - 1))
@@ -1,47 +1,106 @@
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
 
 
 class SimpleCalendar(GridLayout):
+    """
+    월 달력. 요일 헤더 7개와 날짜 칸 42개(6주)를 한 번만 만들고,
+    달을 바꾸거나 일정이 바뀌면 칸의 날짜와 일정 표시만 다시 씁니다.
+    """
+
+    WEEKS = 6
+
     def __init__(self, **kwargs):
+        self.register_event_type("on_month_change")
         super().__init__(**kwargs)
         self.cols = 7
-        self.rows = 7
-        self.current_date = datetime.now()
-        self.build_calendar()
-
-    def build_calendar(self):
-        self.clear_widgets()
+        self.rows = self.WEEKS + 1
+        self.current_date = datetime.now().replace(day=1)
+        self.events_by_day: Dict[date, List[Dict]] = {}
 
         # 달력 헤더 (요일)
         for day in ["Sun", "Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]:
             self.add_widget(Label(text=day))
 
-        # 해당 월의 시작 날짜
-        first_day = self.current_date.replace(day=1)
-        start_offset = (
-            first_day.weekday()
-        )  # 월요일 기준, 일요일을 시작으로 계산하려면 +1 % 7
-
-        # 이전 달 날짜 채우기
-        prev_month_days = (first_day - timedelta(days=start_offset)).day
-        for _ in range(start_offset):
-            self.add_widget(Label(text=str(prev_month_days)))
-            prev_month_days += 1
-
-        # 현재 달 날짜 채우기
-        days_in_month = (
-            first_day.replace(month=first_day.month % 12 + 1) - timedelta(days=1)
-        ).day
-        for day in range(1, days_in_month + 1):
-            self.add_widget(Button(text=str(day), on_press=self.on_date_select))
-
-        # 다음 달 날짜 채우기
-        remaining_days = self.cols * (self.rows - 1) - (start_offset + days_in_month)
-        for day in range(1, remaining_days + 1):
-            self.add_widget(Label(text=str(day)))
+        self.cells: List[Button] = []
+        for _ in range(self.cols * self.WEEKS):
+            cell = Button(markup=True, halign="center", on_press=self.on_date_select)
+            cell.date = None
+            self.cells.append(cell)
+            self.add_widget(cell)
+        self.build_calendar()
+
+    @property
+    def month(self) -> Tuple[int, int]:
+        return self.current_date.year, self.current_date.month
+
+    def visible_range(self) -> Tuple[date, date]:
+        """
+        날짜 칸에 보이는 첫 날과 마지막 날 (앞뒤 달의 날짜 포함)
+        """
+        first_day = self.current_date.date()
+        # 일요일부터 시작 (weekday()는 월요일이 0)
+        start = first_day - timedelta(days=(first_day.weekday() + 1) % 7)
+        return start, start + timedelta(days=len(self.cells) - 1)
+
+    def build_calendar(self):
+        """
+        현재 달에 맞춰 날짜 칸의 날짜와 일정 표시를 다시 씁니다. (위젯은 다시 만들지 않음)
+        """
+        start, _ = self.visible_range()
+        for offset, cell in enumerate(self.cells):
+            day = start + timedelta(days=offset)
+            cell.date = day
+            # 앞뒤 달의 날짜는 누를 수 없음
+            cell.disabled = day.month != self.current_date.month
+            count = len(self.events_by_day.get(day, ()))
+            cell.text = (
+                f"{day.day}\n[color=ff6666]{'•' * min(count, 3)}[/color]"
+                if count
+                else str(day.day)
+            )
+
+    def set_events(self, events_by_day: Dict[date, List[Dict]]):
+        """
+        날짜별 일정으로 일정 표시를 바꿉니다.
+        """
+        self.events_by_day = events_by_day
+        self.build_calendar()
+
+    def show_month(self, year: int, month: int):
+        self.current_date = self.current_date.replace(year=year, month=month, day=1)
+        self.build_calendar()
+        self.dispatch("on_month_change", year, month)
+
+    def move_month(self, delta: int):
+        """
+        delta만큼 이전(-)/다음(+) 달로 이동합니다.
+        """
+        self.show_month(*shift_month(*self.month, delta))
+
+    def on_month_change(self, year: int, month: int):
+        pass
 
     def on_date_select(self, instance):
-        print(f"Selected date: {self.current_date.replace(day=int(instance.text))}")
+        print(f"Selected date: {instance.date}")
+
+
+def shift_month(year: int, month: int, delta: int) -> Tuple[int, int]:
+    """
+    (year, month)에서 delta 달 떨어진 (연, 월)
+    """
+    year, index = divmod(year * 12 + month - 1 + delta, 12)
+    return year, index + 1
+
+
+def month_range(year: int, month: int) -> Tuple[date, datetime]:
+    """
+    달의 첫 날과 마지막 시각.
+    시작을 날짜로 두어야 시각 없이 저장된 첫날 일정("2024-05-01")도 ISO 문자열 비교에 포함됩니다.
+    """
+    start = date(year, month, 1)
+    end = datetime(*shift_month(year, month, 1), 1) - timedelta(microseconds=1)
+    return start, end
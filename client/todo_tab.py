@@ -1,38 +1,53 @@
-from kivy.uix.tabbedpanel import TabbedPanelItem
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.togglebutton import ToggleButton
 from kivy.uix.button import Button
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.factory import Factory
 from kivy.uix.textinput import TextInput
 from kivy.uix.popup import Popup
 from kivy.uix.checkbox import CheckBox
+from kivy.clock import Clock
 import requests
 import logging
+from typing import Dict, Iterable, Optional
 
+from client.reconcile import reconcile
 from client.repository import Repository
+from client.worker import Worker
 
 
-class TodoTab(TabbedPanelItem):
+class TodoTab(BoxLayout):
     """할 일 탭"""
 
-    def __init__(self, repository: Repository, **kwargs):
-        super().__init__(**kwargs)
+    def __init__(
+        self, repository: Repository, worker: Optional[Worker] = None, **kwargs
+    ):
+        super().__init__(orientation="vertical", **kwargs)
         self.repository = repository
-        self.text = "할 일"
-
-        # 메인 레이아웃
-        layout = BoxLayout(orientation="vertical")
-
-        # ScrollView 및 섹션 컨테이너
-        self.scroll_view = ScrollView(size_hint=(1, 1))
-        self.section_container = GridLayout(cols=1, spacing=10, size_hint_y=None)
-        self.section_container.bind(
-            minimum_height=self.section_container.setter("height")
+        self.worker = worker or Worker()
+        self.tasks: Dict[int, Dict] = {}  # 태스크 ID -> 태스크 (표시 순서 유지)
+        self.last_changes = {}  # 마지막 목록 갱신의 행 연산 수
+
+        # 불러오는 중/오류 안내 문구 (목록이 있으면 숨김)
+        self.status_label = Label(size_hint_y=None, height=0, opacity=0)
+        self.add_widget(self.status_label)
+
+        # 태그 헤더와 할 일 행을 한 목록으로: 화면에 보이는 행만 위젯으로 만듦
+        self.task_list = RecycleView()
+        list_layout = RecycleBoxLayout(
+            orientation="vertical",
+            default_size=(None, 50),
+            default_size_hint=(1, None),
+            size_hint_y=None,
         )
-        self.scroll_view.add_widget(self.section_container)
-        layout.add_widget(self.scroll_view)
+        list_layout.bind(minimum_height=list_layout.setter("height"))
+        self.task_list.add_widget(list_layout)
+        # 레이아웃을 붙인 뒤에 지정해야 행 위젯이 만들어짐
+        self.task_list.key_viewclass = "viewclass"
+        self.add_widget(self.task_list)
 
         # 상단 버튼: Done 보기/숨기기 & 할 일 추가
         button_layout = BoxLayout(size_hint_y=None, height=50)
@@ -47,22 +62,70 @@ class TodoTab(TabbedPanelItem):
         add_button.bind(on_press=self.open_add_task_popup)
         button_layout.add_widget(add_button)
 
-        layout.add_widget(button_layout)
-
-        self.add_widget(layout)
+        self.add_widget(button_layout)
 
         # 데이터 로드
         self.show_done = False  # 기본적으로 done 상태 숨김
+        self.repository.add_listener(self.on_note_changed)
         self.load_tasks()
 
     def load_tasks(self):
-        """서버에서 할 일 데이터 로드"""
-        tasks = self.repository.filtered_notes(note_type="task")
-        self.populate_tasks(tasks)
+        """작업 스레드에서 할 일 데이터 로드 (불러오는 동안 안내 문구 표시)"""
+        if not self.tasks:
+            self.show_message("불러오는 중...")
+        self.worker.submit(
+            self.repository.filtered_notes,
+            note_type="task",
+            on_result=self.on_tasks_loaded,
+            on_error=lambda error: self.show_message("서버에 연결할 수 없습니다!"),
+            owner=self,
+        )
 
-    def populate_tasks(self, tasks):
-        """할 일 섹션 및 태스크 데이터 표시"""
-        self.section_container.clear_widgets()  # 기존 위젯 초기화
+    def on_tasks_loaded(self, tasks):
+        if isinstance(tasks, dict):
+            self.show_message("서버에 연결할 수 없습니다!")
+            return
+        self.tasks = {task["id"]: task for task in tasks}
+        self.populate_tasks(self.tasks.values())
+
+    def on_note_changed(self, event: str, note: Dict, previous: Optional[Dict]):
+        """Repository 변경 알림 (동기화 스레드에서도 호출되므로 메인 스레드로 넘김)"""
+        Clock.schedule_once(lambda dt: self.apply_note_change(event, note, previous))
+
+    def apply_note_change(self, event: str, note: Dict, previous: Optional[Dict]):
+        """노트 하나의 변경을 태스크 목록에 반영하고 바뀐 행만 고침"""
+        if previous is not None and previous["id"] != note["id"]:
+            # 동기화로 임시 ID가 서버 ID로 바뀌면 같은 자리를 유지
+            self.tasks = {
+                (note["id"] if task_id == previous["id"] else task_id): task
+                for task_id, task in self.tasks.items()
+            }
+        if event == "delete" or note.get("type") != "task":
+            if self.tasks.pop(note["id"], None) is None:
+                return
+        elif self.tasks.get(note["id"]) == note:
+            return
+        else:
+            self.tasks[note["id"]] = note
+        self.populate_tasks(self.tasks.values())
+
+    def show_message(self, text):
+        """목록 위에 안내 문구 표시 (빈 문자열이면 숨김)"""
+        self.status_label.text = text
+        self.status_label.height = 50 if text else 0
+        self.status_label.opacity = 1 if text else 0
+
+    def close(self):
+        """탭을 닫을 때 진행 중인 요청을 취소하고 변경 알림 구독을 해제"""
+        self.repository.remove_listener(self.on_note_changed)
+        self.worker.cancel(self)
+
+    def populate_tasks(self, tasks: Iterable[Dict]):
+        """
+        태그별 헤더와 태스크 행 데이터를 만들고, 현재 목록과 키로 비교해 바뀐 행만 고침
+        """
+        self.show_message("")
+        tasks = list(tasks)
         tasks_by_tag = {}
 
         # 태그별로 데이터 분류
@@ -74,22 +137,48 @@ class TodoTab(TabbedPanelItem):
                     tasks_by_tag[tag] = []
                 tasks_by_tag[tag].append(task)
 
-        # 태그별 섹션 추가
-        for tag, tasks in tasks_by_tag.items():
-            section = TodoSection(tag, tasks, self.repository, self)
-            self.section_container.add_widget(section)
-
         # Done 섹션 추가
         if self.show_done:
             done_tasks = [task for task in tasks if task["done"]]
             if done_tasks:
-                done_section = TodoSection("Done", done_tasks, self.repository, self)
-                self.section_container.add_widget(done_section)
+                tasks_by_tag["Done"] = done_tasks
+
+        # 한 태스크가 여러 태그에 나오므로 행 키는 (태그, 태스크 ID)
+        rows = []
+        for tag, tag_tasks in tasks_by_tag.items():
+            rows.append(
+                {
+                    "viewclass": "TodoHeader",
+                    "key": ("header", tag),
+                    "text": f"[b]{tag}[/b]",
+                    "height": 30,
+                }
+            )
+            rows.extend(
+                {
+                    "viewclass": "TaskRow",
+                    "key": ("task", tag, task["id"]),
+                    "task": task,
+                    "tab": self,
+                }
+                for task in tag_tasks
+            )
+        self.last_changes = reconcile(self.task_list.data, rows)
+
+    def set_task_done(self, task_id: int, done: bool):
+        """태스크 완료 상태를 바꾸고 해당 행만 고침"""
+        task = self.tasks.get(task_id)
+        if task is None or task["done"] == done:
+            return
+        # 행 데이터와 비교할 수 있도록 제자리에서 바꾸지 않고 새 태스크로 교체
+        self.tasks[task_id] = {**task, "done": done}
+        self.populate_tasks(self.tasks.values())
+        self.worker.submit(self.repository.update_note, task_id, done=done, owner=self)
 
     def toggle_done_visibility(self, instance):
         """Done 상태 표시/숨기기 토글"""
         self.show_done = not self.show_done
-        self.load_tasks()
+        self.populate_tasks(self.tasks.values())
 
     def open_add_task_popup(self, instance):
         """할 일 추가 팝업 열기"""
@@ -139,54 +228,57 @@ class TodoTab(TabbedPanelItem):
             "done": False,
         }
 
-        try:
-            self.repository.new_note(**task_data)
-            self.load_tasks()  # 데이터 새로고침
-        finally:
-            popup.dismiss()
+        popup.dismiss()
+        self.worker.submit(
+            self.repository.new_note,
+            **task_data,
+            on_result=lambda result: self.load_tasks(),  # 데이터 새로고침
+            owner=self,
+        )
 
 
-class TodoSection(BoxLayout):
-    """태그별 할 일 섹션"""
+class TodoHeader(Label):
+    """태그 섹션 헤더 행"""
 
-    def __init__(self, tag, tasks, repository, parent_tab, **kwargs):
-        super().__init__(orientation="vertical", **kwargs)
-        self.repository = repository
-        self.parent_tab = parent_tab
+    def __init__(self, **kwargs):
+        super().__init__(markup=True, **kwargs)
 
-        # 섹션 타이틀
-        title = Label(text=f"[b]{tag}[/b]", size_hint_y=None, height=30, markup=True)
-        self.add_widget(title)
 
-        # 태스크 리스트
-        for task in tasks:
-            self.add_widget(TaskItem(task, repository, parent_tab))
+class TaskRow(RecycleDataViewBehavior, BoxLayout):
+    """
+    할 일 행. RecycleView가 스크롤할 때 다른 태스크 데이터로 다시 씁니다.
+    """
 
-
-class TaskItem(BoxLayout):
-    """할 일 항목"""
-
-    def __init__(self, task, repository, parent_tab, **kwargs):
-        super().__init__(
-            orientation="horizontal", size_hint_y=None, height=50, **kwargs
-        )
-        self.repository = repository
-        self.parent_tab = parent_tab
-        self.task = task
+    def __init__(self, **kwargs):
+        super().__init__(orientation="horizontal", **kwargs)
+        self.task = None
+        self.tab = None
+        self.refreshing = False
 
         # 체크박스
-        self.checkbox = CheckBox(active=task["done"])
+        self.checkbox = CheckBox(size_hint_x=0.2)
         self.checkbox.bind(active=self.update_task_status)
         self.add_widget(self.checkbox)
 
         # 태스크 제목
-        self.label = Label(
-            text=task["name"], halign="left", valign="middle", size_hint_x=0.8
-        )
+        self.label = Label(halign="left", valign="middle", size_hint_x=0.8)
         self.label.bind(size=self.label.setter("text_size"))  # 텍스트 래핑
         self.add_widget(self.label)
 
+    def refresh_view_attrs(self, rv, index, data):
+        # 다른 태스크 데이터를 붙일 때 체크박스 변경을 사용자 입력으로 처리하지 않음
+        self.refreshing = True
+        self.checkbox.active = data["task"]["done"]
+        self.label.text = data["task"]["name"]
+        self.refreshing = False
+        return super().refresh_view_attrs(rv, index, data)
+
     def update_task_status(self, instance, value):
         """태스크 상태 업데이트"""
-        self.task["done"] = value
-        self.repository.update_note(note_id=self.task["id"], **self.task)
+        if self.refreshing or self.task is None or self.task["done"] == value:
+            return
+        self.tab.set_task_done(self.task["id"], value)
+
+
+Factory.register("TodoHeader", cls=TodoHeader)
+Factory.register("TaskRow", cls=TaskRow)
@@ -0,0 +1,106 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Set
+
+from kivy.clock import Clock
+
+
+class Worker:
+    """
+    Repository 호출처럼 오래 걸리는 작업을 Kivy 메인 스레드 밖에서 실행하고,
+    결과 콜백은 Clock을 통해 메인 스레드에서 호출합니다.
+
+    작업은 owner(예: 탭)별로 묶여 cancel(owner)로 한 번에 취소할 수 있습니다.
+    아직 시작하지 않은 작업은 실행하지 않고, 이미 실행 중인 작업은 결과를 버립니다.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        """
+        Args:
+            max_workers (int): 동시에 실행할 최대 작업 수
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="client-worker"
+        )
+        self.lock = threading.Lock()
+        self.pending: Dict[int, Set[Future]] = {}
+
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        on_result: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+        owner=None,
+        **kwargs,
+    ) -> Future:
+        """
+        fn(*args, **kwargs)를 작업 스레드에서 실행합니다.
+
+        Args:
+            fn (Callable): 실행할 함수
+            on_result (Callable): 메인 스레드에서 결과로 호출할 콜백
+            on_error (Callable): 메인 스레드에서 예외로 호출할 콜백 (없으면 로그만 남김)
+            owner: 작업을 묶을 객체. cancel(owner)로 취소합니다.
+        Returns:
+            Future: 작업 Future
+        """
+        future = self.executor.submit(fn, *args, **kwargs)
+        key = id(owner)
+        with self.lock:
+            self.pending.setdefault(key, set()).add(future)
+
+        def done(future: Future):
+            if not future.cancelled():
+                Clock.schedule_once(
+                    lambda dt: self._deliver(key, future, on_result, on_error)
+                )
+
+        future.add_done_callback(done)
+        return future
+
+    def cancel(self, owner) -> int:
+        """
+        owner의 남은 작업을 모두 취소합니다.
+
+        Returns:
+            int: 취소한 작업 수
+        """
+        with self.lock:
+            futures = self.pending.pop(id(owner), set())
+        for future in futures:
+            future.cancel()
+        return len(futures)
+
+    def busy(self, owner) -> bool:
+        with self.lock:
+            return id(owner) in self.pending
+
+    def shutdown(self):
+        with self.lock:
+            futures = [f for group in self.pending.values() for f in group]
+            self.pending.clear()
+        for future in futures:
+            future.cancel()
+        self.executor.shutdown(wait=False)
+
+    def _deliver(self, key: int, future: Future, on_result, on_error):
+        # 결과가 도착하기 전에 owner가 취소됐으면 콜백을 부르지 않음
+        with self.lock:
+            futures = self.pending.get(key)
+            if futures is None or future not in futures:
+                return
+            futures.discard(future)
+            if not futures:
+                del self.pending[key]
+
+        error = future.exception()
+        if error is not None:
+            if on_error:
+                on_error(error)
+            else:
+                logging.error(f"Background task failed: {error!r}")
+            return
+        if on_result:
+            on_result(future.result())
@@ -0,0 +1,158 @@
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """
+    대기열이 가득 차거나 클라이언트 한도를 넘어 요청을 받을 수 없을 때 발생합니다.
+    """
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    def __init__(self, client_id: str, priority: str):
+        self.client_id = client_id
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.started: Optional[float] = None
+
+
+class AdmissionController:
+    """
+    LLM 요청의 동시 실행 수를 제한하고, 초과 요청은 우선순위별 대기열에서 기다리게 합니다.
+    대기열이 가득 차거나 클라이언트별 한도를 넘으면 AdmissionRejected로 요청을 거절합니다.
+
+    우선순위:
+    - interactive: 사용자가 기다리는 /interact 요청. 항상 먼저 실행됩니다.
+    - background: 백그라운드 작업 대기열. interactive 대기 요청이 없을 때만 실행됩니다.
+    """
+
+    PRIORITIES = ("interactive", "background")
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queue: Optional[Dict[str, int]] = None,
+        per_client: int = 4,
+        queue_timeout: float = 30.0,
+    ):
+        """
+        Args:
+            max_concurrent (int): 동시에 실행할 최대 LLM 요청 수
+            max_queue (dict): 우선순위별 최대 대기 요청 수
+            per_client (int): 클라이언트별 동시 요청(실행 + 대기) 한도
+            queue_timeout (float): 대기열에서 기다리는 최대 시간(초)
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = {"interactive": 32, "background": 8, **(max_queue or {})}
+        self.per_client = per_client
+        self.queue_timeout = queue_timeout
+        self.condition = threading.Condition()
+        self.queues: Dict[str, Deque[_Ticket]] = {p: deque() for p in self.PRIORITIES}
+        self.running = 0
+        self.clients: Dict[str, int] = {}
+        self.service_time = 1.0  # 요청 처리 시간의 지수 이동 평균(초)
+        self.rejected = {p: 0 for p in self.PRIORITIES}
+        self.admitted = {p: 0 for p in self.PRIORITIES}
+
+    def acquire(
+        self, client_id: str, priority: str = "interactive", wait: bool = False
+    ):
+        """
+        실행 슬롯을 얻을 때까지 기다립니다.
+
+        Args:
+            client_id (str): 클라이언트 식별자
+            priority (str): "interactive" 또는 "background"
+            wait (bool): True면 대기열/클라이언트 한도를 무시하고 슬롯이 날 때까지 기다립니다.
+                         (서버 내부 작업자용)
+        Returns:
+            release에 넘길 티켓
+        Raises:
+            AdmissionRejected: 한도를 넘었거나 대기 시간이 queue_timeout을 넘은 경우
+        """
+        if priority not in self.PRIORITIES:
+            raise ValueError(f"Invalid priority: {priority}")
+
+        with self.condition:
+            if not wait:
+                if self.clients.get(client_id, 0) >= self.per_client:
+                    self._reject(priority, "Too many concurrent requests from client")
+                if len(self.queues[priority]) >= self.max_queue[priority]:
+                    self._reject(priority, "LLM queue is full")
+
+            ticket = _Ticket(client_id, priority)
+            self.queues[priority].append(ticket)
+            self.clients[client_id] = self.clients.get(client_id, 0) + 1
+
+            deadline = None if wait else ticket.enqueued + self.queue_timeout
+            while not self._is_next(ticket):
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    self.queues[priority].remove(ticket)
+                    self._leave(client_id)
+                    self.condition.notify_all()
+                    self._reject(priority, "Timed out waiting in LLM queue")
+                self.condition.wait(timeout)
+
+            self.queues[priority].popleft()
+            self.running += 1
+            self.admitted[priority] += 1
+            ticket.started = time.monotonic()
+            return ticket
+
+    def release(self, ticket: _Ticket):
+        with self.condition:
+            self.running -= 1
+            self._leave(ticket.client_id)
+            elapsed = time.monotonic() - ticket.started
+            self.service_time = 0.8 * self.service_time + 0.2 * elapsed
+            self.condition.notify_all()
+
+    @contextmanager
+    def admit(self, client_id: str, priority: str = "interactive", wait: bool = False):
+        ticket = self.acquire(client_id, priority, wait)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def stats(self) -> Dict:
+        with self.condition:
+            return {
+                "running": self.running,
+                "queued": {p: len(q) for p, q in self.queues.items()},
+                "admitted": dict(self.admitted),
+                "rejected": dict(self.rejected),
+                "service_time_ms": round(self.service_time * 1000, 3),
+            }
+
+    def _is_next(self, ticket: _Ticket) -> bool:
+        if self.running >= self.max_concurrent:
+            return False
+        for priority in self.PRIORITIES:
+            if self.queues[priority]:
+                return self.queues[priority][0] is ticket
+        return False
+
+    def _leave(self, client_id: str):
+        self.clients[client_id] -= 1
+        if not self.clients[client_id]:
+            del self.clients[client_id]
+
+    def _reject(self, priority: str, reason: str):
+        """
+        대기 중인 요청이 모두 처리될 예상 시간을 Retry-After로 알려 줍니다.
+        """
+        self.rejected[priority] += 1
+        queued = sum(len(q) for q in self.queues.values())
+        retry_after = math.ceil(self.service_time * (queued + 1) / self.max_concurrent)
+        raise AdmissionRejected(reason, max(1, retry_after))
@@ -0,0 +1,124 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Deque, Dict, List
+
+
+class _Request:
+    """
+    스케줄러 대기열의 요청 항목
+    """
+
+    def __init__(self, messages, params: Dict):
+        self.messages = messages
+        self.params = params
+        self.future: Future = Future()
+        self.enqueued = time.monotonic()
+
+
+class BatchScheduler:
+    """
+    BatchScheduler는 동시에 들어온 생성 요청을 모아 한 번의 model.generate로 처리합니다.
+    배치는 max_batch_size개가 모이거나, 첫 요청이 max_wait_ms만큼 기다리면 실행됩니다.
+    """
+
+    def __init__(self, model, max_batch_size: int = 8, max_wait_ms: float = 20):
+        """
+        Args:
+            model: generate(batch, **params) -> List[str]를 제공하는 모델
+            max_batch_size (int): 한 번에 처리할 최대 요청 수
+            max_wait_ms (float): 배치를 채우기 위해 첫 요청이 기다리는 최대 시간(ms)
+        """
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.queue: "queue.Queue[_Request]" = queue.Queue()
+        self.closed = False
+        # 최근 요청들의 대기열 대기 시간(초). 벤치마크와 모니터링용
+        self.queue_waits: Deque[float] = deque(maxlen=10000)
+
+        self.worker = threading.Thread(target=self._loop, daemon=True)
+        self.worker.start()
+
+    def submit(self, messages, params: Dict = None) -> Future:
+        """
+        생성 요청을 대기열에 추가합니다.
+
+        Returns:
+            Future: 생성된 텍스트가 담길 Future
+        """
+        if self.closed:
+            raise RuntimeError("BatchScheduler is closed")
+        request = _Request(messages, params or {})
+        self.queue.put(request)
+        return request.future
+
+    def close(self):
+        """
+        워커 스레드를 종료합니다. 이미 대기 중인 요청은 처리 후 종료됩니다.
+        """
+        self.closed = True
+        self.queue.put(None)
+        self.worker.join()
+
+    def _loop(self):
+        while True:
+            first = self.queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            stop = False
+            deadline = first.enqueued + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch: List[_Request]):
+        """
+        생성 파라미터가 같은 요청끼리 묶어 실행하고 결과를 각 Future로 전달합니다.
+        """
+        started = time.monotonic()
+        groups: Dict[str, List[_Request]] = {}
+        for request in batch:
+            self.queue_waits.append(started - request.enqueued)
+            key = json.dumps(request.params, sort_keys=True)
+            groups.setdefault(key, []).append(request)
+
+        for requests in groups.values():
+            try:
+                outputs = self.model.generate(
+                    [request.messages for request in requests], **requests[0].params
+                )
+            except Exception as e:
+                for request in requests:
+                    request.future.set_exception(e)
+                continue
+
+            if len(outputs) != len(requests):
+                # 일부 요청만 결과를 받으면 나머지는 영원히 기다리게 되므로 모두 실패 처리
+                error = RuntimeError(
+                    f"Model returned {len(outputs)} outputs for {len(requests)} requests"
+                )
+                for request in requests:
+                    request.future.set_exception(error)
+                continue
+
+            for request, output in zip(requests, outputs):
+                request.future.set_result(output)
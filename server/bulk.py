@@ -0,0 +1,236 @@
+"""
+노트를 NDJSON 파일로 내보내고 가져오는 도구 (백업, 다른 서버로 이전, 테스트 데이터 채우기)
+
+서버 API(/notes/export, /notes/import)를 쓰거나, 서버가 꺼져 있을 때는 데이터베이스에 직접 연결합니다.
+ID와 생성/수정 시각, 버전을 그대로 유지하며, 진행률을 표시하고 중단된 작업은 --resume으로 이어 갑니다.
+
+    python -m server.bulk export notes.ndjson --server http://127.0.0.1:5000
+    python -m server.bulk import notes.ndjson --server http://127.0.0.1:5000 --resume
+    python -m server.bulk export notes.ndjson --db sqlite:///notes.db --type memo
+
+- 내보내기: --resume이면 파일의 마지막 완전한 줄 다음 ID부터 이어서 씁니다.
+- 가져오기: 커밋된 위치를 <파일>.progress에 기록하고, --resume이면 그 위치부터 읽습니다.
+  같은 ID는 덮어쓰므로 일부가 겹쳐 다시 들어가도 결과는 같습니다.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, Optional
+
+import requests
+
+from server.database import NoteRepository
+
+
+class Progress:
+    """
+    처리한 노트 수와 속도를 한 줄로 갱신하며 표시합니다.
+    """
+
+    def __init__(self, label: str, total_bytes: Optional[int] = None):
+        self.label = label
+        self.total_bytes = total_bytes
+        self.start = time.monotonic()
+        self.shown = 0.0
+
+    def update(self, count: int, position: Optional[int] = None, final: bool = False):
+        now = time.monotonic()
+        if not final and now - self.shown < 0.5:
+            return
+        self.shown = now
+        rate = count / max(now - self.start, 1e-9)
+        percent = ""
+        if self.total_bytes and position is not None:
+            percent = f" {100 * position / self.total_bytes:5.1f}%"
+        sys.stderr.write(f"\r{self.label}{percent} {count} notes ({rate:,.0f}/s)")
+        if final:
+            sys.stderr.write("\n")
+        sys.stderr.flush()
+
+
+def export_notes(args) -> int:
+    """
+    노트를 파일로 내보냅니다. 반환값은 이번에 쓴 노트 수입니다.
+    """
+    after = _resume_export(args.path) if args.resume else 0
+    progress = Progress("export")
+    count = 0
+    with open(args.path, "ab" if after else "wb") as f:
+        if args.server:
+            with requests.get(
+                f"{args.server}/notes/export",
+                params={"type": args.type, "after": after},
+                stream=True,
+                timeout=(3.05, 300),
+            ) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=1 << 16):
+                    f.write(chunk)
+                    count += chunk.count(b"\n")
+                    progress.update(count)
+        else:
+            repository = NoteRepository(args.db)
+            for note in repository.export_notes(
+                args.type, after=after, batch_size=args.batch_size
+            ):
+                f.write(json.dumps(note, ensure_ascii=False).encode() + b"\n")
+                count += 1
+                progress.update(count)
+    progress.update(count, final=True)
+    return count
+
+
+def import_notes(args) -> int:
+    """
+    파일의 노트를 가져옵니다. 반환값은 이번에 가져온 노트 수입니다.
+    """
+    checkpoint_path = f"{args.path}.progress"
+    offset = 0
+    if args.resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, encoding="utf-8") as f:
+            offset = json.load(f)["offset"]
+
+    def checkpoint(position: int):
+        # 쓰는 도중 중단되어도 이전 위치가 남도록 임시 파일에 쓴 뒤 교체
+        with open(f"{checkpoint_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"offset": position}, f)
+        os.replace(f"{checkpoint_path}.tmp", checkpoint_path)
+
+    progress = Progress("import", os.path.getsize(args.path))
+    reader = NoteReader(args.path, offset)
+    if args.server:
+        count = 0
+        session = requests.Session()
+        while True:
+            lines = reader.read_lines(args.batch_size * args.batches_per_request)
+            if not lines:
+                break
+            response = session.post(
+                f"{args.server}/notes/import",
+                params={"batch_size": args.batch_size},
+                data=b"".join(lines),
+                headers={"Content-Type": "application/x-ndjson"},
+                timeout=(3.05, 300),
+            )
+            if response.status_code != 200:
+                sys.exit(f"\nImport failed at byte {reader.committed}: {response.text}")
+            count += response.json()["imported"]
+            reader.commit()
+            checkpoint(reader.committed)
+            progress.update(count, reader.committed)
+    else:
+        repository = NoteRepository(args.db)
+
+        def committed(imported: int):
+            # import_notes는 묶음 크기만큼만 읽고 커밋하므로 읽은 위치가 커밋된 위치
+            reader.commit()
+            checkpoint(reader.committed)
+            progress.update(imported, reader.committed)
+
+        count = repository.import_notes(
+            reader.notes(), batch_size=args.batch_size, on_progress=committed
+        )
+    progress.update(count, reader.committed, final=True)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return count
+
+
+class NoteReader:
+    """
+    NDJSON 파일을 offset부터 읽으며, 읽은 위치와 커밋된 위치(바이트)를 기억합니다.
+    """
+
+    def __init__(self, path: str, offset: int = 0):
+        self.file = open(path, "rb")
+        self.file.seek(offset)
+        self.position = offset
+        self.committed = offset
+
+    def read_lines(self, count: int):
+        lines = []
+        while len(lines) < count:
+            line = self.file.readline()
+            if not line:
+                break
+            self.position += len(line)
+            if line.strip():
+                lines.append(line if line.endswith(b"\n") else line + b"\n")
+        return lines
+
+    def notes(self) -> Iterator[Dict]:
+        for line in iter(self.file.readline, b""):
+            self.position += len(line)
+            if line.strip():
+                yield json.loads(line)
+
+    def commit(self):
+        self.committed = self.position
+
+
+def _resume_export(path: str) -> int:
+    """
+    중단된 내보내기 파일의 마지막 완전한 줄 뒤를 잘라 내고, 그 줄의 노트 ID를 반환합니다.
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        # 뒤에서부터 줄바꿈을 찾음 (노트 한 줄이 길 수 있으므로 블록 단위로)
+        lines_end = None
+        position = end
+        tail = b""
+        while position > 0:
+            size = min(1 << 16, position)
+            position -= size
+            f.seek(position)
+            tail = f.read(size) + tail
+            if lines_end is None and b"\n" in tail:
+                lines_end = position + tail.rindex(b"\n") + 1
+            if lines_end is not None:
+                body = tail[: lines_end - position - 1]
+                if b"\n" in body or position == 0:
+                    last_line = body[body.rfind(b"\n") + 1 :]
+                    f.truncate(lines_end)
+                    return json.loads(last_line)["id"]
+        f.truncate(0)
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="NDJSON 파일 경로")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--server", help="서버 주소 (예: http://127.0.0.1:5000)")
+    target.add_argument("--db", help="데이터베이스 URL (예: sqlite:///notes.db)")
+    parser.add_argument("--type", help="내보낼 노트 타입 (기본: 모든 타입)")
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="트랜잭션/조회 하나의 노트 수"
+    )
+    parser.add_argument(
+        "--batches-per-request",
+        type=int,
+        default=10,
+        help="--server 가져오기에서 요청 하나에 보낼 묶음 수",
+    )
+    parser.add_argument("--resume", action="store_true", help="중단된 작업 이어 하기")
+    args = parser.parse_args()
+    if args.server:
+        args.server = args.server.rstrip("/")
+
+    start = time.monotonic()
+    if args.command == "export":
+        count = export_notes(args)
+    else:
+        count = import_notes(args)
+    print(f"{args.command}ed {count} notes in {time.monotonic() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
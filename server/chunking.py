@@ -0,0 +1,65 @@
+import re
+from typing import List
+
+
+def split_into_chunks(
+    text: str, model, chunk_tokens: int, overlap: int = 0
+) -> List[str]:
+    """
+    긴 텍스트를 토큰 수 기준으로 나눕니다.
+
+    줄(문단) 단위로 chunk_tokens 이하가 되도록 이어 붙이므로,
+    한 문단을 수정하면 보통 그 문단이 속한 청크(와 그 끝을 이어받는 다음 청크)만 바뀝니다.
+    청크 경계에 걸친 문장의 맥락이 끊기지 않도록 앞 청크의 마지막 overlap 토큰을
+    다음 청크 앞에 붙이고, 한 줄이 chunk_tokens보다 길면 토큰 경계에서 overlap만큼 겹치게 자릅니다.
+
+    Args:
+        text (str): 나눌 텍스트
+        model: tokenize(text), detokenize(tokens)를 제공하는 모델
+        chunk_tokens (int): 청크당 최대 토큰 수 (이어받은 토큰 포함)
+        overlap (int): 이웃 청크와 겹치는 토큰 수
+    Returns:
+        list: 청크 텍스트 목록
+    """
+    overlap = max(0, min(overlap, chunk_tokens - 1))
+    chunks: List[str] = []
+    current: List[str] = []
+    current_tokens: list = []
+    carry: list = []  # 앞 청크의 마지막 overlap 토큰
+
+    def flush():
+        nonlocal current, current_tokens, carry
+        if current:
+            chunks.append("\n".join(current))
+            carry = current_tokens[-overlap:] if overlap else []
+        current, current_tokens = [], []
+
+    for paragraph in re.split(r"\n+", text):
+        if not paragraph.strip():
+            continue
+        tokens = model.tokenize(paragraph)
+
+        if len(tokens) > chunk_tokens:
+            flush()
+            step = chunk_tokens - overlap
+            for start in range(0, len(tokens), step):
+                chunks.append(model.detokenize(tokens[start : start + chunk_tokens]))
+                if start + chunk_tokens >= len(tokens):
+                    break
+            carry = tokens[-overlap:] if overlap else []
+            continue
+
+        if len(current_tokens) + len(tokens) > chunk_tokens:
+            flush()
+        if not current and carry:
+            # 새 청크는 앞 청크의 끝에서 시작 (문단이 들어갈 자리만큼만)
+            room = chunk_tokens - len(tokens)
+            prefix = carry[-room:] if room > 0 else []
+            if prefix:
+                current.append(model.detokenize(prefix))
+                current_tokens = list(prefix)
+        current.append(paragraph)
+        current_tokens += tokens
+
+    flush()
+    return chunks
@@ -0,0 +1,154 @@
+import math
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from server.embedding import EmbeddingIndex, HashingEmbedder, note_text
+
+
+class ContextPacker:
+    """
+    여러 노트를 토큰 예산 안에 들어가도록 골라 하나의 프롬프트로 묶습니다.
+    노트는 최신성과 질의 관련도로 순위를 매기고, 순위대로 예산이 찰 때까지 담습니다.
+    """
+
+    def __init__(
+        self,
+        model,
+        embedder: Optional[HashingEmbedder] = None,
+        embedding_index: Optional[EmbeddingIndex] = None,
+        half_life_days: float = 7.0,
+        relevance_weight: float = 1.0,
+        min_note_tokens: int = 32,
+        cache_size: int = 4096,
+    ):
+        """
+        Args:
+            model: count_tokens/tokenize/detokenize를 제공하는 모델
+            embedder (HashingEmbedder): 질의 관련도 계산용 임베더
+            embedding_index (EmbeddingIndex): 노트 임베딩을 다시 계산하지 않고 꺼내 쓸 인덱스.
+                있으면 인덱스의 임베더를 사용하고, 인덱스에 없는 노트만 임베딩합니다.
+            half_life_days (float): 최신성 점수가 절반이 되는 기간(일)
+            relevance_weight (float): 질의 관련도 점수의 가중치
+            min_note_tokens (int): 남은 예산이 이보다 작으면 더 이상 노트를 담지 않습니다.
+            cache_size (int): 토큰 수를 기억할 노트 블록 수
+        """
+        self.model = model
+        self.embedding_index = embedding_index
+        if embedding_index is not None:
+            embedder = embedding_index.embedder
+        self.embedder = embedder or HashingEmbedder()
+        self.half_life_days = half_life_days
+        self.relevance_weight = relevance_weight
+        self.min_note_tokens = min_note_tokens
+        self.cache_size = cache_size
+        self.token_cache: "OrderedDict[str, int]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def count_tokens(self, text: str) -> int:
+        """
+        토큰 수를 셉니다. 같은 노트를 반복해서 토큰화하지 않도록 결과를 LRU로 캐시합니다.
+        """
+        with self.lock:
+            count = self.token_cache.get(text)
+            if count is not None:
+                self.token_cache.move_to_end(text)
+                return count
+        count = self.model.count_tokens(text)
+        with self.lock:
+            self.token_cache[text] = count
+            if len(self.token_cache) > self.cache_size:
+                self.token_cache.popitem(last=False)
+        return count
+
+    def rank(
+        self, notes: List[Dict], query: Optional[str] = None, now: datetime = None
+    ) -> List[Dict]:
+        """
+        최신성(수정 시각의 지수 감쇠)과 질의 관련도(후보 간 정규화한 코사인 유사도)의 합으로 정렬합니다.
+        """
+        if not notes:
+            return []
+        now = now or datetime.utcnow()
+        scores = np.array([self._recency(note, now) for note in notes])
+        if query:
+            vectors = self._note_vectors(notes)
+            relevance = vectors @ self.embedder.embed([query])[0]
+            # 해싱 임베딩은 공통 n-gram 때문에 기본 유사도가 있으므로 후보 간 상대값으로 정규화
+            spread = relevance.max() - relevance.min()
+            if spread > 1e-6:
+                scores = scores + self.relevance_weight * (
+                    (relevance - relevance.min()) / spread
+                )
+        order = np.argsort(-scores, kind="stable")
+        return [notes[i] for i in order]
+
+    def _note_vectors(self, notes: List[Dict]) -> np.ndarray:
+        """
+        노트 임베딩 행렬. 인덱스에 저장된 벡터를 쓰고 없는 노트만 새로 임베딩합니다.
+        """
+        if self.embedding_index is None:
+            return self.embedder.embed([note_text(note) for note in notes])
+        # ID가 없는 노트(저장 전 노트 등)는 ID 0으로 찾아 없는 노트로 처리됨
+        matrix, missing = self.embedding_index.lookup(
+            [(note.get("type") or "", note.get("id") or 0) for note in notes]
+        )
+        if missing:
+            matrix[missing] = self.embedder.embed(
+                [note_text(notes[i]) for i in missing]
+            )
+        return matrix
+
+    def pack(
+        self,
+        notes: List[Dict],
+        budget_tokens: int,
+        query: Optional[str] = None,
+        now: datetime = None,
+    ) -> Tuple[str, List[Dict]]:
+        """
+        순위가 높은 노트부터 budget_tokens 안에 들어가는 만큼 담습니다.
+        예산보다 긴 노트는 남은 예산에 맞게 잘라 담고, 최종 프롬프트는 시간순으로 정렬합니다.
+        노트 수와 관계없이 토큰화는 예산이 찰 때까지만 수행합니다.
+
+        Returns:
+            (프롬프트 텍스트, 담긴 노트 목록)
+        """
+        remaining = budget_tokens
+        packed: List[Tuple[Dict, str]] = []
+        for note in self.rank(notes, query, now):
+            if remaining < self.min_note_tokens:
+                break
+            # 아주 긴 노트도 예산의 몇 배 이상은 토큰화하지 않음 (한 토큰은 보통 1글자 이상)
+            block = self._format(note)[: remaining * 8]
+            tokens = self.count_tokens(block)
+            if tokens > remaining:
+                block = self.model.detokenize(self.model.tokenize(block)[:remaining])
+                tokens = self.count_tokens(block)
+                if tokens > remaining:
+                    continue
+            packed.append((note, block))
+            remaining -= tokens + 1  # 노트 사이 줄바꿈
+
+        packed.sort(key=lambda item: item[0].get("created") or "")
+        return "\n".join(block for _, block in packed), [note for note, _ in packed]
+
+    def _recency(self, note: Dict, now: datetime) -> float:
+        timestamp = note.get("updated") or note.get("created")
+        if not timestamp:
+            return 0.0
+        age = max(0.0, (now - datetime.fromisoformat(timestamp)).total_seconds())
+        return math.pow(0.5, age / 86400 / self.half_life_days)
+
+    def _format(self, note: Dict) -> str:
+        """
+        노트 하나를 프롬프트 블록으로 만듭니다. 예) [task] 보고서 (2024-12-01): 초안 작성
+        """
+        date = note.get("date") or note.get("due_date") or note.get("created") or ""
+        header = f"[{note.get('type')}] {note.get('name', '')}"
+        if date:
+            header += f" ({date[:10]})"
+        return f"{header}: {note.get('content', '')}"
@@ -1,11 +1,45 @@
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from typing import Optional, List, Dict, Union, Any
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    Integer,
+    String,
+    create_engine,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.exc import IntegrityError
+from typing import Optional, List, Dict, Union, Any, Callable, Iterable, Iterator
 from datetime import datetime
+from itertools import islice
+import heapq
+import logging
 
-from server.models import MemoModel, EventModel, TaskModel
+from server.models import MemoModel, EventModel, TaskModel, NoteIndexModel
+from server.models import JobModel, LLMResultModel
 from server.models import Base  # 모델 정의 파일 경로를 맞춰야 함
 
+logger = logging.getLogger(__name__)
+
+# PATCH로 바꿀 수 없는 필드 (시각과 버전은 서버가 기록)
+READONLY_FIELDS = ("id", "type", "created", "updated", "version")
+
+# SQLite 쿼리 하나에 넣는 IN 목록 크기 (바인드 변수 수 제한)
+IN_CHUNK = 500
+
+
+class VersionConflict(Exception):
+    """
+    PATCH의 기준 버전이 저장된 노트의 버전과 다를 때 발생합니다.
+    """
+
+    def __init__(self, current: Dict):
+        super().__init__(f"Version conflict on note {current['id']}")
+        self.current = current
+
 
 class NoteRepository:
     """
@@ -18,7 +52,8 @@ class NoteRepository:
         """
         self.engine = create_engine(db_url)
         self.Session = sessionmaker(bind=self.engine)
-        self.session = self.Session()
+        # 요청 스레드와 백그라운드 워커가 함께 사용하므로 스레드별 세션 사용
+        self.session = scoped_session(self.Session)
 
         # 노트 타입에 따라 적절한 모델 선택
         self.model_mapping = {
@@ -28,8 +63,131 @@ class NoteRepository:
         }
         self.note_types = list(self.model_mapping.keys())
 
+        # 노트 변경 시 호출되는 리스너 목록
+        self.listeners: List[Callable[[str, Dict, Optional[Dict]], None]] = []
+        # 시작할 때 ID 충돌로 새 ID를 받은 노트 (리스너를 등록하면 알림)
+        self.renumbered: List[Dict] = []
+
         # 테이블 생성
         Base.metadata.create_all(self.engine)
+        self._add_version_column()
+        self._build_index()
+
+    def _add_version_column(self):
+        """
+        version 컬럼이 없던 노트 테이블에 컬럼을 추가합니다. (기존 노트는 버전 1)
+        """
+        inspector = inspect(self.engine)
+        with self.engine.begin() as connection:
+            for NoteClass in self.model_mapping.values():
+                table = NoteClass.__tablename__
+                columns = {column["name"] for column in inspector.get_columns(table)}
+                if "version" not in columns:
+                    connection.execute(
+                        text(
+                            f"ALTER TABLE {table} "
+                            "ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+                        )
+                    )
+
+    def _build_index(self):
+        """
+        ID 레지스트리가 없던 데이터베이스의 노트를 레지스트리에 등록합니다.
+        여러 타입이 같은 ID를 쓰고 있으면 뒤 타입의 노트에 새 ID를 부여하고,
+        이전 ID로 저장된 LLM 결과와 대기 작업은 버립니다.
+        새 ID를 받은 노트는 로그로 남기고 self.renumbered에 모아 리스너에 알립니다. (add_listener 참고)
+        """
+        with self.Session() as session:
+            notes = sum(
+                session.query(NoteClass).count()
+                for NoteClass in self.model_mapping.values()
+            )
+            if session.query(NoteIndexModel).count() == notes:
+                return
+
+            registered = {
+                note_id: note_type
+                for note_id, note_type in session.query(
+                    NoteIndexModel.id, NoteIndexModel.type
+                )
+            }
+            renumbered = []
+            for note_type, NoteClass in self.model_mapping.items():
+                for note in session.query(NoteClass).order_by(NoteClass.id):
+                    if registered.get(note.id) == note_type:
+                        continue
+                    if note.id in registered:
+                        for Model in (LLMResultModel, JobModel):
+                            session.query(Model).filter_by(
+                                note_type=note_type, note_id=note.id
+                            ).delete()
+                        entry = NoteIndexModel(type=note_type)
+                        session.add(entry)
+                        session.flush()
+                        logger.warning(
+                            f"Renumbered {note_type} note {note.id} -> {entry.id} "
+                            f"(ID {note.id} is already used by a {registered[note.id]} note)"
+                        )
+                        note.id = entry.id
+                        renumbered.append(note)
+                    else:
+                        session.add(NoteIndexModel(id=note.id, type=note_type))
+                    registered[note.id] = note_type
+            session.commit()
+            self.renumbered = [note.to_dict() for note in renumbered]
+
+    def resolve_type(self, note_id: int) -> Optional[str]:
+        """
+        ID 레지스트리에서 노트 타입을 찾습니다. (기본 키 조회 한 번)
+        """
+        entry = self.session.get(NoteIndexModel, note_id)
+        return entry.type if entry else None
+
+    def _note_class(self, note_id: int, note_type: Optional[str]):
+        """
+        노트 타입이 없으면 ID 레지스트리에서 찾아 모델 클래스를 반환합니다.
+        """
+        note_type = note_type or self.resolve_type(note_id)
+        if not note_type:
+            return None
+        NoteClass = self.model_mapping.get(note_type.lower())
+        if not NoteClass:
+            raise ValueError(f"Invalid note type: {note_type}")
+        return NoteClass
+
+    def add_listener(self, listener: Callable[[str, Dict, Optional[Dict]], None]):
+        """
+        노트 변경 리스너를 등록합니다.
+
+        Args:
+            listener: (event, note, previous) 형태로 호출되는 함수.
+                      event는 "create", "update", "delete", "delete_all" 중 하나이며,
+                      previous는 "update"일 때 변경 전 노트 데이터입니다.
+
+        시작할 때 ID가 바뀐 노트가 있으면 등록하자마자 "import"로 한 번 알려,
+        이전 ID를 기억하는 구독자(변경 푸시를 받는 클라이언트 등)가 전체 목록을 다시 받게 합니다.
+        """
+        self.listeners.append(listener)
+        if self.renumbered:
+            self._notify(
+                "import", {"type": None, "notes": self.renumbered}, listeners=[listener]
+            )
+
+    def _notify(
+        self,
+        event: str,
+        note: Dict,
+        previous: Optional[Dict] = None,
+        listeners: Optional[List[Callable]] = None,
+    ):
+        """
+        등록된 리스너(또는 listeners)에 노트 변경을 알립니다. 리스너 오류는 저장 결과에 영향을 주지 않습니다.
+        """
+        for listener in self.listeners if listeners is None else listeners:
+            try:
+                listener(event, note, previous)
+            except Exception as e:
+                print(f"Error in note listener for {event}: {e}")
 
     def create(self, data: Dict) -> int:
         """
@@ -46,14 +204,21 @@ class NoteRepository:
         if "due_date" in data:
             data["due_date"] = datetime.fromisoformat(data["due_date"])
 
-        note = NoteClass(**data)
+        # 모든 타입이 공유하는 시퀀스에서 ID 발급
+        entry = NoteIndexModel(type=data["type"].lower())
+        self.session.add(entry)
+        self.session.flush()
+
+        note = NoteClass(**{**data, "id": entry.id})
         self.session.add(note)
         self.session.commit()
+        self._notify("create", note.to_dict())
         return note.id
 
     def get_filtered_notes(self, note_type: str, filters: Dict[str, Any]) -> List[Dict]:
         """
-        다양한 조건(id, created, updated, tags)으로 노트를 필터링하여 반환합니다.
+        다양한 조건(id, created, updated, date, tags)으로 노트를 필터링하여 반환합니다.
+        date 조건은 일정(event)에만 쓸 수 있습니다.
         """
         NoteClass = self.model_mapping.get(note_type.lower())
         if not NoteClass:
@@ -71,6 +236,13 @@ class NoteRepository:
             updated_end = datetime.fromisoformat(filters["updated_end"])
             query = query.filter(NoteClass.updated.between(updated_start, updated_end))
 
+        if "date_start" in filters and "date_end" in filters:
+            if not hasattr(NoteClass, "date"):
+                raise ValueError(f"Date filter is not supported for {note_type}")
+            date_start = datetime.fromisoformat(filters["date_start"])
+            date_end = datetime.fromisoformat(filters["date_end"])
+            query = query.filter(NoteClass.date.between(date_start, date_end))
+
         if "tags" in filters:
             tags = filters["tags"]
             query = query.filter(NoteClass.tags.contains(tags))
@@ -78,13 +250,168 @@ class NoteRepository:
         results = query.all()
         return [note.to_dict() for note in results]
 
-    def read(self, note_id: int, note_type: str) -> Optional[Dict]:
+    def export_notes(
+        self, note_type: Optional[str] = None, after: int = 0, batch_size: int = 1000
+    ) -> Iterator[Dict]:
         """
-        ID에 해당하는 노트를 반환합니다.
+        노트를 ID 순서로 하나씩 내보냅니다. (여러 타입을 ID 순으로 합침)
+        타입마다 마지막으로 읽은 ID 이후를 batch_size개씩 짧은 읽기로 가져오므로,
+        노트 수와 관계없이 메모리를 적게 쓰고 내보내는 동안에도 쓰기를 막지 않습니다.
+
+        Args:
+            note_type (str): 선택, 내보낼 노트 타입. 없으면 모든 타입
+            after (int): 이 ID 이후의 노트만 내보냄 (중단된 내보내기 이어 받기)
+            batch_size (int): 한 번에 읽을 노트 수
+        Returns:
+            Iterator[dict]: to_dict()와 같은 형식의 노트
+        Raises:
+            ValueError: 없는 노트 타입
         """
-        NoteClass = self.model_mapping.get(note_type.lower())
+        if note_type:
+            NoteClass = self.model_mapping.get(note_type.lower())
+            if not NoteClass:
+                raise ValueError(f"Invalid note type: {note_type}")
+            classes = [NoteClass]
+        else:
+            classes = list(self.model_mapping.values())
+        return heapq.merge(
+            *(
+                self._export_class(NoteClass, after, batch_size)
+                for NoteClass in classes
+            ),
+            key=lambda note: note["id"],
+        )
+
+    def _export_class(self, NoteClass, after: int, batch_size: int) -> Iterator[Dict]:
+        table = NoteClass.__table__
+        while True:
+            with self.Session() as session:
+                rows = (
+                    session.execute(
+                        select(table)
+                        .where(table.c.id > after)
+                        .order_by(table.c.id)
+                        .limit(batch_size)
+                    )
+                    .mappings()
+                    .all()
+                )
+            if not rows:
+                return
+            for row in rows:
+                # ORM 객체를 만들지 않고 to_dict()와 같은 형식으로 변환
+                yield {
+                    key: value.isoformat() if isinstance(value, datetime) else value
+                    for key, value in row.items()
+                }
+            after = rows[-1]["id"]
+
+    def import_notes(
+        self,
+        notes: Iterable[Dict],
+        batch_size: int = 1000,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        내보낸 노트를 ID와 생성/수정 시각, 버전을 그대로 유지한 채 가져옵니다.
+        batch_size개씩 트랜잭션 하나에 한꺼번에(executemany) 넣으므로, 중간에 실패하면
+        앞 묶음은 남고 실패한 묶음만 통째로 취소됩니다. 같은 ID의 노트가 이미 있으면
+        가져온 노트로 바꾸므로, 중단된 가져오기를 겹치는 위치부터 다시 실행해도 됩니다.
+
+        리스너에는 바뀐 기존 노트를 "delete"로, 묶음마다 가져온 노트를 "import" 하나로 알립니다.
+        (노트마다 "create"를 알리지 않으므로 생성 시 미리 실행하는 LLM 작업은 등록되지 않습니다.)
+
+        Args:
+            notes (Iterable[dict]): export_notes() 형식의 노트. 묶음 크기만큼씩 읽습니다.
+            batch_size (int): 트랜잭션 하나에 넣을 노트 수
+            on_progress: 묶음을 커밋할 때마다 지금까지 가져온 노트 수로 호출되는 함수
+        Returns:
+            int: 가져온 노트 수
+        Raises:
+            ValueError: 타입이나 ID가 없거나, 없는 필드/빠진 필수 필드가 있는 노트
+        """
+        imported = 0
+        notes = iter(notes)
+        while True:
+            # islice는 묶음 크기만큼만 읽으므로 커밋 시점에 읽은 위치가 묶음 끝과 같음
+            chunk = list(islice(notes, batch_size))
+            if not chunk:
+                return imported
+            imported += self._import_chunk(chunk)
+            if on_progress:
+                on_progress(imported)
+
+    def _import_chunk(self, chunk: List[Dict]) -> int:
+        """
+        노트 묶음 하나를 트랜잭션 하나로 넣습니다. (같은 ID는 마지막 노트만)
+        """
+        notes: Dict[int, Dict] = {}
+        rows: Dict[int, Dict] = {}
+        for note in chunk:
+            note_type = (note.get("type") or "").lower()
+            NoteClass = self.model_mapping.get(note_type)
+            if not NoteClass:
+                raise ValueError(f"Invalid note type: {note.get('type')}")
+            if not isinstance(note.get("id"), int):
+                raise ValueError(f"Note without id: {note.get('name')}")
+            notes[note["id"]] = note
+            rows[note["id"]] = _import_row(NoteClass, note_type, note)
+
+        ids = list(rows)
+        replaced = []
+        with self.Session() as session:
+            existing: Dict[str, List[int]] = {}
+            for start in range(0, len(ids), IN_CHUNK):
+                for note_id, note_type in session.query(
+                    NoteIndexModel.id, NoteIndexModel.type
+                ).filter(NoteIndexModel.id.in_(ids[start : start + IN_CHUNK])):
+                    existing.setdefault(note_type, []).append(note_id)
+            for note_type, note_ids in existing.items():
+                NoteClass = self.model_mapping[note_type]
+                for start in range(0, len(note_ids), IN_CHUNK):
+                    query = session.query(NoteClass).filter(
+                        NoteClass.id.in_(note_ids[start : start + IN_CHUNK])
+                    )
+                    replaced.extend(note.to_dict() for note in query)
+                    query.delete(synchronize_session=False)
+                    session.query(NoteIndexModel).filter(
+                        NoteIndexModel.id.in_(note_ids[start : start + IN_CHUNK])
+                    ).delete(synchronize_session=False)
+
+            by_type: Dict[str, List[Dict]] = {}
+            for row in rows.values():
+                by_type.setdefault(row["type"], []).append(row)
+            try:
+                session.execute(
+                    insert(NoteIndexModel.__table__),
+                    [
+                        {"id": note_id, "type": row["type"]}
+                        for note_id, row in rows.items()
+                    ],
+                )
+                for note_type, type_rows in by_type.items():
+                    session.execute(
+                        insert(self.model_mapping[note_type].__table__), type_rows
+                    )
+                session.commit()
+            except IntegrityError as e:
+                session.rollback()
+                raise ValueError(f"Cannot import notes: {e.orig}")
+
+        for note in replaced:
+            self._notify("delete", note)
+        self._notify("import", {"type": None, "notes": list(notes.values())})
+        return len(rows)
+
+    def read(self, note_id: int, note_type: Optional[str] = None) -> Optional[Dict]:
+        """
+        ID에 해당하는 노트를 반환합니다. 타입을 지정하지 않으면 ID 레지스트리에서 찾습니다.
+        """
+        NoteClass = self._note_class(note_id, note_type)
+        if not NoteClass:
+            return None
 
-        note = self.session.query(NoteClass).filter_by(id=note_id).first()
+        note = self.session.get(NoteClass, note_id)
         return note.to_dict() if note else None
 
     def read_all(self, note_type: str) -> List[Dict]:
@@ -99,31 +426,104 @@ class NoteRepository:
 
     def update(self, note_id: int, updates: Dict) -> bool:
         """
-        ID에 해당하는 노트를 업데이트합니다.
+        ID에 해당하는 노트를 업데이트합니다. 노트 타입은 ID 레지스트리를 따릅니다.
         """
-        NoteClass = self.model_mapping.get(updates.get("type").lower())
+        note_type = self.resolve_type(note_id) or updates.get("type")
+        NoteClass = self._note_class(note_id, note_type)
+        if not NoteClass:
+            return False
 
-        note = self.session.query(NoteClass).filter_by(id=note_id).first()
+        note = self.session.get(NoteClass, note_id)
         if not note:
             return False
 
-        note.from_dict(updates)
+        previous = note.to_dict()
+        # ID와 타입, 버전은 바꿀 수 없음
+        note.from_dict(
+            {
+                key: value
+                for key, value in updates.items()
+                if key not in ("id", "type", "version")
+            }
+        )
+        note.version = (note.version or 0) + 1
 
         self.session.commit()
+        self._notify("update", note.to_dict(), previous)
         return True
 
-    def delete(self, note_id: int, note_type: str) -> bool:
+    def patch(
+        self, note_id: int, changes: Dict, version: Optional[int] = None
+    ) -> Optional[Dict]:
         """
-        ID에 해당하는 노트를 삭제합니다.
+        주어진 필드만 노트에 반영합니다.
+        version을 주면 저장된 버전이 같을 때만 반영하며, 확인과 반영은 UPDATE 한 번으로 처리합니다.
+
+        Args:
+            note_id (int): 노트 ID
+            changes (dict): 바꿀 필드와 값
+            version (int): 선택, 클라이언트가 알고 있는 노트 버전
+        Returns:
+            dict: 반영된 노트 (버전 1 증가). 노트가 없으면 None
+        Raises:
+            ValueError: 없는 필드이거나 바꿀 수 없는 필드, 또는 컬럼에 맞지 않는 값 (null 포함)
+            VersionConflict: 저장된 버전이 version과 다름
         """
-        NoteClass = self.model_mapping.get(note_type.lower())
+        NoteClass = self._note_class(note_id, None)
+        if not NoteClass:
+            return None
+
+        columns = set(NoteClass.__table__.columns.keys())
+        invalid = [
+            key for key in changes if key not in columns or key in READONLY_FIELDS
+        ]
+        if invalid:
+            raise ValueError(f"Cannot patch fields: {', '.join(invalid)}")
+        # 쓰기 전에 검사해야 IntegrityError(500) 대신 ValueError(400)가 됨
+        values = _patch_values(NoteClass, changes)
+
+        note = self.session.get(NoteClass, note_id)
+        if not note:
+            return None
+        if not changes and version in (None, note.version):
+            return note.to_dict()
+        previous = note.to_dict()
+
+        values.update(version=NoteClass.version + 1, updated=datetime.utcnow())
+
+        query = self.session.query(NoteClass).filter(NoteClass.id == note_id)
+        if version is not None:
+            query = query.filter(NoteClass.version == version)
+        if query.update(values, synchronize_session=False) == 0:
+            self.session.rollback()
+            current = self.read(note_id)
+            if current is None:
+                return None
+            raise VersionConflict(current)
+        self.session.commit()
 
-        note = self.session.query(NoteClass).filter_by(id=note_id).first()
+        # 커밋 후 만료된 객체를 다시 읽어 반영된 값과 버전을 가져옴
+        patched = note.to_dict()
+        self._notify("update", patched, previous)
+        return patched
+
+    def delete(self, note_id: int, note_type: Optional[str] = None) -> bool:
+        """
+        ID에 해당하는 노트를 삭제합니다. 타입을 지정하지 않으면 ID 레지스트리에서 찾습니다.
+        """
+        NoteClass = self._note_class(note_id, note_type)
+        if not NoteClass:
+            return False
+
+        note = self.session.get(NoteClass, note_id)
         if not note:
             return False
 
+        deleted = note.to_dict()
         self.session.delete(note)
+        self.session.query(NoteIndexModel).filter_by(id=note_id).delete()
         self.session.commit()
+        self._notify("delete", deleted)
         return True
 
     def delete_all(self, note_type: Optional[str] = None) -> bool:
@@ -144,14 +544,82 @@ class NoteRepository:
                 if not NoteClass:
                     raise ValueError(f"Invalid note type: {note_type}")
                 self.session.query(NoteClass).delete()
+                self.session.query(NoteIndexModel).filter_by(
+                    type=note_type.lower()
+                ).delete()
             else:
                 # 모든 노트 삭제
                 for NoteClass in self.model_mapping.values():
                     self.session.query(NoteClass).delete()
+                self.session.query(NoteIndexModel).delete()
 
             self.session.commit()
+            self._notify("delete_all", {"type": note_type})
             return True
         except Exception as e:
             self.session.rollback()
             print(f"Error while deleting notes: {e}")
             return False
+
+
+def _patch_values(NoteClass, changes: Dict) -> Dict:
+    """
+    PATCH 값을 컬럼 타입에 맞는지 확인하고 저장할 값으로 바꿉니다. (날짜 문자열 -> datetime)
+    """
+    columns = NoteClass.__table__.columns
+    values = {}
+    for key, value in changes.items():
+        column = columns[key]
+        if value is None:
+            if not column.nullable:
+                raise ValueError(f"Field cannot be null: {key}")
+        elif isinstance(column.type, DateTime):
+            if not isinstance(value, str):
+                raise ValueError(f"Field must be an ISO date string: {key}")
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"Field must be an ISO date string: {key}")
+        elif isinstance(column.type, Boolean):
+            if not isinstance(value, bool):
+                raise ValueError(f"Field must be a boolean: {key}")
+        elif isinstance(column.type, Integer):
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise ValueError(f"Field must be an integer: {key}")
+        elif isinstance(column.type, String):
+            if not isinstance(value, str):
+                raise ValueError(f"Field must be a string: {key}")
+        elif isinstance(column.type, JSON) and key == "tags":
+            if not isinstance(value, list) or not all(
+                isinstance(tag, str) for tag in value
+            ):
+                raise ValueError(f"Field must be a list of strings: {key}")
+        values[key] = value
+    return values
+
+
+def _import_row(NoteClass, note_type: str, note: Dict) -> Dict:
+    """
+    가져올 노트를 테이블 행으로 바꿉니다. 모든 행이 같은 컬럼을 가져야 한꺼번에 넣을 수 있으므로
+    빠진 값은 모델 기본값으로 채웁니다.
+    """
+    columns = NoteClass.__table__.columns
+    invalid = [key for key in note if key not in columns]
+    if invalid:
+        raise ValueError(f"Cannot import fields: {', '.join(invalid)}")
+
+    row = {column.name: note.get(column.name) for column in columns}
+    now = datetime.utcnow()
+    row.update(
+        type=note_type,
+        tags=row["tags"] if row["tags"] is not None else [],
+        created=row["created"] or now,
+        updated=row["updated"] or now,
+        version=row["version"] or 1,
+    )
+    if "done" in row and row["done"] is None:
+        row["done"] = False
+    for column in columns:
+        if isinstance(column.type, DateTime) and isinstance(row[column.name], str):
+            row[column.name] = datetime.fromisoformat(row[column.name])
+    return row
@@ -0,0 +1,401 @@
+import os
+import re
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# 노트 타입 ↔ 키 배열에 저장하는 코드 (0은 빈 행)
+TYPE_CODES = {"memo": 1, "event": 2, "task": 3}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+
+
+def note_text(note: Dict) -> str:
+    """
+    임베딩에 사용할 노트 텍스트 (제목, 내용, 태그)
+    """
+    tags = note.get("tags") or []
+    return "\n".join(
+        [note.get("name") or "", note.get("content") or "", " ".join(tags)]
+    )
+
+
+class HashingEmbedder:
+    """
+    문자 n-gram 해싱 기반 임베더.
+    별도 모델 없이 동작하며, 한국어처럼 띄어쓰기 단위가 긴 텍스트에서도 부분 일치를 반영합니다.
+    """
+
+    def __init__(self, dim: int = 256, ngram_range: Tuple[int, int] = (2, 3)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _hashes(self, text: str) -> List[int]:
+        hashes = []
+        for word in re.findall(r"\w+", text.lower()):
+            word = f" {word} "
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                for i in range(len(word) - n + 1):
+                    hashes.append(zlib.crc32(word[i : i + n].encode("utf-8")))
+        return hashes
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        텍스트 목록을 L2 정규화된 (len(texts), dim) 행렬로 변환합니다.
+        """
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            hashes = np.array(self._hashes(text), dtype=np.uint32)
+            if not len(hashes):
+                continue
+            # 하위 비트로 차원, 상위 비트로 부호를 정해 해시 충돌의 편향을 줄임
+            signs = np.where((hashes >> 16) & 1, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix[i], hashes % self.dim, signs)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class EmbeddingIndex:
+    """
+    EmbeddingIndex는 노트 임베딩을 메모리 맵 NumPy 행렬에 저장하고 코사인 유사도 top-K 검색을 제공합니다.
+    노트 수가 ivf_threshold 이상이면 IVF(역파일) 근사 인덱스로 검색 범위를 줄입니다.
+    """
+
+    def __init__(
+        self,
+        path: str = "embeddings",
+        embedder: Optional[HashingEmbedder] = None,
+        initial_capacity: int = 1024,
+        ivf_threshold: int = 5000,
+        nprobe: int = 8,
+    ):
+        """
+        Args:
+            path (str): vectors.npy, keys.npy를 저장할 디렉터리
+            embedder: embed(texts) -> np.ndarray를 제공하는 임베더
+            initial_capacity (int): 처음 할당할 행 수 (부족하면 두 배씩 늘어남)
+            ivf_threshold (int): IVF 인덱스를 사용하기 시작하는 노트 수
+            nprobe (int): IVF 검색 시 확인할 클러스터 수
+        """
+        self.path = path
+        self.embedder = embedder or HashingEmbedder()
+        self.dim = self.embedder.dim
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.lock = threading.RLock()
+
+        os.makedirs(path, exist_ok=True)
+        self.vectors_path = os.path.join(path, "vectors.npy")
+        self.keys_path = os.path.join(path, "keys.npy")
+
+        if os.path.exists(self.vectors_path) and os.path.exists(self.keys_path):
+            self.vectors = np.load(self.vectors_path, mmap_mode="r+")
+            self.keys = np.load(self.keys_path, mmap_mode="r+")
+            if self.vectors.shape[1] != self.dim:
+                # 임베딩 차원이 바뀌면 인덱스를 새로 만듦
+                del self.vectors, self.keys
+                self._allocate(initial_capacity)
+        else:
+            self._allocate(initial_capacity)
+
+        self._load_rows()
+
+        # IVF 상태: 중심 벡터, 행별 클러스터 번호, 클러스터별 행 목록
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments: Optional[np.ndarray] = None
+        self.lists: List[List[int]] = []
+        self.trained_size = 0
+        self._maybe_train()
+
+    def _allocate(self, capacity: int, copy_rows: int = 0):
+        """
+        capacity 행의 메모리 맵 파일을 만들고, 기존 데이터가 있으면 앞쪽 copy_rows 행을 복사합니다.
+        """
+        vectors = np.lib.format.open_memmap(
+            self.vectors_path + ".tmp",
+            mode="w+",
+            dtype=np.float32,
+            shape=(capacity, self.dim),
+        )
+        keys = np.lib.format.open_memmap(
+            self.keys_path + ".tmp", mode="w+", dtype=np.int64, shape=(capacity, 2)
+        )
+        if copy_rows:
+            vectors[:copy_rows] = self.vectors[:copy_rows]
+            keys[:copy_rows] = self.keys[:copy_rows]
+            del self.vectors, self.keys
+        vectors.flush()
+        keys.flush()
+        del vectors, keys
+
+        os.replace(self.vectors_path + ".tmp", self.vectors_path)
+        os.replace(self.keys_path + ".tmp", self.keys_path)
+        self.vectors = np.load(self.vectors_path, mmap_mode="r+")
+        self.keys = np.load(self.keys_path, mmap_mode="r+")
+
+    def _load_rows(self):
+        """
+        키 배열에서 (타입, ID) → 행 번호 매핑과 빈 행 목록을 만듭니다.
+        """
+        used = np.flatnonzero(self.keys[:, 0])
+        self.size = int(used[-1]) + 1 if len(used) else 0
+        self.rows: Dict[Tuple[str, int], int] = {
+            (TYPE_NAMES[int(self.keys[row, 0])], int(self.keys[row, 1])): int(row)
+            for row in used
+        }
+        self.free = [int(row) for row in np.flatnonzero(self.keys[: self.size, 0] == 0)]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, key: Tuple[str, int]) -> bool:
+        return key in self.rows
+
+    def upsert(self, note_type: str, note_id: int, text: str):
+        """
+        노트 임베딩을 추가하거나 갱신합니다.
+        """
+        self.upsert_many([(note_type, note_id, text)])
+
+    def upsert_many(self, items: List[Tuple[str, int, str]]):
+        """
+        여러 노트의 임베딩을 한 번에 계산하여 추가하거나 갱신합니다.
+        """
+        if not items:
+            return
+        matrix = self.embedder.embed([text for _, _, text in items])
+
+        with self.lock:
+            for (note_type, note_id, _), vector in zip(items, matrix):
+                key = (note_type.lower(), int(note_id))
+                row = self.rows.get(key)
+                if row is None:
+                    row = self._next_row()
+                    self.rows[key] = row
+                    self.keys[row] = (TYPE_CODES[key[0]], key[1])
+                self.vectors[row] = vector
+                self._assign(row, vector)
+
+            self.vectors.flush()
+            self.keys.flush()
+            self._maybe_train()
+
+    def delete(self, note_type: str, note_id: int) -> bool:
+        """
+        노트 임베딩을 제거합니다. 비워진 행은 이후 추가 시 재사용됩니다.
+        """
+        with self.lock:
+            row = self.rows.pop((note_type.lower(), int(note_id)), None)
+            if row is None:
+                return False
+            self.keys[row] = 0
+            self.vectors[row] = 0
+            self.free.append(row)
+            self._unassign(row)
+            self.keys.flush()
+            return True
+
+    def delete_type(self, note_type: Optional[str] = None):
+        """
+        특정 타입(또는 전체)의 임베딩을 제거합니다.
+        """
+        with self.lock:
+            for key in list(self.rows):
+                if note_type is None or key[0] == note_type.lower():
+                    self.delete(*key)
+
+    def sync(self, notes: Iterable[Dict]):
+        """
+        저장소의 노트 목록과 인덱스를 맞춥니다.
+        인덱스에 없는 노트만 임베딩하고, 저장소에 없는 노트는 제거합니다.
+        """
+        notes = list(notes)
+        existing = {(note["type"].lower(), note["id"]) for note in notes}
+        with self.lock:
+            for key in [key for key in self.rows if key not in existing]:
+                self.delete(*key)
+            self.upsert_many(
+                [
+                    (note["type"], note["id"], note_text(note))
+                    for note in notes
+                    if (note["type"].lower(), note["id"]) not in self.rows
+                ]
+            )
+
+    def _next_row(self) -> int:
+        if self.free:
+            return self.free.pop()
+        if self.size == len(self.vectors):
+            self._allocate(len(self.vectors) * 2, copy_rows=self.size)
+            if self.assignments is not None:
+                self.assignments = np.concatenate(
+                    [self.assignments, np.full(len(self.assignments), -1, np.int32)]
+                )
+        self.size += 1
+        return self.size - 1
+
+    def search(
+        self, vector: np.ndarray, k: int = 5, exclude: Iterable[int] = ()
+    ) -> List[Tuple[str, int, float]]:
+        """
+        코사인 유사도가 가장 높은 k개의 노트를 반환합니다.
+
+        Returns:
+            list: (노트 타입, 노트 ID, 점수) 목록 (점수 내림차순)
+        """
+        with self.lock:
+            rows = self._candidates(vector)
+            if rows is None:
+                # 전체 검색은 메모리 맵을 복사하지 않고 슬라이스로 바로 계산
+                rows = np.arange(self.size)
+                scores = self.vectors[: self.size] @ vector
+                valid = self.keys[: self.size, 0] != 0
+            else:
+                scores = self.vectors[rows] @ vector
+                valid = self.keys[rows, 0] != 0
+            for row in exclude:
+                valid &= rows != row
+            scores = np.where(valid, scores, -np.inf)
+
+            k = min(k, int(valid.sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (
+                    TYPE_NAMES[int(self.keys[rows[i], 0])],
+                    int(self.keys[rows[i], 1]),
+                    float(scores[i]),
+                )
+                for i in top
+            ]
+
+    def related(
+        self, note_type: str, note_id: int, k: int = 5
+    ) -> List[Tuple[str, int, float]]:
+        """
+        주어진 노트와 가장 비슷한 노트 k개를 반환합니다 (자기 자신 제외).
+        """
+        with self.lock:
+            row = self.rows.get((note_type.lower(), int(note_id)))
+            if row is None:
+                return []
+            return self.search(np.array(self.vectors[row]), k, exclude=[row])
+
+    def lookup(self, keys: List[Tuple[str, int]]) -> Tuple[np.ndarray, List[int]]:
+        """
+        저장된 노트 임베딩을 (타입, ID) 순서대로 꺼냅니다.
+
+        Returns:
+            tuple: ((len(keys), dim) 행렬, 인덱스에 없는 위치 목록). 없는 위치의 행은 0입니다.
+        """
+        matrix = np.zeros((len(keys), self.dim), dtype=np.float32)
+        missing = []
+        with self.lock:
+            for i, (note_type, note_id) in enumerate(keys):
+                row = self.rows.get((note_type.lower(), int(note_id)))
+                if row is None:
+                    missing.append(i)
+                else:
+                    matrix[i] = self.vectors[row]
+        return matrix, missing
+
+    def query(self, text: str, k: int = 5) -> List[Tuple[str, int, float]]:
+        """
+        텍스트와 가장 비슷한 노트 k개를 반환합니다.
+        """
+        return self.search(self.embedder.embed([text])[0], k)
+
+    def _candidates(self, vector: np.ndarray) -> Optional[np.ndarray]:
+        """
+        검색할 행 번호 목록. IVF가 없으면 None(전체 검색), 있으면 가까운 nprobe개 클러스터의 행만 반환합니다.
+        """
+        if self.centroids is None:
+            return None
+
+        probe = np.argsort(-(self.centroids @ vector))[: self.nprobe]
+        rows = [row for cluster in probe for row in self.lists[cluster]]
+        return np.array(rows, dtype=np.int64)
+
+    def _maybe_train(self):
+        """
+        노트 수가 임계값을 넘었거나, 마지막 학습 이후 두 배로 늘었으면 IVF를 다시 학습합니다.
+        """
+        count = len(self.rows)
+        if count < self.ivf_threshold:
+            self.centroids = None
+            self.assignments = None
+            self.lists = []
+            return
+        if self.centroids is None or count >= 2 * self.trained_size:
+            self.train_ivf()
+
+    def train_ivf(self, nlist: Optional[int] = None, iterations: int = 10):
+        """
+        구면 k-means로 클러스터 중심을 학습하고 모든 행을 클러스터에 배정합니다.
+        """
+        with self.lock:
+            active = np.flatnonzero(self.keys[: self.size, 0])
+            if not len(active):
+                return
+            data = np.asarray(self.vectors[active])
+            nlist = min(nlist or max(1, int(np.sqrt(len(active)))), len(active))
+
+            rng = np.random.default_rng(0)
+            centroids = data[rng.choice(len(active), nlist, replace=False)]
+            for _ in range(iterations):
+                assign = np.argmax(data @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assign, data)
+                counts = np.bincount(assign, minlength=nlist)
+                nonempty = counts > 0
+                centroids[nonempty] = sums[nonempty]
+                norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                centroids = centroids / norms
+
+            assign = np.argmax(data @ centroids.T, axis=1)
+            self.centroids = centroids.astype(np.float32)
+            self.assignments = np.full(len(self.vectors), -1, dtype=np.int32)
+            self.assignments[active] = assign
+            self.lists = [[] for _ in range(nlist)]
+            for row, cluster in zip(active, assign):
+                self.lists[cluster].append(int(row))
+            self.trained_size = len(active)
+
+    def _assign(self, row: int, vector: np.ndarray):
+        if self.centroids is None:
+            return
+        self._unassign(row)
+        cluster = int(np.argmax(self.centroids @ vector))
+        self.assignments[row] = cluster
+        self.lists[cluster].append(row)
+
+    def _unassign(self, row: int):
+        if self.centroids is None or self.assignments[row] < 0:
+            return
+        self.lists[self.assignments[row]].remove(row)
+        self.assignments[row] = -1
+
+    def on_note_changed(
+        self, event: str, note: Dict, previous: Optional[Dict] = None
+    ) -> None:
+        """
+        NoteRepository 리스너: 노트 변경 시 인덱스를 증분 갱신합니다.
+        """
+        if event in ("create", "update"):
+            if previous and note_text(previous) == note_text(note):
+                return
+            self.upsert(note["type"], note["id"], note_text(note))
+        elif event == "delete":
+            self.delete(note["type"], note["id"])
+        elif event == "delete_all":
+            self.delete_type(note.get("type"))
+        elif event == "import":
+            self.upsert_many(
+                [(n["type"], n["id"], note_text(n)) for n in note["notes"]]
+            )
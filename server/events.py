@@ -0,0 +1,139 @@
+import threading
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+class NoteEventFeed:
+    """
+    노트 변경을 연결된 클라이언트에 보내기 위한 변경 메시지 목록
+
+    - NoteRepository 리스너로 등록하면 쓰기마다 작은 변경 메시지를 순번과 함께 기록합니다.
+    - 최근 max_events개만 보관합니다. 클라이언트는 마지막으로 받은 메시지의 토큰으로
+      놓친 메시지만 받습니다.
+    - 토큰이 보관 범위보다 오래되었거나 서버가 재시작되었으면 reset을 알려
+      클라이언트가 전체 목록을 다시 받게 합니다.
+    - 메시지는 모든 클라이언트가 공유하고 클라이언트는 토큰 하나만 들고 다시 요청하므로
+      (long polling) 서버는 연결별 상태를 두지 않습니다. 새 메시지를 기다리는 요청만
+      최대 poll_wait초 동안 요청 스레드를 쓰며, 그 수를 max_waiters로 제한합니다.
+    """
+
+    def __init__(self, max_events: int = 1000, max_waiters: int = 256):
+        """
+        Args:
+            max_events (int): 재연결용으로 보관할 최근 메시지 수
+            max_waiters (int): 새 메시지를 동시에 기다릴 수 있는 요청 수
+        """
+        # 서버 실행마다 달라지므로 이전 실행의 토큰은 순번이 겹쳐도 구분됨
+        self.epoch = uuid.uuid4().hex[:8]
+        self.events: deque = deque(maxlen=max_events)
+        self.seq = 0
+        self.condition = threading.Condition()
+        self.max_waiters = max_waiters
+        self.waiters = 0
+
+    def on_note_changed(self, event: str, note: Dict, previous: Optional[Dict] = None):
+        """
+        NoteRepository 변경 리스너 (NoteRepository.add_listener 참고)
+        """
+        message = compact_message(event, note, previous)
+        with self.condition:
+            self.seq += 1
+            self.events.append((self.seq, message))
+            self.condition.notify_all()
+
+    def token(self, seq: int) -> str:
+        return f"{self.epoch}:{seq}"
+
+    def _parse(self, token: Optional[str]) -> Optional[int]:
+        """
+        토큰의 순번. 다른 실행의 토큰이거나 형식이 틀리면 None
+        """
+        epoch, _, seq = (token or "").partition(":")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def since(self, token: Optional[str]) -> Tuple[List[Tuple[int, Dict]], bool]:
+        """
+        토큰 이후의 메시지 목록
+
+        Args:
+            token (str): 마지막으로 받은 메시지의 토큰. None이면 지금부터 받음
+        Returns:
+            tuple: ([(순번, 메시지)], reset). reset이 True이면 놓친 메시지를 알 수 없으므로
+                   클라이언트가 전체 목록을 다시 받아야 합니다.
+        """
+        seq = self._parse(token)
+        with self.condition:
+            if token is None:
+                return [], False
+            oldest = self.events[0][0] if self.events else self.seq + 1
+            if seq is None or seq > self.seq or seq < oldest - 1:
+                return [], True
+            return [(s, message) for s, message in self.events if s > seq], False
+
+    def poll(self, token: Optional[str], timeout: float) -> Optional[Dict]:
+        """
+        토큰 이후의 메시지를 반환합니다. 놓친 메시지가 없으면 새 메시지가 올 때까지
+        최대 timeout초 기다립니다 (long polling).
+        토큰이 없으면 기다리지 않고 현재 위치만 알려 줍니다. 클라이언트는 이때 전체 목록을 받고
+        돌려받은 토큰으로 다음 요청을 보냅니다.
+
+        Args:
+            token (str): 마지막으로 받은 토큰. None이면 지금부터 받음
+            timeout (float): 새 메시지를 기다리는 최대 시간(초)
+        Returns:
+            dict: {"token": 다음 요청에 보낼 토큰, "events": [메시지], "reset": bool}
+                  이미 max_waiters개 요청이 기다리고 있으면 None
+        """
+        with self.condition:
+            messages, reset = self.since(token)
+            if token is not None and not reset and not messages and timeout > 0:
+                if self.waiters >= self.max_waiters:
+                    return None
+                seq = self._parse(token)
+                self.waiters += 1
+                try:
+                    self.condition.wait_for(lambda: self.seq != seq, timeout)
+                finally:
+                    self.waiters -= 1
+                messages, reset = self.since(token)
+            if reset or token is None:
+                seq = self.seq
+            elif messages:
+                seq = messages[-1][0]
+            else:
+                seq = self._parse(token)
+        return {
+            "token": self.token(seq),
+            "events": [message for _, message in messages],
+            "reset": reset,
+        }
+
+
+def compact_message(event: str, note: Dict, previous: Optional[Dict] = None) -> Dict:
+    """
+    리스너 알림을 클라이언트로 보낼 변경 메시지로 줄입니다.
+
+    - create: 노트 전체
+    - update: 이전 노트를 알면 바뀐 필드와 이전 버전만 (base_version), 모르면 노트 전체
+    - delete: ID와 타입만
+    - delete_all: 타입만 (None이면 모든 타입)
+    - import: 대량 가져오기는 노트별로 보내지 않고 "reset"으로 전체 목록을 다시 받게 함
+    """
+    if event == "import":
+        return {"event": "reset"}
+    if event == "delete_all":
+        return {"event": event, "type": note.get("type")}
+    message = {"event": event, "id": note["id"], "type": note.get("type")}
+    if event == "delete":
+        return message
+    if event == "update" and previous is not None and previous.get("version"):
+        message["changes"] = {
+            key: value for key, value in note.items() if previous.get(key) != value
+        }
+        message["base_version"] = previous["version"]
+    else:
+        message["note"] = note
+    return message
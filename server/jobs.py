@@ -0,0 +1,243 @@
+import logging
+import threading
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from server.models import Base, JobModel
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """
+    JobQueue는 LLM 작업을 SQLite에 저장하고 백그라운드 워커 스레드에서 처리합니다.
+    서버가 재시작되어도 처리되지 않은 작업은 다시 실행됩니다.
+    """
+
+    # 우선순위 이름 → 값 (값이 클수록 먼저 처리)
+    PRIORITIES = {"low": 0, "normal": 1, "high": 2}
+
+    def __init__(
+        self,
+        engine,
+        note_repository,
+        llm_handler,
+        workers: int = 1,
+        eager_actions: Optional[Dict[str, List[str]]] = None,
+        poll_interval: float = 1.0,
+        admission=None,
+    ):
+        """
+        Args:
+            engine: 노트 저장소와 공유하는 SQLAlchemy 엔진
+            note_repository (NoteRepository): 작업 대상 노트를 읽을 저장소
+            llm_handler (LLMHandler): 작업을 처리할 LLM 핸들러
+            workers (int): 동시에 실행할 최대 작업 수 (워커 스레드 수)
+            eager_actions (dict): 노트 타입별로 생성/수정 시 미리 실행할 액션 목록
+            poll_interval (float): 새 작업이 없을 때 데이터베이스를 다시 확인하는 간격(초)
+            admission (AdmissionController): 지정하면 작업을 background 우선순위로 실행해
+                사용자 요청(interactive)이 대기 중일 때는 양보합니다.
+        """
+        self.Session = sessionmaker(bind=engine)
+        self.note_repository = note_repository
+        self.llm_handler = llm_handler
+        self.eager_actions = eager_actions or {}
+        self.poll_interval = poll_interval
+        self.admission = admission
+        self.lock = threading.Lock()
+        self.condition = threading.Condition()
+        self.closed = False
+
+        Base.metadata.create_all(engine)
+        self._recover()
+
+        self.workers = [
+            threading.Thread(target=self._work, daemon=True)
+            for _ in range(max(1, workers))
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def _recover(self):
+        """
+        이전 실행에서 처리 중이던 작업을 대기 상태로 되돌립니다.
+        """
+        with self.Session() as session:
+            session.query(JobModel).filter_by(status="running").update(
+                {"status": "pending"}
+            )
+            session.commit()
+
+    def enqueue(
+        self, note_type: str, note_id: int, action: str, priority: str = "normal"
+    ) -> int:
+        """
+        작업을 대기열에 추가합니다.
+        같은 노트와 액션의 대기 중인 작업이 있으면 새로 만들지 않고 기존 작업 ID를 반환합니다.
+
+        Args:
+            note_type (str): 노트 타입 ("memo", "event", "task")
+            note_id (int): 노트 ID
+            action (str): LLM 액션 (예: "summarize")
+            priority (str): "low", "normal", "high" 중 하나
+        Returns:
+            int: 작업 ID
+        """
+        if priority not in self.PRIORITIES:
+            raise ValueError(f"Invalid priority: {priority}")
+        value = self.PRIORITIES[priority]
+        note_type = note_type.lower()
+
+        with self.lock, self.Session() as session:
+            job = (
+                session.query(JobModel)
+                .filter_by(
+                    note_type=note_type,
+                    note_id=note_id,
+                    action=action,
+                    status="pending",
+                )
+                .first()
+            )
+            if job:
+                job.priority = max(job.priority, value)
+            else:
+                job = JobModel(
+                    note_type=note_type,
+                    note_id=note_id,
+                    action=action,
+                    priority=value,
+                )
+                session.add(job)
+            session.commit()
+            job_id = job.id
+
+        with self.condition:
+            self.condition.notify()
+        return job_id
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        """
+        작업 상태와 결과를 반환합니다.
+        """
+        with self.Session() as session:
+            job = session.query(JobModel).filter_by(id=job_id).first()
+            return job.to_dict() if job else None
+
+    def cancel(self, note_type: Optional[str], note_id: Optional[int] = None) -> int:
+        """
+        노트(또는 노트 타입 전체)의 대기 중인 작업을 취소합니다.
+
+        Returns:
+            int: 취소된 작업 수
+        """
+        with self.lock, self.Session() as session:
+            query = session.query(JobModel).filter_by(status="pending")
+            if note_type:
+                query = query.filter_by(note_type=note_type.lower())
+            if note_id is not None:
+                query = query.filter_by(note_id=note_id)
+            cancelled = query.update({"status": "cancelled"})
+            session.commit()
+            return cancelled
+
+    def close(self):
+        """
+        워커 스레드를 종료합니다. 실행 중인 작업은 끝까지 처리됩니다.
+        """
+        self.closed = True
+        with self.condition:
+            self.condition.notify_all()
+        for worker in self.workers:
+            worker.join()
+
+    def _claim(self) -> Optional[Dict]:
+        """
+        우선순위가 가장 높은 대기 작업을 실행 상태로 바꾸고 반환합니다.
+        """
+        with self.lock, self.Session() as session:
+            job = (
+                session.query(JobModel)
+                .filter_by(status="pending")
+                .order_by(JobModel.priority.desc(), JobModel.id.asc())
+                .first()
+            )
+            if not job:
+                return None
+            job.status = "running"
+            session.commit()
+            return job.to_dict()
+
+    def _finish(self, job_id: int, result: Optional[Dict], error: Optional[str]):
+        with self.lock, self.Session() as session:
+            job = session.query(JobModel).filter_by(id=job_id).first()
+            if not job:
+                return  # 처리하는 동안 취소되어 삭제됨
+            job.status = "failed" if error else "done"
+            job.result = result
+            job.error = error
+            session.commit()
+
+    def _work(self):
+        while not self.closed:
+            try:
+                job = self._claim()
+            except Exception:
+                # 데이터베이스 잠김 등: 워커 스레드는 살려 두고 잠시 뒤 다시 시도
+                logger.exception("Failed to claim a job")
+                job = None
+            if not job:
+                with self.condition:
+                    self.condition.wait(self.poll_interval)
+                continue
+
+            try:
+                note = self.note_repository.read(job["note_id"], job["note_type"])
+                if not note:
+                    self._finish(job["id"], None, "Note not found")
+                    continue
+
+                with (
+                    self.admission.admit("jobs", "background", wait=True)
+                    if self.admission
+                    else nullcontext()
+                ):
+                    result = self.llm_handler.process(note, job["action"])
+                self._finish(job["id"], result, result.get("error"))
+            except Exception as e:
+                logger.exception(f"Job {job['id']} ({job['action']}) failed")
+                try:
+                    self._finish(job["id"], None, str(e))
+                except Exception:
+                    # 실패를 기록하지 못한 작업은 다음 시작 시 다시 실행됨 (_recover)
+                    logger.exception(f"Failed to record the failure of job {job['id']}")
+            finally:
+                # 다음 작업에서 최신 노트를 읽도록 워커 스레드의 세션 정리
+                self.note_repository.session.remove()
+
+    def on_note_changed(
+        self, event: str, note: Dict, previous: Optional[Dict] = None
+    ) -> None:
+        """
+        NoteRepository 리스너: 노트가 생성되거나 내용이 바뀌면 미리 실행할 액션을 낮은 우선순위로 등록합니다.
+        """
+        note_type = (note.get("type") or "").lower()
+        if event == "delete":
+            self.cancel(note_type, note["id"])
+            return
+        if event == "delete_all":
+            self.cancel(note_type or None)
+            return
+        if (
+            event == "update"
+            and previous
+            and previous.get("content") == note.get("content")
+        ):
+            return
+        if event not in ("create", "update"):
+            return
+
+        for action in self.eager_actions.get(note_type, []):
+            self.enqueue(note_type, note["id"], action, priority="low")
@@ -1,29 +1,483 @@
+import logging
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from server.batching import BatchScheduler
+from server.chunking import split_into_chunks
+from server.context import ContextPacker
+from server.embedding import EmbeddingIndex, note_text
+from server.llm_backend import load_model, profile_id
+from server.llm_cache import LLMResultCache
+from server.router import TieredRouter, TierStats
+
+logger = logging.getLogger(__name__)
+
+
 class LLMHandler:
     """
     LLMHandler는 LLM 모델과의 상호작용을 처리합니다.
     """
 
-    def __init__(self):
+    # 결과를 캐시할 수 있는 액션 목록
+    CACHEABLE_ACTIONS = (
+        "summarize",
+        "link_suggestion",
+        "estimate_priority",
+        "estimate_duration",
+    )
+
+    # 액션별 시스템 프롬프트
+    SYSTEM_PROMPTS = {
+        "summarize": "당신은 개인 노트 비서입니다. 사용자의 노트를 한두 문장으로 요약하세요.",
+        "link_suggestion": "당신은 개인 노트 비서입니다. 사용자의 노트와 관련된 참고 자료 URL을 한 줄에 하나씩 제안하세요.",
+        "estimate_priority": "당신은 개인 노트 비서입니다. 사용자의 할 일의 우선순위를 high, medium, low 중 하나로만 답하세요.",
+        "estimate_duration": "당신은 개인 노트 비서입니다. 사용자의 할 일을 끝내는 데 걸리는 시간을 분 단위 숫자로만 답하세요.",
+    }
+
+    # 여러 노트를 대상으로 하는 액션별 시스템 프롬프트
+    MULTI_NOTE_PROMPTS = {
+        "summarize_notes": "당신은 개인 노트 비서입니다. 사용자의 여러 노트입니다. 주요 일정과 할 일, 메모 내용을 몇 문장으로 정리하세요.",
+    }
+
+    # 긴 노트 요약(map-reduce) 단계별 시스템 프롬프트
+    PIPELINE_PROMPTS = {
+        "summarize_chunk": "당신은 개인 노트 비서입니다. 긴 노트의 일부분입니다. 핵심 내용을 짧게 요약하세요.",
+        "summarize_reduce": "당신은 개인 노트 비서입니다. 긴 노트의 부분 요약들입니다. 전체 내용을 한두 문장으로 요약하세요.",
+    }
+
+    def __init__(
+        self,
+        model_name: str = "placeholder",
+        generation_config: Optional[Dict] = None,
+        cache: Optional[LLMResultCache] = None,
+        backend: str = "stub",
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20,
+        model=None,
+        embedding_index: Optional[EmbeddingIndex] = None,
+        related_count: int = 5,
+        chunk_tokens: int = 1024,
+        chunk_overlap: int = 64,
+        prefix_cache: bool = True,
+        profile=None,
+        router: Optional[TieredRouter] = None,
+        context_tokens: int = 4096,
+        request_timeout: float = 300,
+        keepalive_interval: float = 10,
+    ):
         """
         초기화: LLM 모델 로드 및 필요 리소스 설정
+
+        Args:
+            model_name (str): 모델 식별자 (캐시 키에 포함됨)
+            generation_config (dict): 생성 파라미터 (예: {"max_new_tokens": 256})
+            cache (LLMResultCache): 결과 캐시. None이면 캐시를 사용하지 않습니다.
+            backend (str): 모델 백엔드 ("stub" 또는 "transformers")
+            max_batch_size (int): 한 번의 generate로 묶을 최대 요청 수
+            max_wait_ms (float): 배치를 채우기 위해 기다리는 최대 시간(ms)
+            model: 이미 생성된 모델 객체 (테스트용). 지정하면 backend를 무시합니다.
+            embedding_index (EmbeddingIndex): 관련 노트 검색용 인덱스.
+                지정하면 link_suggestion은 LLM 대신 인덱스에서 관련 노트를 찾습니다.
+            related_count (int): link_suggestion이 반환할 관련 노트 수
+            chunk_tokens (int): 이보다 긴 노트는 청크로 나누어 요약합니다.
+            chunk_overlap (int): 이웃 청크끼리 겹치는 토큰 수 (경계에 걸친 문장의 맥락 유지)
+            prefix_cache (bool): 액션별 시스템 프롬프트의 KV 캐시를 미리 계산해 재사용할지 여부
+            profile (str | dict): transformers 추론 프로필 ("default", "cpu", "cpu-int8").
+                정밀도 설정(장치, 양자화)은 캐시 키에 포함됩니다.
+            router (TieredRouter): LLM보다 먼저 시도할 가벼운 엔진. None이면 항상 LLM을 사용합니다.
+            context_tokens (int): 모델 컨텍스트 길이. 여러 노트 액션의 프롬프트는 이 안에 맞춰 묶습니다.
+            request_timeout (float): 배치 스케줄러의 생성 결과를 기다리는 최대 시간(초)
+            keepalive_interval (float): 스트리밍 중 긴 노트의 청크를 요약하는 동안
+                연결 유지 이벤트를 보내는 간격(초)
         """
-        self.model = self._load_model()
+        self.model_name = model_name
+        self.generation_config = generation_config or {}
+        self.cache = cache
+        self.backend = backend
+        self.embedding_index = embedding_index
+        self.related_count = related_count
+        self.chunk_tokens = chunk_tokens
+        self.chunk_overlap = chunk_overlap
+        self.profile = profile
+        # 같은 모델이라도 정밀도(int8 양자화, dtype)가 다르면 결과가 다르므로 캐시를 나눔
+        precision = profile_id(profile)
+        self.model_id = f"{model_name}@{precision}" if precision else model_name
+        self.router = router
+        self.context_tokens = context_tokens
+        self.request_timeout = request_timeout
+        self.keepalive_interval = keepalive_interval
+        self.tier_stats = TierStats()
+        self.model = model if model is not None else self._load_model()
+        if prefix_cache and hasattr(self.model, "warm_prefixes"):
+            self.model.warm_prefixes(
+                list(self.SYSTEM_PROMPTS.values())
+                + list(self.MULTI_NOTE_PROMPTS.values())
+                + list(self.PIPELINE_PROMPTS.values())
+            )
+        self.packer = ContextPacker(self.model, embedding_index=embedding_index)
+        self.scheduler = BatchScheduler(
+            self.model, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms
+        )
 
     def _load_model(self):
         """
         LLM 모델을 로드하는 내부 메서드.
         """
-        # TODO: LLM 모델 로드 (예: Hugging Face, OpenAI 등)
-        return None
+        return load_model(self.backend, self.model_name, profile=self.profile)
+
+    def close(self):
+        """
+        배치 스케줄러를 종료합니다.
+        """
+        self.scheduler.close()
 
     def process(self, note: dict, action: str) -> dict:
         """
         특정 노트를 LLM 모델로 처리하여 결과 반환.
+        노트 내용이 바뀌지 않았다면 캐시된 결과를 그대로 반환하고,
+        라우터의 빠른 경로로 충분하면 LLM을 호출하지 않습니다.
+        """
+        start = time.perf_counter()
+        key = self._cache_key(note, action)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            self.tier_stats.record(action, "cache", time.perf_counter() - start)
+            return cached
+
+        result = self._route(note, action)
+        if result is not None:
+            self.tier_stats.record(action, "fast", time.perf_counter() - start)
+            return result
+
+        result = self._run(note, action)
+        self._store(key, note, action, result)
+        tier = "index" if self._uses_index(action) else "llm"
+        self.tier_stats.record(action, tier, time.perf_counter() - start)
+        return result
+
+    def stream(self, note: dict, action: str) -> Iterator[Dict]:
+        """
+        process의 스트리밍 버전. 생성되는 토큰을 바로 반환합니다.
+
+        Yields:
+            dict: {"token": "..."} 형태의 토큰 이벤트, 마지막으로 {"done": True, "result": {...}}
+                  캐시 적중 시에는 결과 이벤트 하나만 반환합니다.
+                  긴 노트의 청크를 요약(map)하는 동안에는 {"keepalive": True}를 주기적으로 반환합니다.
+                  실패하면 {"error": "..."} 뒤에 {"done": True, "error": "..."}로 끝납니다.
+        """
+        if action not in self.SYSTEM_PROMPTS:
+            error = f"Unknown action: {action}"
+            yield {"error": error}
+            yield {"done": True, "error": error}
+            return
+
+        start = time.perf_counter()
+        if self._uses_index(action):
+            result = self._related(note)
+            self.tier_stats.record(action, "index", time.perf_counter() - start)
+            yield {"done": True, "result": result}
+            return
+
+        key = self._cache_key(note, action)
+        cached = self.cache.get(key) if key else None
+        if cached is not None:
+            self.tier_stats.record(action, "cache", time.perf_counter() - start)
+            yield {"done": True, "result": cached}
+            return
+
+        result = self._route(note, action)
+        if result is not None:
+            self.tier_stats.record(action, "fast", time.perf_counter() - start)
+            yield {"done": True, "result": result}
+            return
+
+        tokens = []
+        try:
+            messages = yield from self._stream_messages(note, action)
+            for token in self.model.stream(messages, **self.generation_config):
+                tokens.append(token)
+                yield {"token": token}
+        except Exception as e:
+            # 중간에 끊긴 결과는 캐시하지 않고, 클라이언트가 정상 종료와 구분하도록 오류로 끝냄
+            logger.exception(f"LLM stream failed after {len(tokens)} tokens")
+            error = f"Generation failed: {e}"
+            yield {"error": error}
+            yield {"done": True, "error": error}
+            return
+
+        result = self._parse(action, "".join(tokens))
+        self._store(key, note, action, result)
+        self.tier_stats.record(action, "llm", time.perf_counter() - start)
+        yield {"done": True, "result": result}
+
+    def process_notes(
+        self, notes: List[Dict], action: str, query: Optional[str] = None
+    ) -> dict:
+        """
+        여러 노트를 하나의 프롬프트로 묶어 처리합니다. (예: 이번 주 노트 요약)
+        노트가 아무리 많아도 프롬프트는 컨텍스트 예산 안에서 최신/관련 노트 순으로 채워집니다.
+
+        Args:
+            notes (list): 대상 노트 목록 (예: get_filtered_notes 결과)
+            action (str): MULTI_NOTE_PROMPTS의 액션
+            query (str): 관련도 순위에 사용할 질의 (선택)
+        Returns:
+            dict: {"summary": ..., "notes": [{"type", "id"}, ...], "omitted": 담지 못한 노트 수}
+        """
+        if action not in self.MULTI_NOTE_PROMPTS:
+            return {"error": f"Unknown action: {action}"}
+
+        start = time.perf_counter()
+        content, packed = self.packer.pack(notes, self._note_budget(action), query)
+        result = {
+            "notes": [{"type": note["type"], "id": note["id"]} for note in packed],
+            "omitted": len(notes) - len(packed),
+        }
+        if not packed:
+            return {"summary": "", **result}
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(
+                content, action, self.model_id, self.generation_config
+            )
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.tier_stats.record(action, "cache", time.perf_counter() - start)
+                return {**cached, **result}
+
+        messages = [
+            {"role": "system", "content": self.MULTI_NOTE_PROMPTS[action]},
+            {"role": "user", "content": content},
+        ]
+        text = self.scheduler.submit(messages, self.generation_config).result(
+            timeout=self.request_timeout
+        )
+        summary = {"summary": text.strip()}
+        if key is not None:
+            # 여러 노트에 걸친 결과이므로 특정 노트와 연결하지 않음 (내용이 바뀌면 키가 달라짐)
+            self.cache.put(key, action, summary)
+        self.tier_stats.record(action, "llm", time.perf_counter() - start)
+        return {**summary, **result}
+
+    def _note_budget(self, action: str) -> int:
+        """
+        컨텍스트 길이에서 시스템 프롬프트, 생성 토큰, 채팅 템플릿 여유분을 뺀 노트용 토큰 예산
+        """
+        reserved = (
+            self.packer.count_tokens(self.MULTI_NOTE_PROMPTS[action])
+            + self.generation_config.get("max_new_tokens", 256)
+            + 32
+        )
+        return max(0, self.context_tokens - reserved)
+
+    def stats(self) -> Dict:
+        """
+        처리 계층별 통계와 배치 대기열 대기 시간을 반환합니다.
+        """
+        waits = sorted(self.scheduler.queue_waits)
+        queue_wait = {}
+        if waits:
+            queue_wait = {
+                "count": len(waits),
+                "p50_ms": round(waits[len(waits) // 2] * 1000, 3),
+                "p95_ms": round(
+                    waits[min(len(waits) - 1, len(waits) * 95 // 100)] * 1000, 3
+                ),
+            }
+        return {"tiers": self.tier_stats.to_dict(), "queue_wait": queue_wait}
+
+    def _route(self, note: dict, action: str) -> Optional[dict]:
+        if self.router is None:
+            return None
+        return self.router.route(note, action, self.model)
+
+    def _cache_key(self, note: dict, action: str) -> Optional[str]:
+        """
+        캐시 대상이면 캐시 키를, 아니면 None을 반환합니다.
+        """
+        if self.cache is None or action not in self.CACHEABLE_ACTIONS:
+            return None
+        if self._uses_index(action):
+            # 관련 노트는 다른 노트가 바뀌어도 달라지고, 인덱스 검색은 충분히 빠르므로 캐시하지 않음
+            return None
+        return self.cache.make_key(
+            self._note_input(note, action),
+            action,
+            self.model_id,
+            self.generation_config,
+        )
+
+    def _store(self, key: Optional[str], note: dict, action: str, result: dict):
+        if key is not None and "error" not in result:
+            self.cache.put(key, action, result, note.get("type"), note.get("id"))
+
+    def _build_messages(self, note: dict, action: str) -> list:
+        """
+        액션의 시스템 프롬프트와 노트 내용으로 채팅 메시지를 구성합니다.
+        컨텍스트보다 긴 노트의 요약은 청크별 요약(map)을 먼저 구하고, 이를 합쳐 요약(reduce)합니다.
+        """
+        content = self._note_input(note, action)
+        if self._needs_map(content, action):
+            return self._prompt("summarize_reduce", self._map_summaries(content))
+        return self._prompt(action, content)
+
+    def _needs_map(self, content: str, action: str) -> bool:
+        return (
+            action == "summarize"
+            and self.model.count_tokens(content) > self.chunk_tokens
+        )
+
+    def _stream_messages(self, note: dict, action: str) -> Iterator[Dict]:
+        """
+        stream용 _build_messages. 청크 요약(map)은 첫 토큰보다 한참 먼저 시작되므로
+        별도 스레드에서 실행하고, 끝날 때까지 keepalive_interval초마다 {"keepalive": True}를 반환합니다.
+        메시지는 제너레이터의 반환값입니다. (yield from으로 받음)
+        """
+        if not self._needs_map(self._note_input(note, action), action):
+            return self._build_messages(note, action)
+
+        outcome = {}
+        finished = threading.Event()
+
+        def build():
+            try:
+                outcome["messages"] = self._build_messages(note, action)
+            except Exception as e:
+                outcome["error"] = e
+            finally:
+                finished.set()
+
+        threading.Thread(target=build, daemon=True).start()
+        while not finished.wait(self.keepalive_interval):
+            yield {"keepalive": True}
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["messages"]
+
+    def _note_input(self, note: dict, action: str) -> str:
+        """
+        액션에 넘길 노트 텍스트. 우선순위/소요 시간 추정은 이름과 마감일도 함께 봅니다.
+        """
+        content = note.get("content", "")
+        if action not in ("estimate_priority", "estimate_duration"):
+            return content
+        lines = [note.get("name") or "", content]
+        if note.get("due_date"):
+            lines.append(f"마감일: {note['due_date']}")
+        return "\n".join(line for line in lines if line)
+
+    def _prompt(self, name: str, content: str) -> list:
+        system = self.SYSTEM_PROMPTS.get(name) or self.PIPELINE_PROMPTS[name]
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": content},
+        ]
+
+    def _map_summaries(self, content: str) -> str:
+        """
+        텍스트를 청크로 나누어 요약하고 합칩니다.
+        합친 요약도 청크 크기를 넘으면 한 단계 더 나누어 요약합니다.
+        """
+        text = content
+        while True:
+            chunks = split_into_chunks(
+                text, self.model, self.chunk_tokens, self.chunk_overlap
+            )
+            joined = "\n".join(self._summarize_chunks(chunks))
+            tokens = self.model.count_tokens(joined)
+            if (
+                len(chunks) == 1
+                or tokens <= self.chunk_tokens
+                or tokens >= self.model.count_tokens(text)
+            ):
+                return joined
+            text = joined
+
+    def _summarize_chunks(self, chunks: List[str]) -> List[str]:
+        """
+        청크들을 동시에 요약합니다. 요청은 배치 스케줄러에서 묶여 처리되고,
+        결과는 청크 해시로 캐시되어 바뀌지 않은 청크는 다시 요약하지 않습니다.
+        """
+        summaries: List[Optional[str]] = [None] * len(chunks)
+        pending = {}
+        for i, chunk in enumerate(chunks):
+            key = None
+            if self.cache is not None:
+                key = self.cache.make_key(
+                    chunk, "summarize_chunk", self.model_id, self.generation_config
+                )
+                cached = self.cache.get(key)
+                if cached is not None:
+                    summaries[i] = cached["summary"]
+                    continue
+            future = self.scheduler.submit(
+                self._prompt("summarize_chunk", chunk), self.generation_config
+            )
+            pending[i] = (key, future)
+
+        for i, (key, future) in pending.items():
+            summaries[i] = future.result(timeout=self.request_timeout).strip()
+            if key is not None:
+                # 청크 캐시는 노트와 연결하지 않음 (노트 수정 시에도 바뀌지 않은 청크는 재사용)
+                self.cache.put(key, "summarize_chunk", {"summary": summaries[i]})
+        return summaries
+
+    def _run(self, note: dict, action: str) -> dict:
+        """
+        캐시를 거치지 않고 LLM 처리를 수행합니다.
+        동시에 들어온 요청은 배치 스케줄러에서 하나의 generate 호출로 묶입니다.
+        """
+        if action not in self.SYSTEM_PROMPTS:
+            return {"error": f"Unknown action: {action}"}
+
+        if self._uses_index(action):
+            return self._related(note)
+
+        messages = self._build_messages(note, action)
+        text = self.scheduler.submit(messages, self.generation_config).result(
+            timeout=self.request_timeout
+        )
+        return self._parse(action, text)
+
+    def _uses_index(self, action: str) -> bool:
+        return action == "link_suggestion" and self.embedding_index is not None
+
+    def _related(self, note: dict) -> dict:
+        """
+        임베딩 인덱스에서 관련 노트를 찾습니다.
+        links는 기존 클라이언트와 같은 문자열 목록(노트 경로)이고, 점수는 related에 담습니다.
+        """
+        key = ((note.get("type") or "").lower(), note.get("id"))
+        if key in self.embedding_index:
+            related = self.embedding_index.related(*key, k=self.related_count)
+        else:
+            related = self.embedding_index.query(note_text(note), k=self.related_count)
+
+        return {
+            "links": [
+                f"/notes/{note_type}/{note_id}" for note_type, note_id, _ in related
+            ],
+            "related": [
+                {"type": note_type, "id": note_id, "score": round(score, 4)}
+                for note_type, note_id, score in related
+            ],
+        }
+
+    def _parse(self, action: str, text: str) -> dict:
+        """
+        모델 출력 텍스트를 액션별 응답 형식으로 변환합니다.
         """
-        # TODO: LLM 처리 로직 작성
         if action == "summarize":
-            return {"summary": "요약 결과 (예제)"}
+            return {"summary": text.strip()}
         elif action == "link_suggestion":
-            return {"links": ["http://example.com"]}
-        else:
-            return {"error": f"Unknown action: {action}"}
+            return {"links": re.findall(r"https?://\S+", text)}
+        elif action == "estimate_priority":
+            match = re.search(r"high|medium|low", text.lower())
+            return {"priority": match.group(0) if match else "medium"}
+        elif action == "estimate_duration":
+            match = re.search(r"\d+", text)
+            return {"duration_minutes": int(match.group(0)) if match else None}
+        return {"error": f"Unknown action: {action}"}
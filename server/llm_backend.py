@@ -0,0 +1,366 @@
+import copy
+import os
+import threading
+import time
+from typing import Dict, Iterator, List
+
+# 채팅 메시지 목록: [{"role": "system", "content": ...}, {"role": "user", "content": ...}]
+Messages = List[Dict[str, str]]
+
+
+class StubModel:
+    """
+    테스트 및 벤치마크용 결정적 스텁 모델.
+    마지막 사용자 메시지의 앞부분 단어를 그대로 돌려줍니다.
+    """
+
+    def __init__(
+        self,
+        name: str = "stub",
+        batch_delay: float = 0.0,
+        token_delay: float = 0.0,
+        prefill_delay: float = 0.0,
+        busy: bool = False,
+    ):
+        """
+        Args:
+            name (str): 모델 식별자
+            batch_delay (float): generate 호출마다 대기할 시간(초). 실제 모델의 forward 비용을 흉내냅니다.
+            token_delay (float): stream에서 토큰마다 대기할 시간(초)
+            prefill_delay (float): 프롬프트 토큰마다 대기할 시간(초). 캐시된 시스템 프롬프트는 제외됩니다.
+            busy (bool): True면 대기 시간 동안 행렬 곱으로 CPU를 사용합니다. 실제 모델의 CPU 점유를 흉내냅니다.
+        """
+        self.name = name
+        self.batch_delay = batch_delay
+        self.token_delay = token_delay
+        self.prefill_delay = prefill_delay
+        self.busy = busy
+        self.prefix_cache = set()
+        self.batch_sizes: List[int] = []  # generate 호출별 배치 크기 기록
+        self.prefill_tokens: List[int] = []  # 요청별로 새로 계산한 프롬프트 토큰 수
+
+    def warm_prefixes(self, system_prompts: List[str]):
+        """
+        시스템 프롬프트를 미리 계산된 것으로 표시합니다.
+        """
+        self.prefix_cache.update(system_prompts)
+
+    def _prefill(self, messages: Messages, reuse_prefix: bool = True):
+        tokens = sum(
+            self.count_tokens(m["content"])
+            for m in messages
+            if not (
+                reuse_prefix
+                and m["role"] == "system"
+                and m["content"] in self.prefix_cache
+            )
+        )
+        self.prefill_tokens.append(tokens)
+        if self.prefill_delay:
+            self._delay(self.prefill_delay * tokens)
+
+    def _delay(self, seconds: float):
+        if not self.busy:
+            time.sleep(seconds)
+            return
+        # 실제 모델처럼 GIL을 놓고 CPU 코어를 쓰는 행렬 곱으로 시간을 채움
+        import numpy as np
+
+        matrix = np.ones((256, 256), dtype=np.float32)
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            matrix @ matrix
+
+    def tokenize(self, text: str) -> List[str]:
+        return text.split()
+
+    def detokenize(self, tokens: List[str]) -> str:
+        return " ".join(tokens)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenize(text))
+
+    def generate(
+        self, batch: List[Messages], max_new_tokens: int = 64, **kwargs
+    ) -> List[str]:
+        """
+        여러 프롬프트를 한 번에 처리합니다.
+        """
+        self.batch_sizes.append(len(batch))
+        for messages in batch:
+            # 실제 모델과 같이 단일 요청일 때만 프리픽스 캐시를 재사용
+            self._prefill(messages, reuse_prefix=len(batch) == 1)
+        if self.batch_delay:
+            self._delay(self.batch_delay)
+        return [self._respond(messages, max_new_tokens) for messages in batch]
+
+    def stream(
+        self, messages: Messages, max_new_tokens: int = 64, **kwargs
+    ) -> Iterator[str]:
+        """
+        하나의 프롬프트를 처리하며 생성된 토큰을 순서대로 반환합니다.
+        """
+        self._prefill(messages)
+        for i, word in enumerate(self._respond(messages, max_new_tokens).split()):
+            if self.token_delay:
+                self._delay(self.token_delay)
+            yield word if i == 0 else f" {word}"
+
+    def _respond(self, messages: Messages, max_new_tokens: int) -> str:
+        user_messages = [m["content"] for m in messages if m["role"] == "user"]
+        words = self.tokenize(user_messages[-1] if user_messages else "")
+        return " ".join(words[:max_new_tokens])
+
+
+# 추론 프로필: 엣지 기기(CPU)에서는 float32 + 동적 int8 양자화와 스레드 설정을 사용
+INFERENCE_PROFILES = {
+    "default": {},
+    "cpu": {
+        "device": "cpu",
+        "num_threads": None,  # None이면 물리 코어 수
+        "interop_threads": 1,
+        "mmap": True,
+    },
+    "cpu-int8": {
+        "device": "cpu",
+        "num_threads": None,
+        "interop_threads": 1,
+        # 동적 양자화는 가중치를 복사하므로 메모리 매핑을 쓰지 않음
+        "quantize": "int8",
+    },
+}
+
+
+def resolve_profile(profile) -> Dict:
+    """
+    프로필 이름이나 설정 dict를 최종 설정으로 바꿉니다.
+    dict에 "base"를 지정하면 해당 프로필 위에 덮어씁니다.
+    """
+    if profile is None:
+        profile = "default"
+    if isinstance(profile, str):
+        if profile not in INFERENCE_PROFILES:
+            raise ValueError(f"Invalid inference profile: {profile}")
+        resolved = dict(INFERENCE_PROFILES[profile])
+    else:
+        resolved = dict(INFERENCE_PROFILES[profile.get("base", "default")])
+        resolved.update({k: v for k, v in profile.items() if k != "base"})
+
+    if resolved.get("device") == "cpu" and not resolved.get("num_threads"):
+        # 하이퍼스레딩 코어는 행렬 연산에 도움이 되지 않으므로 물리 코어 수만 사용
+        resolved["num_threads"] = max(1, (os.cpu_count() or 2) // 2)
+    return resolved
+
+
+# 생성 결과를 바꾸는 프로필 설정 (장치에 따라 dtype이 정해짐). 스레드 수 등은 결과와 무관
+PRECISION_KEYS = ("device", "quantize")
+
+
+def profile_id(profile) -> str:
+    """
+    생성 결과에 영향을 주는 프로필 설정을 나타내는 문자열 (캐시 키용).
+    기본 프로필은 빈 문자열입니다.
+    """
+    resolved = resolve_profile(profile)
+    return ",".join(
+        f"{key}={resolved[key]}" for key in PRECISION_KEYS if resolved.get(key)
+    )
+
+
+class TransformersModel:
+    """
+    Hugging Face transformers 기반 로컬 모델 (agent.py 참고).
+    """
+
+    def __init__(self, model_name: str, cache_dir: str = None, profile=None):
+        """
+        Args:
+            model_name (str): Hugging Face 모델 이름
+            cache_dir (str): 모델 다운로드 경로
+            profile (str | dict): 추론 프로필 이름(INFERENCE_PROFILES) 또는 설정 dict
+        """
+        # torch, transformers는 실제 모델을 사용할 때만 필요하므로 지연 import
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        self.torch = torch
+        self.name = model_name
+        self.profile = resolve_profile(profile)
+        self._set_threads()
+
+        if self.profile.get("device") == "cpu":
+            load_kwargs = {"torch_dtype": torch.float32, "device_map": "cpu"}
+        else:
+            load_kwargs = {"torch_dtype": "auto", "device_map": "auto"}
+        if self.profile.get("mmap"):
+            # safetensors 파일이면 메모리 매핑으로 읽어 가중치를 한 번만 메모리에 올림
+            # (형식은 자동 감지하므로 .bin 가중치만 있는 모델도 그대로 로드)
+            load_kwargs.update(low_cpu_mem_usage=True)
+
+        self.model = AutoModelForCausalLM.from_pretrained(
+            model_name, cache_dir=cache_dir, **load_kwargs
+        )
+        if self.profile.get("quantize") == "int8":
+            # Linear 가중치를 int8로 저장하고 활성값은 실행 시 양자화 (CPU 전용)
+            self.model = torch.ao.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        self.model.eval()
+        # 배치 생성 시 프롬프트 끝을 맞추기 위해 왼쪽 패딩 사용
+        self.tokenizer = AutoTokenizer.from_pretrained(
+            model_name, cache_dir=cache_dir, padding_side="left"
+        )
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+
+        # generate 호출은 CPU를 모두 사용하므로 한 번에 하나씩 실행
+        self.lock = threading.Lock()
+
+        # 시스템 프롬프트 → (프리픽스 토큰, 미리 계산된 KV 캐시)
+        self.prefix_cache: Dict[str, tuple] = {}
+
+    def _set_threads(self):
+        """
+        프로필의 intra-op/inter-op 스레드 수를 적용합니다.
+        """
+        if self.profile.get("num_threads"):
+            self.torch.set_num_threads(self.profile["num_threads"])
+        if self.profile.get("interop_threads"):
+            try:
+                self.torch.set_num_interop_threads(self.profile["interop_threads"])
+            except RuntimeError:
+                # 병렬 작업이 이미 시작된 뒤에는 바꿀 수 없음 (프로세스당 한 번)
+                pass
+
+    def warm_prefixes(self, system_prompts: List[str]):
+        """
+        액션별 고정 시스템 프롬프트(채팅 템플릿 포함)의 KV 캐시를 미리 계산합니다.
+        이미 계산된 프롬프트는 건너뜁니다. (모델 워커를 여러 서버가 공유하는 경우)
+        """
+        for system in system_prompts:
+            if system in self.prefix_cache:
+                continue
+            text = self.tokenizer.apply_chat_template(
+                [{"role": "system", "content": system}], tokenize=False
+            )
+            prefix_ids = self.tokenizer(text, return_tensors="pt").input_ids.to(
+                self.model.device
+            )
+            with self.lock, self.torch.no_grad():
+                past = self.model(prefix_ids, use_cache=True).past_key_values
+            self.prefix_cache[system] = (prefix_ids, past)
+
+    def _prefix_kwargs(self, messages: Messages, model_inputs) -> Dict:
+        """
+        프롬프트가 캐시된 시스템 프롬프트로 시작하면 generate에 넘길 past_key_values를 반환합니다.
+        """
+        if not messages or messages[0]["role"] != "system":
+            return {}
+        cached = self.prefix_cache.get(messages[0]["content"])
+        if cached is None:
+            return {}
+
+        prefix_ids, past = cached
+        length = prefix_ids.shape[1]
+        input_ids = model_inputs.input_ids
+        if input_ids.shape[1] <= length or not self.torch.equal(
+            input_ids[0, :length], prefix_ids[0]
+        ):
+            return {}
+        # generate가 캐시를 뒤에 이어 쓰므로 요청마다 복사본 사용
+        return {"past_key_values": copy.deepcopy(past)}
+
+    def tokenize(self, text: str) -> List[int]:
+        return self.tokenizer.encode(text, add_special_tokens=False)
+
+    def detokenize(self, tokens: List[int]) -> str:
+        return self.tokenizer.decode(tokens, skip_special_tokens=True)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenize(text))
+
+    def _encode(self, batch: List[Messages]):
+        texts = [
+            self.tokenizer.apply_chat_template(
+                messages, tokenize=False, add_generation_prompt=True
+            )
+            for messages in batch
+        ]
+        return self.tokenizer(texts, return_tensors="pt", padding=True).to(
+            self.model.device
+        )
+
+    def generate(self, batch: List[Messages], **params) -> List[str]:
+        """
+        여러 프롬프트를 패딩하여 한 번의 model.generate로 처리합니다.
+        """
+        model_inputs = self._encode(batch)
+        # 배치는 왼쪽 패딩 길이가 달라 프리픽스 위치가 어긋나므로 단일 요청만 재사용
+        prefix = self._prefix_kwargs(batch[0], model_inputs) if len(batch) == 1 else {}
+
+        with self.lock, self.torch.no_grad():
+            generated_ids = self.model.generate(
+                **model_inputs,
+                pad_token_id=self.tokenizer.pad_token_id,
+                **prefix,
+                **params,
+            )
+
+        # 왼쪽 패딩이므로 모든 행에서 입력 길이 이후가 생성된 토큰
+        generated_ids = generated_ids[:, model_inputs.input_ids.shape[1] :]
+        return self.tokenizer.batch_decode(generated_ids, skip_special_tokens=True)
+
+    def stream(self, messages: Messages, **params) -> Iterator[str]:
+        """
+        TextIteratorStreamer로 생성 중인 토큰을 바로 반환합니다.
+        """
+        from transformers import TextIteratorStreamer
+
+        model_inputs = self._encode([messages])
+        prefix = self._prefix_kwargs(messages, model_inputs)
+        streamer = TextIteratorStreamer(
+            self.tokenizer, skip_prompt=True, skip_special_tokens=True
+        )
+
+        errors = []
+
+        def run():
+            try:
+                with self.lock, self.torch.no_grad():
+                    self.model.generate(
+                        **model_inputs,
+                        streamer=streamer,
+                        pad_token_id=self.tokenizer.pad_token_id,
+                        **prefix,
+                        **params,
+                    )
+            except Exception as e:
+                # 생성이 실패해도 스트리머를 닫아 소비자가 멈추지 않도록 함
+                errors.append(e)
+                streamer.end()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        for text in streamer:
+            if text:
+                yield text
+        thread.join()
+        if errors:
+            raise errors[0]
+
+
+def load_model(backend: str, model_name: str, profile=None, **kwargs):
+    """
+    설정에 맞는 모델 백엔드를 생성합니다.
+
+    Args:
+        backend (str): "stub" 또는 "transformers"
+        model_name (str): 모델 식별자 (transformers의 경우 Hugging Face 모델 이름)
+        profile (str | dict): transformers 추론 프로필 ("default", "cpu", "cpu-int8")
+    """
+    if backend == "stub":
+        return StubModel(name=model_name, **kwargs)
+    elif backend == "transformers":
+        return TransformersModel(model_name, profile=profile, **kwargs)
+    else:
+        raise ValueError(f"Invalid LLM backend: {backend}")
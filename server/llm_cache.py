@@ -0,0 +1,170 @@
+import hashlib
+import json
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import sessionmaker
+
+from server.models import Base, LLMResultModel
+
+
+class LLMResultCache:
+    """
+    LLMResultCache는 LLM 처리 결과를 노트 데이터베이스(SQLite)에 저장하여 재사용합니다.
+    캐시 키는 (노트 내용 해시, 액션, 모델 식별자, 생성 파라미터)로 구성됩니다.
+    """
+
+    def __init__(self, engine, max_entries: int = 1000):
+        """
+        캐시 테이블 생성 및 세션 팩토리 초기화
+
+        Args:
+            engine: 노트 저장소와 공유하는 SQLAlchemy 엔진
+            max_entries (int): 보관할 최대 항목 수. 초과 시 가장 오래 사용되지 않은 항목부터 제거합니다.
+        """
+        self.engine = engine
+        self.Session = sessionmaker(bind=engine)
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+
+        Base.metadata.create_all(self.engine)
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        """
+        노트 내용의 SHA-256 해시를 반환합니다.
+        """
+        return hashlib.sha256((content or "").encode("utf-8")).hexdigest()
+
+    @classmethod
+    def make_key(
+        cls, content: str, action: str, model_id: str, params: Dict[str, Any]
+    ) -> str:
+        """
+        캐시 키를 생성합니다.
+
+        Args:
+            content (str): LLM에 입력되는 노트 내용
+            action (str): 수행할 액션 (예: "summarize")
+            model_id (str): 모델 식별자
+            params (dict): 생성 파라미터 (max_new_tokens 등)
+        Returns:
+            str: 캐시 키
+        """
+        payload = json.dumps(
+            {
+                "content": cls.content_hash(content),
+                "action": action,
+                "model": model_id,
+                "params": params,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        캐시된 결과를 반환합니다. 없으면 None을 반환합니다.
+        """
+        with self.lock, self.Session() as session:
+            entry = session.query(LLMResultModel).filter_by(key=key).first()
+            if not entry:
+                return None
+
+            entry.last_accessed = datetime.utcnow()
+            result = entry.result
+            session.commit()
+            return result
+
+    def put(
+        self,
+        key: str,
+        action: str,
+        result: Dict,
+        note_type: Optional[str] = None,
+        note_id: Optional[int] = None,
+    ) -> None:
+        """
+        결과를 캐시에 저장하고, 최대 항목 수를 넘으면 오래된 항목을 제거합니다.
+        """
+        with self.lock, self.Session() as session:
+            entry = session.query(LLMResultModel).filter_by(key=key).first()
+            if entry:
+                entry.result = result
+                entry.last_accessed = datetime.utcnow()
+            else:
+                session.add(
+                    LLMResultModel(
+                        key=key,
+                        note_type=note_type.lower() if note_type else None,
+                        note_id=note_id,
+                        action=action,
+                        result=result,
+                    )
+                )
+            session.flush()
+
+            overflow = session.query(LLMResultModel).count() - self.max_entries
+            if overflow > 0:
+                stale_ids = [
+                    row.id
+                    for row in session.query(LLMResultModel.id)
+                    .order_by(LLMResultModel.last_accessed.asc())
+                    .limit(overflow)
+                ]
+                session.query(LLMResultModel).filter(
+                    LLMResultModel.id.in_(stale_ids)
+                ).delete(synchronize_session=False)
+
+            session.commit()
+
+    def invalidate(
+        self, note_type: Optional[str], note_id: Optional[int] = None
+    ) -> int:
+        """
+        특정 노트(또는 노트 타입 전체)의 캐시 항목을 제거합니다.
+
+        Returns:
+            int: 제거된 항목 수
+        """
+        with self.lock, self.Session() as session:
+            query = session.query(LLMResultModel)
+            if note_type:
+                query = query.filter_by(note_type=note_type.lower())
+            if note_id is not None:
+                query = query.filter_by(note_id=note_id)
+            deleted = query.delete(synchronize_session=False)
+            session.commit()
+            return deleted
+
+    def clear(self) -> None:
+        """
+        모든 캐시 항목을 제거합니다.
+        """
+        with self.lock, self.Session() as session:
+            session.query(LLMResultModel).delete()
+            session.commit()
+
+    def __len__(self) -> int:
+        with self.Session() as session:
+            return session.query(LLMResultModel).count()
+
+    def on_note_changed(
+        self, event: str, note: Dict, previous: Optional[Dict] = None
+    ) -> None:
+        """
+        NoteRepository 리스너: 노트 내용이 바뀌거나 삭제되면 해당 캐시 항목을 무효화합니다.
+        """
+        if event == "update":
+            if previous and previous.get("content") == note.get("content"):
+                return
+            self.invalidate(note.get("type"), note.get("id"))
+        elif event == "delete":
+            self.invalidate(note.get("type"), note.get("id"))
+        elif event == "delete_all":
+            if note.get("type"):
+                self.invalidate(note.get("type"))
+            else:
+                self.clear()
@@ -1,9 +1,26 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 import logging
 import json
+import functools
+import os
 
-from server.database import NoteRepository
+from server.database import NoteRepository, VersionConflict
+from server.events import NoteEventFeed
 from server.llm import LLMHandler  # LLM 관련 처리 모듈 (추후 구현)
+from server.llm_cache import LLMResultCache
+from server.jobs import JobQueue
+from server.embedding import EmbeddingIndex, HashingEmbedder
+from server.model_worker import ModelWorker
+from server.admission import AdmissionController, AdmissionRejected
+from server.router import TieredRouter
+
+NETWORK_CONFIG_PATH = "config/network_config.json"
+SERVER_CONFIG_PATH = "config/server_config.json"
+
+# 서버 설정 로드
+with open(SERVER_CONFIG_PATH, "r", encoding="utf-8") as f:
+    server_config = json.load(f)
+llm_config = server_config.get("llm", {})
 
 # Flask 애플리케이션 초기화
 app = Flask(__name__)
@@ -14,10 +31,144 @@ logging.basicConfig(
 )
 
 # 노트 저장소 초기화
-note_repository: NoteRepository = NoteRepository()
+note_repository: NoteRepository = NoteRepository(
+    server_config.get("database", "sqlite:///notes.db")
+)
+
+
+def data_path(path: str) -> str:
+    """
+    서버 데이터 파일 경로. 상대 경로는 실행 위치가 아니라 데이터베이스 파일이 있는 디렉터리 기준입니다.
+    """
+    database = note_repository.engine.url.database
+    if database and database != ":memory:":
+        base = os.path.dirname(os.path.abspath(database))
+    else:
+        base = os.getcwd()
+    return os.path.join(base, path)
+
+
+# LLM 결과 캐시 초기화 (노트와 같은 데이터베이스에 저장)
+llm_cache = LLMResultCache(
+    note_repository.engine, max_entries=llm_config.get("cache_max_entries", 1000)
+)
+note_repository.add_listener(llm_cache.on_note_changed)
+
+# 연결된 클라이언트로 보낼 노트 변경 메시지 (/notes/events)
+events_config = server_config.get("events", {})
+note_events = NoteEventFeed(
+    max_events=events_config.get("max_events", 1000),
+    max_waiters=events_config.get("max_waiters", 256),
+)
+note_repository.add_listener(note_events.on_note_changed)
+
+# 관련 노트 검색용 임베딩 인덱스 초기화 (인덱스에 없는 노트만 새로 임베딩)
+embedding_config = server_config.get("embedding", {})
+embedding_index = EmbeddingIndex(
+    data_path(embedding_config.get("path", "embeddings")),
+    HashingEmbedder(dim=embedding_config.get("dim", 256)),
+    ivf_threshold=embedding_config.get("ivf_threshold", 5000),
+    nprobe=embedding_config.get("nprobe", 8),
+)
+embedding_index.sync(
+    note
+    for note_type in note_repository.note_types
+    for note in note_repository.read_all(note_type)
+)
+note_repository.add_listener(embedding_index.on_note_changed)
+
+# 모델 워커 연결 (설정 시 모델은 별도 프로세스에서 한 번만 로드되어 서버 재시작과 무관하게 유지)
+worker_config = llm_config.get("worker", {})
+model_worker = None
+if worker_config.get("enabled"):
+    model_worker = ModelWorker(
+        llm_config.get("backend", "stub"),
+        llm_config.get("model_name", "placeholder"),
+        address=worker_config.get("address"),
+        authkey=worker_config.get("authkey"),
+        model_options={"profile": llm_config.get("profile", "default")},
+        health_interval=worker_config.get("health_interval", 5),
+        max_failures=worker_config.get("max_failures", 3),
+        startup_timeout=worker_config.get("startup_timeout", 300),
+    )
+    model_worker.start()
+
+# LLM보다 먼저 시도할 가벼운 엔진 (짧은 노트 추출 요약, 할 일 기록 기반 k-NN)
+router_config = llm_config.get("router", {})
+router = None
+if router_config.get("enabled", True):
+    router = TieredRouter(
+        note_repository.engine,
+        HashingEmbedder(dim=embedding_config.get("dim", 256)),
+        min_confidence=router_config.get("min_confidence", 0.6),
+        summary_max_tokens=router_config.get("summary_max_tokens", 60),
+        k=router_config.get("k", 5),
+        min_examples=router_config.get("min_examples", 10),
+        retrain_seconds=router_config.get("retrain_seconds", 300),
+    )
+    note_repository.add_listener(router.on_note_changed)
 
 # LLM 핸들러 초기화
-llm_handler = LLMHandler()
+llm_handler = LLMHandler(
+    model_name=llm_config.get("model_name", "placeholder"),
+    generation_config=llm_config.get("generation"),
+    cache=llm_cache,
+    backend=llm_config.get("backend", "stub"),
+    max_batch_size=llm_config.get("max_batch_size", 8),
+    max_wait_ms=llm_config.get("max_wait_ms", 20),
+    embedding_index=embedding_index,
+    related_count=embedding_config.get("related_count", 5),
+    chunk_tokens=llm_config.get("chunk_tokens", 1024),
+    chunk_overlap=llm_config.get("chunk_overlap", 64),
+    prefix_cache=llm_config.get("prefix_cache", True),
+    profile=llm_config.get("profile", "default"),
+    model=model_worker.model if model_worker else None,
+    router=router,
+    context_tokens=llm_config.get("context_tokens", 4096),
+    request_timeout=llm_config.get("request_timeout", 300),
+    keepalive_interval=llm_config.get("keepalive_interval", 10),
+)
+
+# LLM 요청 허용 제어 (동시 실행 수 제한, 우선순위별 대기열, 클라이언트별 한도)
+admission_config = server_config.get("admission", {})
+admission = AdmissionController(
+    max_concurrent=admission_config.get("max_concurrent", 8),
+    max_queue=admission_config.get("max_queue"),
+    per_client=admission_config.get("per_client", 4),
+    queue_timeout=admission_config.get("queue_timeout", 30),
+)
+
+# 백그라운드 LLM 작업 대기열 초기화 (노트 생성/수정 시 요약 등을 미리 계산)
+jobs_config = server_config.get("jobs", {})
+job_queue = JobQueue(
+    note_repository.engine,
+    note_repository,
+    llm_handler,
+    workers=jobs_config.get("workers", 1),
+    eager_actions=jobs_config.get("eager_actions"),
+    admission=admission,
+)
+note_repository.add_listener(job_queue.on_note_changed)
+
+
+@app.teardown_appcontext
+def remove_session(exception=None):
+    """요청이 끝나면 스레드별 데이터베이스 세션 정리"""
+    note_repository.session.remove()
+
+
+@app.errorhandler(AdmissionRejected)
+def handle_admission_rejected(e):
+    """LLM 대기열이 가득 찬 경우 429와 Retry-After로 응답"""
+    response = jsonify({"error": e.reason, "retry_after": e.retry_after})
+    response.status_code = 429
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response
+
+
+def _client_id() -> str:
+    """클라이언트 식별자 (X-Client-Id 헤더, 없으면 접속 주소)"""
+    return request.headers.get("X-Client-Id") or request.remote_addr or "unknown"
 
 
 @app.route("/")
@@ -63,6 +214,42 @@ def get_note(note_type, note_id):
     return jsonify(note)
 
 
+@app.route("/notes/<int:note_id>", methods=["GET"])
+def get_note_by_id(note_id):
+    """
+    타입 없이 ID만으로 노트를 가져옴 (ID 레지스트리 조회)
+    """
+    note = note_repository.read(note_id)
+    if not note:
+        return jsonify({"error": "Note not found"}), 404
+
+    return jsonify(note)
+
+
+@app.route("/notes/<string:note_type>/<int:note_id>/related", methods=["GET"])
+def get_related_notes(note_type, note_id):
+    """
+    의미적으로 비슷한 노트 목록을 반환
+    ---
+    쿼리 매개변수:
+    - `k`: 선택, 반환할 노트 수 (기본값 5)
+    """
+    if note_type.lower() not in note_repository.note_types:
+        return jsonify({"error": f"Invalid note type: {note_type}"}), 400
+
+    k = request.args.get("k", 5, type=int)
+    related = []
+    for related_type, related_id, score in embedding_index.related(
+        note_type, note_id, k
+    ):
+        note = note_repository.read(related_id, related_type)
+        if note:
+            note["score"] = round(score, 4)
+            related.append(note)
+
+    return jsonify(related)
+
+
 @app.route("/notes", methods=["GET"])
 def get_all_notes():
     """
@@ -86,6 +273,8 @@ def get_filtered_notes():
     - `created_end`: 선택, 생성 종료일 (ISO 형식)
     - `updated_start`: 선택, 업데이트 시작일 (ISO 형식)
     - `updated_end`: 선택, 업데이트 종료일 (ISO 형식)
+    - `date_start`: 선택, 일정 시작일 (ISO 형식, event 타입만)
+    - `date_end`: 선택, 일정 종료일 (ISO 형식, event 타입만)
     - `tags`: 선택, 쉼표로 구분된 태그 리스트 (예: "work,project")
     """
     note_type = request.args.get("type")
@@ -100,6 +289,9 @@ def get_filtered_notes():
     if "updated_start" in request.args and "updated_end" in request.args:
         filters["updated_start"] = request.args["updated_start"]
         filters["updated_end"] = request.args["updated_end"]
+    if "date_start" in request.args and "date_end" in request.args:
+        filters["date_start"] = request.args["date_start"]
+        filters["date_end"] = request.args["date_end"]
     if "tags" in request.args:
         filters["tags"] = request.args["tags"].split(",")
 
@@ -111,6 +303,104 @@ def get_filtered_notes():
     return jsonify(notes)
 
 
+@app.route("/notes/events", methods=["GET"])
+def get_note_events():
+    """
+    노트 변경 푸시 (long polling)
+    ---
+    마지막으로 받은 token을 since 쿼리로 보내면 그 이후의 변경을 반환합니다.
+    변경이 없으면 새 변경이 올 때까지 최대 wait초(서버 설정 poll_wait 이하) 기다렸다가 빈 목록을 반환하고,
+    클라이언트는 돌려받은 token으로 바로 다시 요청합니다.
+    요청 예제: /notes/events?since=3f2a9c1e:41&wait=25
+    응답 예제:
+    {
+        "token": "3f2a9c1e:42",
+        "events": [{"event": "update", "id": 1, "type": "task", "changes": {"done": true, "version": 3, "updated": "..."}, "base_version": 2}],
+        "reset": false
+    }
+    - since가 없으면 기다리지 않고 현재 token만 반환합니다. 전체 목록은 /notes로 받습니다.
+    - create는 "note"에 노트 전체, delete는 id와 type만 담습니다.
+    - reset이 true이거나 {"event": "reset"}이 오면 놓친 변경을 알 수 없으므로 (서버 재시작, 가져오기 등)
+      전체 목록을 다시 받아야 합니다.
+    - 기다리는 요청이 max_waiters개이면 503을 반환합니다. 클라이언트는 주기적 동기화로 돌아갑니다.
+    """
+    poll_wait = events_config.get("poll_wait", 25)
+    try:
+        wait = min(float(request.args.get("wait", poll_wait)), poll_wait)
+    except ValueError:
+        return jsonify({"error": "wait must be a number"}), 400
+
+    result = note_events.poll(request.args.get("since"), wait)
+    if result is None:
+        return (
+            jsonify({"error": "Too many event waiters"}),
+            503,
+            {"Retry-After": str(poll_wait)},
+        )
+    return jsonify(result)
+
+
+@app.route("/notes/export", methods=["GET"])
+def export_notes():
+    """
+    모든 노트를 NDJSON(한 줄에 노트 하나)으로 스트리밍 (백업/이전용, python -m server.bulk 참고)
+    ---
+    요청 예제: /notes/export?type=memo&after=1200
+    - type: 선택, 노트 타입. 없으면 모든 타입
+    - after: 선택, 이 ID 이후의 노트만 (중단된 내보내기 이어 받기)
+    응답: ID 순서의 노트 (ID, 생성/수정 시각, 버전 포함)
+    {"id": 1, "type": "memo", "name": "메모", "tags": [], "content": "...", "created": "...", "updated": "...", "version": 1}
+    """
+    try:
+        notes = note_repository.export_notes(
+            request.args.get("type"), after=request.args.get("after", 0, type=int)
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    def lines():
+        # 노트마다 쓰지 않고 여러 줄을 모아서 보냄
+        buffer = []
+        for note in notes:
+            buffer.append(json.dumps(note, ensure_ascii=False))
+            if len(buffer) == 1000:
+                yield "\n".join(buffer) + "\n"
+                buffer = []
+        if buffer:
+            yield "\n".join(buffer) + "\n"
+
+    return Response(lines(), mimetype="application/x-ndjson")
+
+
+@app.route("/notes/import", methods=["POST"])
+def import_notes():
+    """
+    NDJSON으로 받은 노트를 ID와 시각, 버전을 유지한 채 가져오기
+    ---
+    요청 본문: /notes/export 형식의 NDJSON (Content-Type: application/x-ndjson)
+    요청 예제: /notes/import?batch_size=1000 (선택, 트랜잭션 하나에 넣을 노트 수)
+    응답 예제: {"imported": 5000}
+    같은 ID의 노트가 있으면 가져온 노트로 바꿉니다.
+    오류가 나면 400과 함께 그때까지 커밋된 노트 수를 반환합니다.
+    """
+    progress = {"imported": 0}
+
+    def notes():
+        for line in request.stream:
+            if line.strip():
+                yield json.loads(line)
+
+    try:
+        note_repository.import_notes(
+            notes(),
+            batch_size=request.args.get("batch_size", 1000, type=int),
+            on_progress=lambda imported: progress.update(imported=imported),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e), **progress}), 400
+    return jsonify(progress)
+
+
 @app.route("/notes/<int:note_id>", methods=["PUT"])
 def update_note(note_id):
     """
@@ -131,6 +421,34 @@ def update_note(note_id):
     return jsonify({"message": "Note updated successfully"})
 
 
+@app.route("/notes/<int:note_id>", methods=["PATCH"])
+def patch_note(note_id):
+    """
+    특정 ID의 노트에서 보낸 필드만 업데이트
+    ---
+    요청 데이터 예제:
+    {
+        "changes": {"done": true},
+        "version": 3  # 선택사항, 알고 있는 버전. 다르면 409와 현재 노트를 반환
+    }
+    """
+    data = request.json or {}
+    changes = data.get("changes")
+    if not isinstance(changes, dict):
+        return jsonify({"error": "Missing required field: changes"}), 400
+
+    try:
+        note = note_repository.patch(note_id, changes, data.get("version"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except VersionConflict as e:
+        return jsonify({"error": "Version conflict", "note": e.current}), 409
+    if not note:
+        return jsonify({"error": "Note not found"}), 404
+
+    return jsonify(note)
+
+
 @app.route("/notes/<string:note_type>/<int:note_id>", methods=["DELETE"])
 def delete_note(note_type, note_id):
     """
@@ -143,6 +461,18 @@ def delete_note(note_type, note_id):
     return jsonify({"message": "Note deleted successfully"})
 
 
+@app.route("/notes/<int:note_id>", methods=["DELETE"])
+def delete_note_by_id(note_id):
+    """
+    타입 없이 ID만으로 노트를 삭제
+    """
+    deleted = note_repository.delete(note_id)
+    if not deleted:
+        return jsonify({"error": "Note not found"}), 404
+
+    return jsonify({"message": "Note deleted successfully"})
+
+
 @app.route("/notes", methods=["DELETE"])
 def delete_all_notes():
     """
@@ -155,6 +485,36 @@ def delete_all_notes():
     return jsonify({"message": "Note deleted successfully"})
 
 
+def _read_interact_note(data):
+    """
+    /interact 요청 데이터에서 노트를 읽습니다.
+
+    Returns:
+        (note, None) 또는 (None, 오류 응답)
+    """
+    note_id = data.get("note_id")
+    note_type = data.get("type")
+    action = data.get("action")
+
+    if not note_id or not action:
+        return None, (
+            jsonify({"error": "Missing required fields: note_id or action"}),
+            400,
+        )
+
+    # 타입은 선택사항 (없으면 ID 레지스트리에서 찾음)
+    if note_type and note_type.lower() not in note_repository.note_types:
+        return None, (jsonify({"error": f"Invalid note type: {note_type}"}), 400)
+
+    note = note_repository.read(note_id, note_type)
+    # LLM 처리(대기 포함) 동안 데이터베이스 연결을 잡고 있지 않도록 세션 반환
+    note_repository.session.remove()
+    if not note:
+        return None, (jsonify({"error": "Note not found"}), 404)
+
+    return note, None
+
+
 @app.route("/interact", methods=["POST"])
 def interact_with_llm():
     """
@@ -163,35 +523,175 @@ def interact_with_llm():
     요청 데이터 예제:
     {
         "note_id": 1,
+        "type": "memo",  # 선택사항
         "action": "summarize"
     }
     """
     data = request.json
-    note_id = data.get("note_id")
-    action = data.get("action")
+    note, error = _read_interact_note(data)
+    if error:
+        return error
 
-    if not note_id or not action:
-        return jsonify({"error": "Missing required fields: note_id or action"}), 400
+    with admission.admit(_client_id()):
+        response = llm_handler.process(note, data["action"])
+    return jsonify(response)
 
-    note = note_repository.read(note_id)
-    if not note:
-        return jsonify({"error": "Note not found"}), 404
 
-    response = llm_handler.process(note, action)
+@app.route("/interact/stream", methods=["POST"])
+def interact_with_llm_stream():
+    """
+    /interact의 스트리밍 버전 (Server-Sent Events)
+    ---
+    요청 데이터는 /interact와 같습니다.
+    응답 이벤트 예제:
+    data: {"token": "프로젝트"}
+    data: {"token": " 상태"}
+    data: {"done": true, "result": {"summary": "프로젝트 상태"}}
+    긴 노트의 청크를 요약하는 동안에는 첫 토큰 전까지 주석 줄(": keep-alive")을 주기적으로 보냅니다.
+    실패하면 오류 이벤트 뒤에 종료 이벤트를 보냅니다.
+    event: error
+    data: {"error": "Generation failed: ..."}
+    data: {"done": true, "error": "Generation failed: ..."}
+    """
+    data = request.json
+    note, error = _read_interact_note(data)
+    if error:
+        return error
+
+    ticket = admission.acquire(_client_id())
+
+    def events():
+        try:
+            for event in llm_handler.stream(note, data["action"]):
+                yield _stream_frame(event)
+        except Exception as e:
+            logging.exception("LLM stream failed")
+            yield _stream_frame({"error": str(e)})
+            yield _stream_frame({"done": True, "error": str(e)})
+
+    response = Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    # 스트림이 끝나거나 클라이언트가 연결을 끊으면 실행 슬롯 반환
+    response.call_on_close(functools.partial(admission.release, ticket))
+    return response
+
+
+def _stream_frame(event: dict) -> str:
+    if event.get("keepalive"):
+        return ": keep-alive\n\n"
+    prefix = "event: error\n" if "error" in event and "done" not in event else ""
+    return f"{prefix}data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@app.route("/interact/notes", methods=["POST"])
+def interact_with_notes():
+    """
+    여러 노트를 대상으로 LLM과 상호작용 (예: 이번 주 노트 요약)
+    ---
+    요청 데이터 예제:
+    {
+        "action": "summarize_notes",
+        "type": "task",  # 선택사항, 없으면 모든 타입
+        "filters": {  # 선택사항, /notes/filter와 같은 조건
+            "updated_start": "2024-12-02T00:00:00",
+            "updated_end": "2024-12-08T23:59:59"
+        },
+        "query": "프로젝트"  # 선택사항, 관련 노트를 우선해서 담음
+    }
+    """
+    data = request.json
+    action = data.get("action")
+    if action not in llm_handler.MULTI_NOTE_PROMPTS:
+        return jsonify({"error": f"Unknown action: {action}"}), 400
+
+    note_type = data.get("type")
+    note_types = [note_type] if note_type else note_repository.note_types
+    try:
+        notes = [
+            note
+            for t in note_types
+            for note in note_repository.get_filtered_notes(t, data.get("filters", {}))
+        ]
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    finally:
+        note_repository.session.remove()
+
+    with admission.admit(_client_id()):
+        response = llm_handler.process_notes(notes, action, data.get("query"))
     return jsonify(response)
 
 
-if __name__ == "__main__":
-    NETWORK_CONFIG_PATH = "config/network_config.json"
-    SERVER_CONFIG_PATH = "config/server_config.json"
+@app.route("/jobs", methods=["POST"])
+def create_job():
+    """
+    노트에 대한 LLM 작업을 백그라운드 대기열에 추가
+    ---
+    요청 데이터 예제:
+    {
+        "note_id": 1,
+        "type": "memo",
+        "action": "summarize",
+        "priority": "high"  # 선택사항 ("low", "normal", "high")
+    }
+    """
+    data = request.json
+    note, error = _read_interact_note(data)
+    if error:
+        return error
+
+    if data["action"] not in llm_handler.SYSTEM_PROMPTS:
+        return jsonify({"error": f"Unknown action: {data['action']}"}), 400
 
+    try:
+        job_id = job_queue.enqueue(
+            note["type"], note["id"], data["action"], data.get("priority", "normal")
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"message": "Job queued", "id": job_id}), 202
+
+
+@app.route("/llm/stats", methods=["GET"])
+def get_llm_stats():
+    """
+    LLM 처리 계층(cache, index, fast, llm)별 처리 비율과 지연 시간, 배치 대기 시간을 반환
+    """
+    return jsonify({**llm_handler.stats(), "admission": admission.stats()})
+
+
+@app.route("/llm/worker", methods=["GET"])
+def get_model_worker_status():
+    """
+    모델 워커 상태를 반환 (워커를 사용하지 않으면 404)
+    """
+    if not model_worker:
+        return jsonify({"error": "Model worker is not enabled"}), 404
+
+    return jsonify(model_worker.status())
+
+
+@app.route("/jobs/<int:job_id>", methods=["GET"])
+def get_job(job_id):
+    """
+    작업 상태와 결과를 반환
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify(job)
+
+
+if __name__ == "__main__":
     # Config 파일 읽기
     with open(NETWORK_CONFIG_PATH, "r", encoding="utf-8") as f:
         network_config = json.load(f)
 
-    with open(SERVER_CONFIG_PATH, "r", encoding="utf-8") as f:
-        server_config = json.load(f)
-
     app.run(
         host=network_config["host"],
         port=network_config["port"],
@@ -0,0 +1,478 @@
+"""
+모델 가중치를 소유하는 별도 프로세스 워커.
+
+Flask 서버가 재시작되어도 워커는 살아 있어 모델을 다시 로드하지 않으며,
+여러 서버 프로세스가 같은 소켓에 연결해 하나의 모델을 공유합니다.
+
+    python -m server.model_worker --backend transformers --model Qwen/Qwen2.5-0.5B-Instruct
+
+요청은 pickle로 주고받으므로 연결은 항상 인증 키로 확인합니다. 키를 지정하지 않으면
+현재 사용자만 접근할 수 있는 디렉터리(소켓과 같은 곳)에 임의의 키를 만들어 서버와 워커가 공유합니다.
+"""
+
+import argparse
+import json
+import os
+import pickle
+import secrets
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Dict, Iterator, List, Optional
+
+from server.llm_backend import Messages, load_model
+
+# 워커가 허용하는 모델 메서드 (stream은 토큰 단위로 따로 전송)
+CALL_METHODS = ("generate", "tokenize", "detokenize", "count_tokens", "warm_prefixes")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def private_dir() -> str:
+    """
+    현재 사용자만 접근할 수 있는(0700) 워커 소켓/인증 키 디렉터리를 반환합니다.
+    다른 사용자가 미리 만들어 둔 디렉터리는 사용하지 않습니다.
+    """
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "")
+    path = os.path.join(tempfile.gettempdir(), f"paul-moed-{user}")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if hasattr(os, "getuid"):
+        info = os.lstat(path)
+        if (
+            not os.path.isdir(path)
+            or os.path.islink(path)
+            or info.st_uid != os.getuid()
+        ):
+            raise PermissionError(f"Model worker directory is not owned by us: {path}")
+        if info.st_mode & 0o077:
+            os.chmod(path, 0o700)
+    return path
+
+
+def default_address(name: str = "paul-moed-model") -> str:
+    """
+    플랫폼에 맞는 워커 주소를 반환합니다. (Windows는 named pipe, 그 외는 private_dir()의 Unix 소켓)
+    """
+    if sys.platform == "win32":
+        return rf"\\.\pipe\{name}"
+    return os.path.join(private_dir(), f"{name}.sock")
+
+
+def load_authkey(address: str) -> bytes:
+    """
+    워커 주소별 인증 키. 없으면 임의의 키를 만들어 private_dir()에 현재 사용자만 읽을 수 있게(0600) 저장합니다.
+    서버가 재시작되어도 같은 키로 실행 중인 워커에 다시 연결합니다.
+    """
+    name = os.path.basename(address.rstrip("\\/")) or "model"
+    path = os.path.join(private_dir(), f"{name}.key")
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # 다른 프로세스가 방금 파일을 만들고 아직 키를 쓰는 중이면 빈 파일을 읽으므로 잠시 기다림
+        deadline = time.monotonic() + 5.0
+        while True:
+            with open(path, "rb") as f:
+                key = f.read().strip()
+            if key:
+                return key
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Model worker authkey file is empty: {path}")
+            time.sleep(0.01)
+    with os.fdopen(fd, "wb") as f:
+        key = secrets.token_hex(32).encode()
+        f.write(key)
+    return key
+
+
+def _family(address: str) -> str:
+    return "AF_PIPE" if address.startswith("\\\\") else "AF_UNIX"
+
+
+def _connect(address: str, authkey: Optional[bytes]):
+    return Client(address, family=_family(address), authkey=authkey)
+
+
+class WorkerServer:
+    """
+    모델을 로드하고 소켓으로 들어오는 요청을 처리합니다. 연결마다 스레드 하나를 사용합니다.
+    """
+
+    def __init__(self, model, address: str, authkey: bytes):
+        if not authkey:
+            raise ValueError("Model worker requires an authkey")
+        self.model = model
+        self.address = address
+        self.authkey = authkey
+        self.started = time.time()
+
+    def serve_forever(self):
+        if _family(self.address) == "AF_UNIX" and os.path.exists(self.address):
+            # 이전 워커가 남긴 소켓 파일. 살아 있는 워커가 있으면 그대로 종료
+            if ping(self.address, self.authkey):
+                print(f"Model worker already running at {self.address}")
+                return
+            os.unlink(self.address)
+
+        with Listener(
+            self.address, family=_family(self.address), authkey=self.authkey
+        ) as listener:
+            if _family(self.address) == "AF_UNIX":
+                os.chmod(self.address, 0o600)
+            print(f"Model worker ({self.model.name}) listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (OSError, EOFError, AuthenticationError) as e:
+                    # 인증 실패 등은 해당 연결만 거부
+                    print(f"Rejected worker connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    self._dispatch(conn, request)
+                except (EOFError, OSError):
+                    return
+
+    def _dispatch(self, conn, request: Dict):
+        method = request.get("method")
+        args = request.get("args", [])
+        kwargs = request.get("kwargs", {})
+
+        if method == "ping":
+            conn.send(
+                {
+                    "result": {
+                        "model": self.model.name,
+                        "pid": os.getpid(),
+                        "uptime": time.time() - self.started,
+                    }
+                }
+            )
+        elif method == "stream":
+            try:
+                for token in self.model.stream(*args, **kwargs):
+                    conn.send({"token": token})
+            except Exception as e:
+                conn.send({"error": str(e)})
+            else:
+                conn.send({"end": True})
+        elif method in CALL_METHODS:
+            try:
+                result = getattr(self.model, method)(*args, **kwargs)
+            except Exception as e:
+                conn.send({"error": str(e)})
+            else:
+                conn.send({"result": result})
+        else:
+            conn.send({"error": f"Unknown method: {method}"})
+
+
+def ping(
+    address: str, authkey: Optional[bytes] = None, timeout: float = 5.0
+) -> Optional[Dict]:
+    """
+    워커 상태를 확인합니다. 연결할 수 없거나 timeout초 안에 응답이 없으면 None을 반환합니다.
+    """
+    try:
+        with _connect(address, authkey) as conn:
+            conn.send({"method": "ping"})
+            if not conn.poll(timeout):
+                # 멈춘 워커를 기다리다 상태 확인 자체가 멈추지 않도록 실패로 처리
+                return None
+            return conn.recv().get("result")
+    except (EOFError, OSError, AuthenticationError, pickle.UnpicklingError):
+        # 키가 다르면 워커의 인증 요청을 응답으로 잘못 읽음
+        return None
+
+
+class RemoteModel:
+    """
+    모델 워커에 연결해 StubModel/TransformersModel과 같은 인터페이스를 제공합니다.
+    연결은 재사용하며, 워커가 재시작되는 동안의 요청은 retries번까지 다시 시도합니다.
+    count_tokens는 요청마다 왕복하지 않도록 결과를 LRU로 캐시합니다.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        authkey: bytes,
+        name: str = "remote",
+        retries: int = 3,
+        retry_delay: float = 1.0,
+        token_cache_size: int = 4096,
+    ):
+        self.address = address
+        self.authkey = authkey
+        self.name = name
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.lock = threading.Lock()
+        self.idle: List = []
+        self.prefixes: List[str] = []  # 워커 재시작 시 다시 계산할 시스템 프롬프트
+        self.token_cache_size = token_cache_size
+        self.token_cache: "OrderedDict[str, int]" = OrderedDict()
+
+    def _acquire(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        return _connect(self.address, self.authkey)
+
+    def _release(self, conn):
+        with self.lock:
+            self.idle.append(conn)
+
+    def close(self):
+        with self.lock:
+            for conn in self.idle:
+                conn.close()
+            self.idle.clear()
+
+    def _call(self, method: str, *args, **kwargs):
+        for attempt in range(self.retries + 1):
+            conn = None
+            try:
+                conn = self._acquire()
+                conn.send({"method": method, "args": args, "kwargs": kwargs})
+                response = conn.recv()
+            except (EOFError, OSError) as e:
+                if conn is not None:
+                    conn.close()
+                if attempt == self.retries:
+                    raise ConnectionError(f"Model worker unavailable: {e}") from e
+                time.sleep(self.retry_delay)
+                continue
+
+            self._release(conn)
+            if "error" in response:
+                raise RuntimeError(response["error"])
+            return response["result"]
+
+    def generate(self, batch: List[Messages], **params) -> List[str]:
+        return self._call("generate", batch, **params)
+
+    def tokenize(self, text: str) -> list:
+        return self._call("tokenize", text)
+
+    def detokenize(self, tokens: list) -> str:
+        return self._call("detokenize", tokens)
+
+    def count_tokens(self, text: str) -> int:
+        with self.lock:
+            count = self.token_cache.get(text)
+            if count is not None:
+                self.token_cache.move_to_end(text)
+                return count
+        count = self._call("count_tokens", text)
+        with self.lock:
+            self.token_cache[text] = count
+            if len(self.token_cache) > self.token_cache_size:
+                self.token_cache.popitem(last=False)
+        return count
+
+    def warm_prefixes(self, system_prompts: List[str]):
+        self.prefixes = list(dict.fromkeys(self.prefixes + list(system_prompts)))
+        return self._call("warm_prefixes", system_prompts)
+
+    def stream(self, messages: Messages, **params) -> Iterator[str]:
+        """
+        토큰을 받는 동안 연결을 점유합니다. 첫 토큰을 받기 전에 끊어진 경우에만 다시 시도합니다.
+        """
+        for attempt in range(self.retries + 1):
+            conn = None
+            received = False
+            try:
+                conn = self._acquire()
+                conn.send({"method": "stream", "args": (messages,), "kwargs": params})
+                while True:
+                    response = conn.recv()
+                    if "token" in response:
+                        received = True
+                        yield response["token"]
+                    elif "error" in response:
+                        self._release(conn)
+                        raise RuntimeError(response["error"])
+                    else:
+                        self._release(conn)
+                        return
+            except (EOFError, OSError) as e:
+                if conn is not None:
+                    conn.close()
+                if received or attempt == self.retries:
+                    raise ConnectionError(f"Model worker unavailable: {e}") from e
+                time.sleep(self.retry_delay)
+            except GeneratorExit:
+                # 소비자가 중간에 멈추면 남은 토큰이 섞이지 않도록 연결을 버림
+                conn.close()
+                raise
+
+
+class ModelWorker:
+    """
+    모델 워커 프로세스를 관리합니다.
+    이미 실행 중인 워커가 있으면 그대로 사용하고, 없거나 응답하지 않으면 새로 띄웁니다.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        model_name: str,
+        address: Optional[str] = None,
+        authkey: Optional[str] = None,
+        model_options: Optional[Dict] = None,
+        health_interval: float = 5.0,
+        max_failures: int = 3,
+        startup_timeout: float = 300.0,
+    ):
+        """
+        Args:
+            backend (str): 워커에서 사용할 모델 백엔드 ("stub" 또는 "transformers")
+            model_name (str): 모델 식별자
+            address (str): 소켓 경로 (Windows는 named pipe). None이면 기본 주소 사용
+            authkey (str): 연결 인증 키. None이면 load_authkey()로 만든 임의의 키를 사용합니다.
+            model_options (dict): load_model에 넘길 추가 인자
+            health_interval (float): 상태 확인 간격(초)
+            max_failures (int): 연속으로 이만큼 응답이 없으면 워커를 다시 띄웁니다.
+            startup_timeout (float): 워커가 모델을 로드하고 응답할 때까지 기다리는 최대 시간(초)
+        """
+        self.backend = backend
+        self.model_name = model_name
+        self.address = address or default_address()
+        self.authkey = authkey.encode() if authkey else load_authkey(self.address)
+        self.model_options = model_options or {}
+        self.health_interval = health_interval
+        self.max_failures = max_failures
+        self.startup_timeout = startup_timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+        self.closed = threading.Event()
+        self.monitor: Optional[threading.Thread] = None
+        self.model = RemoteModel(
+            self.address,
+            self.authkey,
+            name=model_name,
+            retry_delay=min(1.0, health_interval),
+        )
+
+    def start(self) -> RemoteModel:
+        """
+        워커에 연결하고(필요하면 실행하고) 상태 확인 스레드를 시작합니다.
+
+        Returns:
+            RemoteModel: LLMHandler에 넘길 모델
+        """
+        if not ping(self.address, self.authkey):
+            self._spawn()
+        self.monitor = threading.Thread(target=self._monitor, daemon=True)
+        self.monitor.start()
+        return self.model
+
+    def status(self) -> Dict:
+        info = ping(self.address, self.authkey)
+        return {
+            "address": self.address,
+            "alive": info is not None,
+            "restarts": self.restarts,
+            **(info or {}),
+        }
+
+    def close(self, stop_worker: bool = False):
+        """
+        상태 확인을 멈춥니다. 워커는 서버 재시작 후에도 재사용하도록 기본적으로 남겨 둡니다.
+        """
+        self.closed.set()
+        if self.monitor:
+            self.monitor.join()
+        self.model.close()
+        if stop_worker and self.process and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait()
+
+    def _spawn(self):
+        command = [
+            sys.executable,
+            "-m",
+            "server.model_worker",
+            "--backend",
+            self.backend,
+            "--model",
+            self.model_name,
+            "--address",
+            self.address,
+            "--options",
+            json.dumps(self.model_options),
+        ]
+        env = {**os.environ, "MODEL_WORKER_AUTHKEY": self.authkey.decode()}
+        # 서버 프로세스 그룹과 분리해 서버가 종료되어도 워커가 유지되도록 함
+        kwargs = (
+            {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+            if sys.platform == "win32"
+            else {"start_new_session": True}
+        )
+        self.process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, **kwargs)
+
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if ping(self.address, self.authkey):
+                return
+            if self.process.poll() is not None and not ping(self.address, self.authkey):
+                raise RuntimeError(
+                    f"Model worker exited with code {self.process.returncode}"
+                )
+            time.sleep(0.1)
+        raise TimeoutError(f"Model worker did not start within {self.startup_timeout}s")
+
+    def _monitor(self):
+        failures = 0
+        while not self.closed.wait(self.health_interval):
+            if ping(self.address, self.authkey, timeout=self.health_interval):
+                failures = 0
+                continue
+
+            failures += 1
+            process_dead = self.process is not None and self.process.poll() is not None
+            if failures < self.max_failures and not process_dead:
+                continue
+
+            print(f"Model worker at {self.address} is not responding, restarting")
+            if self.process and self.process.poll() is None:
+                self.process.kill()
+                self.process.wait()
+            try:
+                self._spawn()
+                self.restarts += 1
+                failures = 0
+                if self.model.prefixes:
+                    self.model.warm_prefixes(self.model.prefixes)
+            except Exception as e:
+                print(f"Failed to restart model worker: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PAUL MOED model worker")
+    parser.add_argument("--backend", default="transformers")
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--address", default=default_address())
+    parser.add_argument("--options", default="{}", help="load_model 추가 인자 (JSON)")
+    args = parser.parse_args()
+
+    authkey = os.environ.get("MODEL_WORKER_AUTHKEY")
+    authkey = authkey.encode() if authkey else load_authkey(args.address)
+    model = load_model(args.backend, args.model, **json.loads(args.options))
+    WorkerServer(model, args.address, authkey).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,8 @@ class BaseNoteModel(Base):
     content = Column(String, nullable=False)
     created = Column(DateTime, default=datetime.utcnow)
     updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # 수정할 때마다 1씩 증가 (PATCH의 낙관적 동시성 제어에 사용)
+    version = Column(Integer, nullable=False, default=1)
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -29,6 +31,7 @@ class BaseNoteModel(Base):
             "content": self.content,
             "created": self.created.isoformat() if self.created else None,
             "updated": self.updated.isoformat() if self.updated else None,
+            "version": self.version,
         }
 
     def from_dict(self, data: Dict[str, Any]) -> "BaseNoteModel":
@@ -42,6 +45,19 @@ class BaseNoteModel(Base):
                 setattr(self, key, value)
 
 
+class NoteIndexModel(Base):
+    """
+    모든 노트 타입이 공유하는 ID 시퀀스와 ID → 타입 매핑
+    """
+
+    __tablename__ = "note_index"
+    # 삭제된 ID를 다시 쓰지 않도록 SQLite AUTOINCREMENT 사용
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    type = Column(String, nullable=False, index=True)
+
+
 class MemoModel(BaseNoteModel):
     __tablename__ = "memos"
 
@@ -102,3 +118,56 @@ class TaskModel(BaseNoteModel):
         super().from_dict(data)
         if "due_date" in data and isinstance(data["due_date"], str):
             self.due_date = datetime.fromisoformat(data["due_date"])
+
+
+class LLMResultModel(Base):
+    """
+    LLM 처리 결과 캐시 테이블
+    """
+
+    __tablename__ = "llm_results"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    key = Column(String, nullable=False, unique=True, index=True)
+    note_type = Column(String, nullable=True, index=True)
+    note_id = Column(Integer, nullable=True, index=True)
+    action = Column(String, nullable=False)
+    result = Column(JSON, nullable=False)
+    created = Column(DateTime, default=datetime.utcnow)
+    last_accessed = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class JobModel(Base):
+    """
+    백그라운드 LLM 작업 대기열 테이블
+    """
+
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    note_type = Column(String, nullable=False)
+    note_id = Column(Integer, nullable=False)
+    action = Column(String, nullable=False)
+    priority = Column(Integer, default=0, index=True)
+    status = Column(String, default="pending", index=True)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    created = Column(DateTime, default=datetime.utcnow)
+    updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        객체를 JSON 직렬화 가능한 딕셔너리로 변환
+        """
+        return {
+            "id": self.id,
+            "note_type": self.note_type,
+            "note_id": self.note_id,
+            "action": self.action,
+            "priority": self.priority,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created": self.created.isoformat() if self.created else None,
+            "updated": self.updated.isoformat() if self.updated else None,
+        }
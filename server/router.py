@@ -0,0 +1,281 @@
+import math
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import sessionmaker
+
+from server.embedding import HashingEmbedder, note_text
+from server.models import LLMResultModel, TaskModel
+
+PRIORITY_LABELS = ("high", "medium", "low")
+
+
+class ExtractiveSummarizer:
+    """
+    문장 점수(단어 빈도)로 원문에서 문장을 골라 요약합니다.
+    """
+
+    def __init__(self, max_sentences: int = 2):
+        self.max_sentences = max_sentences
+
+    def summarize(self, text: str) -> Tuple[str, float]:
+        """
+        Returns:
+            (요약, 신뢰도): 신뢰도는 고른 문장이 차지하는 전체 문장 점수의 비율
+        """
+        sentences = [
+            s.strip() for s in re.split(r"(?<=[.!?。])\s+|\n+", text) if s.strip()
+        ]
+        if len(sentences) <= self.max_sentences:
+            return " ".join(sentences), 1.0
+
+        words = [re.findall(r"\w+", s.lower()) for s in sentences]
+        frequency = Counter(word for sentence in words for word in sentence)
+        scores = [
+            sum(frequency[word] for word in sentence) / math.sqrt(len(sentence) or 1)
+            for sentence in words
+        ]
+        chosen = sorted(
+            sorted(range(len(sentences)), key=lambda i: -scores[i])[
+                : self.max_sentences
+            ]
+        )
+        confidence = sum(scores[i] for i in chosen) / (sum(scores) or 1)
+        return " ".join(sentences[i] for i in chosen), confidence
+
+
+class KNNEstimator:
+    """
+    임베딩 유사도 가중 k-최근접 이웃 회귀/분류기.
+    모든 예제와의 유사도를 한 번의 행렬 곱으로 계산합니다.
+    """
+
+    def __init__(self, embedder: HashingEmbedder, k: int = 5, classify: bool = False):
+        self.embedder = embedder
+        self.k = k
+        self.classify = classify
+        # (벡터 행렬, 목표값) 쌍: 다른 스레드의 predict가 항상 짝이 맞는 두 값을 보도록
+        # fit은 새 쌍을 만든 뒤 한 번에 바꿔 끼움
+        self.model: Tuple[np.ndarray, list] = (
+            np.zeros((0, embedder.dim), dtype=np.float32),
+            [],
+        )
+
+    def __len__(self):
+        return len(self.model[1])
+
+    def fit(self, texts: List[str], targets: list):
+        vectors = (
+            self.embedder.embed(texts)
+            if texts
+            else np.zeros((0, self.embedder.dim), dtype=np.float32)
+        )
+        self.model = (vectors, list(targets))
+
+    def predict(self, text: str) -> Tuple[Optional[object], float]:
+        """
+        Returns:
+            (예측값, 신뢰도): 신뢰도는 이웃 유사도와 이웃 간 합의 정도의 곱 (0~1)
+        """
+        vectors, targets = self.model
+        if not targets:
+            return None, 0.0
+
+        scores = vectors @ self.embedder.embed([text])[0]
+        k = min(self.k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        weights = np.clip(scores[top], 1e-6, None)
+        similarity = float(np.clip(scores[top], 0, 1).mean())
+
+        if self.classify:
+            votes: Dict[str, float] = {}
+            for i, weight in zip(top, weights):
+                votes[targets[i]] = votes.get(targets[i], 0.0) + weight
+            label = max(votes, key=votes.get)
+            agreement = votes[label] / weights.sum()
+            return label, similarity * agreement
+
+        # 소요 시간은 분포가 한쪽으로 치우쳐 있으므로 로그 공간에서 평균
+        logs = np.log([targets[i] for i in top])
+        mean = float(np.average(logs, weights=weights))
+        spread = float(np.sqrt(np.average((logs - mean) ** 2, weights=weights)))
+        agreement = 1.0 / (1.0 + spread)
+        return float(np.exp(mean)), similarity * agreement
+
+
+class TierStats:
+    """
+    처리 계층(cache, index, fast, llm)별 액션 처리 횟수와 지연 시간을 집계합니다.
+    """
+
+    TIERS = ("cache", "index", "fast", "llm")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    def record(self, action: str, tier: str, seconds: float):
+        with self.lock:
+            entry = self.stats.setdefault(action, {}).setdefault(
+                tier, {"count": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            entry["count"] += 1
+            entry["total_ms"] += seconds * 1000
+            entry["max_ms"] = max(entry["max_ms"], seconds * 1000)
+
+    def to_dict(self) -> Dict:
+        """
+        액션별로 계층마다 처리 횟수, 비율(hit_rate), 평균/최대 지연(ms)을 반환합니다.
+        """
+        with self.lock:
+            result = {}
+            for action, tiers in self.stats.items():
+                total = sum(entry["count"] for entry in tiers.values())
+                result[action] = {
+                    tier: {
+                        "count": entry["count"],
+                        "hit_rate": round(entry["count"] / total, 4),
+                        "mean_ms": round(entry["total_ms"] / entry["count"], 3),
+                        "max_ms": round(entry["max_ms"], 3),
+                    }
+                    for tier, entry in tiers.items()
+                }
+            return result
+
+
+class TieredRouter:
+    """
+    LLM을 호출하기 전에 가벼운 엔진으로 먼저 처리해 봅니다.
+    - summarize: 짧은 노트는 추출 요약
+    - estimate_duration / estimate_priority: 완료된 할 일 기록으로 학습한 k-NN
+    신뢰도가 낮거나 입력이 길면 None을 반환해 LLM으로 넘깁니다.
+    """
+
+    def __init__(
+        self,
+        engine,
+        embedder: Optional[HashingEmbedder] = None,
+        min_confidence: float = 0.6,
+        summary_max_tokens: int = 60,
+        k: int = 5,
+        min_examples: int = 10,
+        retrain_seconds: float = 300,
+    ):
+        """
+        Args:
+            engine: 노트 저장소와 공유하는 SQLAlchemy 엔진 (학습 데이터 조회용)
+            embedder (HashingEmbedder): k-NN에 사용할 임베더
+            min_confidence (float): 이 값 이상일 때만 빠른 경로의 결과를 사용합니다.
+            summary_max_tokens (int): 이 토큰 수 이하의 노트만 추출 요약을 시도합니다.
+            k (int): k-NN 이웃 수
+            min_examples (int): 학습 예제가 이보다 적으면 k-NN을 사용하지 않습니다.
+            retrain_seconds (float): 할 일이 바뀐 뒤 다시 학습하기까지의 최소 간격(초)
+        """
+        self.Session = sessionmaker(bind=engine)
+        self.embedder = embedder or HashingEmbedder()
+        self.min_confidence = min_confidence
+        self.summary_max_tokens = summary_max_tokens
+        self.min_examples = min_examples
+        self.retrain_seconds = retrain_seconds
+        self.summarizer = ExtractiveSummarizer()
+        self.duration = KNNEstimator(self.embedder, k=k)
+        self.priority = KNNEstimator(self.embedder, k=k, classify=True)
+        self.lock = threading.Lock()
+        self.dirty = True
+        self.trained_at = 0.0
+
+    def route(self, note: Dict, action: str, model) -> Optional[Dict]:
+        """
+        빠른 경로로 처리할 수 있으면 결과를, 아니면 None을 반환합니다.
+
+        Args:
+            model: 토큰 수를 셀 모델 (count_tokens 제공)
+        """
+        if action == "summarize":
+            content = note.get("content", "")
+            if model.count_tokens(content) > self.summary_max_tokens:
+                return None
+            summary, confidence = self.summarizer.summarize(content)
+            if summary and confidence >= self.min_confidence:
+                return {"summary": summary}
+            return None
+
+        if action in ("estimate_duration", "estimate_priority"):
+            self._maybe_train()
+            estimator = (
+                self.duration if action == "estimate_duration" else self.priority
+            )
+            if len(estimator) < self.min_examples:
+                return None
+            value, confidence = estimator.predict(note_text(note))
+            if confidence < self.min_confidence:
+                return None
+            if action == "estimate_duration":
+                return {"duration_minutes": max(1, round(value))}
+            return {"priority": value}
+
+        return None
+
+    def train(self):
+        """
+        할 일 기록으로 k-NN을 학습합니다.
+        - 소요 시간: 완료된 할 일의 생성 시각부터 마지막 수정(완료) 시각까지
+        - 우선순위: 태그에 지정된 우선순위, 없으면 이전에 LLM이 추정한 우선순위
+        """
+        with self.Session() as session:
+            tasks = [task.to_dict() for task in session.query(TaskModel).all()]
+            estimated = {
+                row.note_id: row.result.get("priority")
+                for row in session.query(LLMResultModel).filter_by(
+                    note_type="task", action="estimate_priority"
+                )
+            }
+
+        duration_texts, durations = [], []
+        priority_texts, priorities = [], []
+        for task in tasks:
+            text = note_text(task)
+            if task["done"] and task["created"] and task["updated"]:
+                minutes = (
+                    datetime.fromisoformat(task["updated"])
+                    - datetime.fromisoformat(task["created"])
+                ).total_seconds() / 60
+                if 1 <= minutes <= 7 * 24 * 60:
+                    duration_texts.append(text)
+                    durations.append(minutes)
+
+            labels = [tag for tag in task.get("tags") or [] if tag in PRIORITY_LABELS]
+            label = labels[0] if labels else estimated.get(task["id"])
+            if label in PRIORITY_LABELS:
+                priority_texts.append(text)
+                priorities.append(label)
+
+        self.duration.fit(duration_texts, durations)
+        self.priority.fit(priority_texts, priorities)
+
+    def _maybe_train(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            if (
+                self.trained_at
+                and time.monotonic() - self.trained_at < self.retrain_seconds
+            ):
+                return
+            self.dirty = False
+            self.trained_at = time.monotonic()
+        self.train()
+
+    def on_note_changed(
+        self, event: str, note: Dict, previous: Optional[Dict] = None
+    ) -> None:
+        """
+        NoteRepository 리스너: 할 일이 바뀌면 다음 요청 때 다시 학습하도록 표시합니다.
+        """
+        if (note.get("type") or "").lower() in ("task", ""):
+            self.dirty = True
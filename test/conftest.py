@@ -0,0 +1,9 @@
+import pytest
+
+from server.database import NoteRepository
+
+
+@pytest.fixture
+def note_repository(tmp_path):
+    """임시 SQLite 파일을 사용하는 NoteRepository"""
+    return NoteRepository(f"sqlite:///{tmp_path / 'notes.db'}")
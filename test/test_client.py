@@ -1,9 +1,30 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
 import pytest
 import requests
 from unittest.mock import patch
+from sqlalchemy import create_engine
 from client.repository import Repository
+from client.calendar_tab import CalendarTab
+from client.local_store import LocalStore
+from client.main import LazyTab
 from client.memo_tab import MemoTab
+from client.reconcile import reconcile
+from client.search import SearchIndex
+from client.simple_calendar import shift_month
 from client.todo_tab import TodoTab
+from client.worker import Worker
+from server.database import NoteRepository, VersionConflict
+from server.events import NoteEventFeed
+from server.models import Base, MemoModel, TaskModel
 
 # Sample configurations
 PROTOCOL = "http"
@@ -32,17 +53,19 @@ def mock_response():
     return MockResponse
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_repository_get_all_notes(mock_get, repository, mock_response):
     """모든 노트를 가져오는 테스트"""
     mock_get.return_value = mock_response({"notes": []}, 200)
 
     notes = repository.get_all_notes()
     assert notes == {"notes": []}
-    mock_get.assert_called_with(f"{repository.server}/notes")
+    mock_get.assert_called_with(
+        f"{repository.server}/notes", timeout=repository.timeout
+    )
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_repository_filtered_notes(mock_get, repository, mock_response):
     """필터 조건으로 노트를 가져오는 테스트"""
     mock_get.return_value = mock_response(
@@ -55,7 +78,7 @@ def test_repository_filtered_notes(mock_get, repository, mock_response):
     mock_get.assert_called_once()
 
 
-@patch("requests.post")
+@patch("requests.Session.post")
 def test_repository_new_note_success(mock_post, repository, mock_response):
     """새로운 노트 생성 성공 테스트"""
     mock_post.return_value = mock_response({"id": 1}, 201)
@@ -63,10 +86,12 @@ def test_repository_new_note_success(mock_post, repository, mock_response):
     new_note = {"type": "memo", "name": "Test Note", "content": "Content"}
     response = repository.new_note(**new_note)
     assert response == {"id": 1}
-    mock_post.assert_called_with(f"{repository.server}/notes", json=new_note)
+    mock_post.assert_called_with(
+        f"{repository.server}/notes", json=new_note, timeout=repository.timeout
+    )
 
 
-@patch("requests.post")
+@patch("requests.Session.post")
 def test_repository_new_note_failure(mock_post, repository, mock_response):
     """새로운 노트 생성 실패 테스트"""
     mock_post.return_value = mock_response({"error": "Bad Request"}, 400)
@@ -74,10 +99,12 @@ def test_repository_new_note_failure(mock_post, repository, mock_response):
     new_note = {"type": "memo", "name": "Test Note", "content": "Content"}
     response = repository.new_note(**new_note)
     assert response is None
-    mock_post.assert_called_with(f"{repository.server}/notes", json=new_note)
+    mock_post.assert_called_with(
+        f"{repository.server}/notes", json=new_note, timeout=repository.timeout
+    )
 
 
-@patch("requests.put")
+@patch("requests.Session.put")
 def test_repository_update_note_success(mock_put, repository, mock_response):
     """노트 업데이트 성공 테스트"""
     mock_put.return_value = mock_response({"message": "Updated"}, 200)
@@ -85,14 +112,751 @@ def test_repository_update_note_success(mock_put, repository, mock_response):
     note_updates = {"name": "Updated Note"}
     response = repository.update_note(1, **note_updates)
     assert response == {"message": "Updated"}
-    mock_put.assert_called_with(f"{repository.server}/notes/1", json=note_updates)
+    mock_put.assert_called_with(
+        f"{repository.server}/notes/1", json=note_updates, timeout=repository.timeout
+    )
 
 
-@patch("requests.delete")
+@patch("requests.Session.delete")
 def test_repository_delete_note_success(mock_delete, repository, mock_response):
     """노트 삭제 성공 테스트"""
     mock_delete.return_value = mock_response({"message": "Deleted"}, 200)
 
     response = repository.delete_note(1)
     assert response == {"message": "Deleted"}
-    mock_delete.assert_called_with(f"{repository.server}/notes/1")
+    mock_delete.assert_called_with(
+        f"{repository.server}/notes/1", timeout=repository.timeout
+    )
+
+
+@pytest.fixture
+def flaky_server():
+    """첫 요청마다 503을 반환한 뒤 성공하는 로컬 서버"""
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            self.rfile.read(length)
+            calls.append(self.command)
+            status = 503 if calls.count(self.command) == 1 else 200
+            body = json.dumps({"calls": len(calls)}).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = do_POST = _reply
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, calls
+    server.shutdown()
+    server.server_close()
+
+
+def test_repository_retries_only_idempotent_requests(flaky_server):
+    """GET은 503 후 재시도하고, POST는 재시도하지 않는지 테스트"""
+    server, calls = flaky_server
+    repository = Repository(PROTOCOL, "127.0.0.1", server.server_port, backoff_factor=0)
+
+    assert repository.ping() == {"calls": 2}
+    assert "error" in repository.new_note(type="memo", name="a", content="b")
+    assert calls == ["GET", "GET", "POST"]
+
+    stats = repository.latency_stats()
+    assert stats["GET /ping"]["count"] == 1
+    assert stats["POST /notes"]["count"] == 1
+    repository.close()
+
+
+@pytest.fixture
+def note_server(tmp_path):
+    """NoteRepository를 노트 API로 노출하는 로컬 대역 서버"""
+    notes = NoteRepository(f"sqlite:///{tmp_path / 'server.db'}")
+    feed = NoteEventFeed()
+    notes.add_listener(feed.on_note_changed)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, body, headers=()):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for header in headers:
+                self.send_header(*header)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _poll_events(self):
+            since = parse_qs(urlsplit(self.path).query).get("since", [None])[0]
+            result = feed.poll(since, 0.2)
+            if result is None:
+                # 재시도하면 Retry-After만큼 막힘
+                return self._send(
+                    503, {"error": "Too many event waiters"}, [("Retry-After", "30")]
+                )
+            self._send(200, result)
+
+        def _reply(self):
+            if self.path.startswith("/notes/events"):
+                return self._poll_events()
+            length = int(self.headers.get("Content-Length") or 0)
+            data = json.loads(self.rfile.read(length) or "null")
+            match = re.fullmatch(r"/notes(?:/(\d+))?", self.path)
+            note_id = int(match.group(1)) if match and match.group(1) else None
+            status, body = 404, {"error": "Not found"}
+            with lock:
+                if self.command == "POST" and note_id is None:
+                    status, body = 201, {"id": notes.create(data)}
+                elif self.command == "GET" and note_id is None:
+                    status = 200
+                    body = [n for t in notes.note_types for n in notes.read_all(t)]
+                elif self.command == "GET" and notes.read(note_id):
+                    status, body = 200, notes.read(note_id)
+                elif self.command == "PUT" and notes.update(note_id, data):
+                    status, body = 200, {"message": "Updated"}
+                elif self.command == "PATCH":
+                    try:
+                        note = notes.patch(note_id, data["changes"], data["version"])
+                        if note:
+                            status, body = 200, note
+                    except VersionConflict as e:
+                        status, body = 409, {"note": e.current}
+                elif self.command == "DELETE" and notes.delete(note_id):
+                    status, body = 200, {"message": "Deleted"}
+            self._send(status, body)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _reply
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.feed = feed
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, notes
+    server.shutdown()
+    server.server_close()
+
+
+def test_local_store_serves_reads_and_queues_writes_offline(tmp_path):
+    """서버 없이도 로컬 사본으로 읽고 쓰며, 쓰기는 outbox에 쌓이는지 테스트"""
+    repository = Repository(
+        PROTOCOL,
+        "127.0.0.1",
+        1,  # 연결할 수 없는 포트
+        retries=0,
+        local_store=str(tmp_path / "local.db"),
+        sync_interval=0,
+    )
+    created = repository.new_note(type="memo", name="메모", content="오프라인")
+    assert created["id"] < 0
+    repository.update_note(created["id"], content="수정")
+
+    assert repository.get_all_notes()[0]["content"] == "수정"
+    assert repository.filtered_notes(note_type="memo")[0]["id"] == created["id"]
+    assert repository.sync() is False and repository.online is False
+    # 생성 후 수정은 생성 작업 하나로 합쳐짐
+    assert [entry["op"] for entry in repository.store.pending()] == ["create"]
+    repository.close()
+
+
+def test_local_store_never_reuses_temp_ids(tmp_path):
+    """동기화 중인 생성 작업의 노트를 지워도 임시 ID를 다시 쓰지 않아 다른 노트의 ID가 바뀌지 않음"""
+    store = LocalStore(str(tmp_path / "local.db"))
+    first = store.create({"type": "memo", "name": "첫 메모", "content": ""})
+    entry = store.pending()[0]  # 서버로 보내는 중인 생성 작업
+    store.delete(first["id"])
+    second = store.create({"type": "memo", "name": "둘째 메모", "content": ""})
+    assert second["id"] < first["id"]
+
+    store.complete(entry, {**first, "id": 10})
+    assert store.get(second["id"])["name"] == "둘째 메모"
+    assert store.get(10) is None
+    store.close()
+
+    # 다시 열어도 카운터를 이어서 사용
+    reopened = LocalStore(str(tmp_path / "local.db"))
+    reopened.delete(second["id"])
+    assert reopened.create({"type": "memo", "name": "셋째", "content": ""})["id"] < (
+        second["id"]
+    )
+    reopened.close()
+
+
+def test_local_store_follows_ids_renumbered_on_server_startup(tmp_path):
+    """서버가 시작하며 겹치는 ID를 옮기면 구독자에게 reset을 보내고, 다시 받은 목록으로 로컬 사본을 바로잡음"""
+    db_url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    legacy = [
+        {"id": 1, "type": "memo", "name": "메모", "content": "memo"},
+        {"id": 1, "type": "task", "name": "할 일", "content": "task"},
+    ]
+    with engine.begin() as connection:
+        connection.execute(MemoModel.__table__.insert(), [legacy[0]])
+        connection.execute(TaskModel.__table__.insert(), [legacy[1]])
+    engine.dispose()
+
+    # 이전 서버에서 받은 목록: 같은 ID라 로컬 사본에는 할 일이 ID 1로 남아 있음
+    store = LocalStore(str(tmp_path / "local.db"))
+    store.merge([{**note, "updated": "2024-01-01T00:00:00"} for note in legacy])
+    assert store.get(1)["type"] == "task"
+
+    notes = NoteRepository(db_url)
+    feed = NoteEventFeed()
+    notes.add_listener(feed.on_note_changed)
+    task_id = notes.read_all("task")[0]["id"]
+    assert task_id != 1 and notes.renumbered[0]["id"] == task_id
+    assert [message for _, message in feed.since(feed.token(0))[0]] == [
+        {"event": "reset"}
+    ]
+
+    # reset을 받은 클라이언트는 전체 목록을 다시 받음
+    store.merge(notes.read_all("memo") + notes.read_all("task"))
+    assert store.get(1)["type"] == "memo" and store.get(1)["content"] == "memo"
+    assert store.get(task_id)["content"] == "task"
+    store.close()
+
+
+def test_local_store_syncs_and_resolves_conflicts(tmp_path, note_server):
+    """outbox를 서버로 보내고, 서버 쪽이 더 최근에 바뀌면 서버 버전을 따르는지 테스트"""
+    server, notes = note_server
+    repository = Repository(
+        PROTOCOL,
+        "127.0.0.1",
+        server.server_port,
+        local_store=str(tmp_path / "local.db"),
+        sync_interval=0,
+    )
+    repository.new_note(type="task", name="할 일", content="초안", done=False)
+    assert repository.sync() is True
+    (task,) = repository.get_all_notes()
+    assert task["id"] > 0 and notes.read(task["id"])["content"] == "초안"
+    assert repository.store.pending() == []
+
+    # 로컬 수정 뒤 서버에서 더 나중에 수정 -> 서버 버전 유지
+    repository.update_note(task["id"], content="로컬 수정")
+    time.sleep(0.01)
+    notes.update(task["id"], {"content": "서버 수정"})
+    repository.sync()
+    assert repository.conflicts == 1
+    assert repository.get_note(task["id"])["content"] == "서버 수정"
+
+    # 충돌이 없으면 로컬 수정이 서버로 감
+    repository.update_note(task["id"], done=True)
+    repository.sync()
+    assert notes.read(task["id"])["done"] is True
+
+    # 서버에서 지운 노트는 로컬 사본에서도 사라짐
+    notes.delete(task["id"])
+    repository.sync()
+    assert repository.get_all_notes() == []
+    repository.close()
+
+
+def _tick_until(condition, timeout=5.0):
+    """조건이 참이 될 때까지 Kivy Clock을 돌림"""
+    from kivy.clock import Clock
+
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        Clock.tick()
+        time.sleep(0.005)
+    return condition()
+
+
+def test_worker_delivers_results_on_clock_and_cancels_by_owner():
+    """작업은 다른 스레드에서 실행되고, 결과는 Clock에서 전달되며, owner 취소 시 버려지는지 테스트"""
+    worker = Worker(max_workers=1)
+    main_thread = threading.get_ident()
+    results = []
+    owner, closed_tab = object(), object()
+    release = threading.Event()
+
+    worker.submit(
+        lambda: threading.get_ident(),
+        on_result=lambda ident: results.append(("ran", ident, threading.get_ident())),
+        owner=owner,
+    )
+    worker.submit(release.wait, on_result=results.append, owner=closed_tab)
+    worker.submit(lambda: "queued", on_result=results.append, owner=closed_tab)
+    assert worker.cancel(closed_tab) == 2
+    release.set()
+
+    assert _tick_until(lambda: not worker.busy(owner))
+    _tick_until(lambda: False, timeout=0.1)
+    assert len(results) == 1
+    _, ran_on, delivered_on = results[0]
+    assert ran_on != main_thread and delivered_on == main_thread
+    worker.shutdown()
+
+
+def test_todo_tab_lists_rows_as_recycle_data():
+    """할 일 탭은 위젯 대신 태그 헤더/태스크 행 데이터로 목록을 구성하는지 테스트"""
+
+    class FakeRepository:
+        def filtered_notes(self, note_type):
+            return []
+
+        def add_listener(self, listener):
+            pass
+
+        def remove_listener(self, listener):
+            pass
+
+    worker = Worker(max_workers=1)
+    tab = TodoTab(FakeRepository(), worker)
+    tasks = [
+        {"id": 1, "name": "보고서", "tags": ["work"], "done": False},
+        {"id": 2, "name": "운동", "tags": ["health"], "done": True},
+        {"id": 3, "name": "회의", "tags": ["work"], "done": False},
+    ]
+    tab.on_tasks_loaded(tasks)
+    rows = [
+        (row["viewclass"], row.get("task", {}).get("id")) for row in tab.task_list.data
+    ]
+    assert rows == [("TodoHeader", None), ("TaskRow", 1), ("TaskRow", 3)]
+
+    tab.toggle_done_visibility(None)
+    assert [
+        row["text"] for row in tab.task_list.data if row["viewclass"] == "TodoHeader"
+    ] == [
+        "[b]work[/b]",
+        "[b]health[/b]",
+        "[b]Done[/b]",
+    ]
+    tab.close()
+    worker.shutdown()
+
+
+def test_todo_tab_updates_only_changed_rows(tmp_path, note_server):
+    """할 일 토글과 서버 변경 알림이 목록 전체가 아니라 바뀐 행만 고치는지 테스트"""
+    # 키 기반 비교: 한 행이 맨 뒤로 가면 이동 한 번
+    data = [{"key": key} for key in range(5)]
+    assert reconcile(data, data[1:] + data[:1])["moved"] == 1
+
+    server, notes = note_server
+    repository = Repository(
+        PROTOCOL,
+        "127.0.0.1",
+        server.server_port,
+        local_store=str(tmp_path / "local.db"),
+        sync_interval=0,
+    )
+    for name in ("보고서", "회의", "운동"):
+        repository.new_note(
+            type="task", name=name, content="", tags=["work"], done=False
+        )
+    repository.sync()
+    report, meeting, workout = repository.filtered_notes(note_type="task")
+
+    worker = Worker(max_workers=1)
+    tab = TodoTab(repository, worker)
+    assert _tick_until(lambda: len(tab.task_list.data) == 4)
+    before = list(tab.task_list.data)
+
+    # 완료한 태스크의 행 하나만 빠짐
+    tab.set_task_done(meeting["id"], True)
+    assert tab.last_changes == {"inserted": 0, "moved": 0, "updated": 0, "removed": 1}
+    assert _tick_until(lambda: not worker.busy(tab))
+
+    # 다른 곳에서 바뀐 태스크는 동기화 알림으로 그 행만 바뀜
+    time.sleep(0.01)
+    notes.update(workout["id"], {"name": "달리기"})
+    repository.sync()
+    assert _tick_until(lambda: tab.task_list.data[-1]["task"]["name"] == "달리기")
+    assert tab.task_list.data[0] is before[0] and tab.task_list.data[1] is before[1]
+    assert tab.last_changes["updated"] == 1
+    assert sum(tab.last_changes.values()) == 1
+    assert notes.read(meeting["id"])["done"] is True
+
+    tab.close()
+    assert repository.store.listeners == []
+    worker.shutdown()
+    repository.close()
+
+
+def test_search_index_matches_korean_prefixes_and_infixes():
+    """한국어 접두사/붙여 쓴 단어 중간/입력 중인 초성 검색과 순위, 증분 갱신 테스트"""
+    index = SearchIndex(
+        [
+            {"id": 1, "name": "주간회의록", "content": "다음 주 일정", "tags": []},
+            {"id": 2, "name": "회의 준비", "content": "발표 자료", "tags": []},
+            {"id": 3, "name": "장보기", "content": "회의실 예약", "tags": ["home"]},
+            {"id": 4, "name": "Meeting", "content": "meet the team", "tags": []},
+        ]
+    )
+    # 필드 가중치(제목 > 태그 > 내용)와 일치 방식(정확히 > 접두사 > 단어 중간)으로 순위
+    assert index.search("회의") == [2, 1, 3]
+    assert index.search("회ㅇ") == [2, 3]
+    assert index.search("MEET team") == [4]
+    assert index.search("회의 home") == [3]
+
+    index.apply("update", {"id": 2, "name": "준비물", "content": "", "tags": []})
+    index.apply("delete", {"id": 1})
+    index.apply("update", {"id": 9, "name": "회의", "tags": []}, {"id": -1})
+    assert index.search("회의") == [9, 3]
+    assert len(index) == 4
+
+
+def test_search_index_keeps_changes_applied_during_rebuild():
+    """색인을 다시 만드는 동안 다른 스레드에서 들어온 변경이 새 색인에 남는지 테스트"""
+    index = SearchIndex()
+
+    def notes():
+        yield {"id": 1, "name": "장보기", "content": "", "tags": []}
+        # 작업 스레드가 목록을 색인하는 도중 동기화 스레드가 변경을 알림
+        applied = threading.Thread(
+            target=index.apply,
+            args=("create", {"id": 2, "name": "회의록", "content": "", "tags": []}),
+        )
+        applied.start()
+        applied.join()
+        index.apply("delete", {"id": 1})
+        yield {"id": 3, "name": "회의 준비", "content": "", "tags": []}
+
+    index.rebuild(notes())
+    assert sorted(index.search("회의")) == [2, 3]
+    assert index.search("장보기") == []
+    assert index.pending == []
+
+
+def test_memo_tab_debounces_search_and_follows_changes():
+    """입력이 멈춘 뒤 한 번만 검색하고, 변경 알림이 오면 검색 결과에 반영되는지 테스트"""
+
+    class FakeRepository:
+        listeners = []
+
+        def get_all_notes(self):
+            return [
+                {"id": 1, "type": "memo", "name": "장보기", "content": "우유"},
+                {"id": 2, "type": "memo", "name": "회의록", "content": "안건"},
+            ]
+
+        def add_listener(self, listener):
+            self.listeners.append(listener)
+
+        def remove_listener(self, listener):
+            self.listeners.remove(listener)
+
+    repository = FakeRepository()
+    worker = Worker(max_workers=1)
+    tab = MemoTab(repository, worker)
+    assert _tick_until(lambda: len(tab.index) == 2 and not worker.busy(tab))
+    searches = tab.search_seq
+
+    for text in ("회", "회의", "회의록"):
+        tab.search_bar.text = text
+    assert _tick_until(lambda: tab.search_seq == searches + 1 and not worker.busy(tab))
+    _tick_until(lambda: False, timeout=MemoTab.SEARCH_DELAY * 2)
+    assert tab.search_seq == searches + 1
+    assert [row["note"]["id"] for row in tab.memo_list.data] == [2]
+
+    repository.listeners[0](
+        "create", {"id": 3, "type": "memo", "name": "회의록 초안", "content": ""}, None
+    )
+    assert _tick_until(lambda: len(tab.memo_list.data) == 2)
+    assert [row["note"]["id"] for row in tab.memo_list.data] == [3, 2]
+
+    tab.close()
+    assert repository.listeners == []
+    worker.shutdown()
+
+
+def test_memo_tab_summary_stream_runs_on_worker_and_stops_on_close():
+    """요약 스트림은 Worker에서 탭 작업으로 실행되고, 탭을 닫으면 남은 스트림을 읽지 않고 닫음"""
+    from kivy.uix.button import Button
+    from kivy.uix.label import Label
+
+    release = threading.Event()
+    closed = threading.Event()
+
+    class FakeRepository:
+        def get_all_notes(self):
+            return []
+
+        def add_listener(self, listener):
+            pass
+
+        def remove_listener(self, listener):
+            pass
+
+        def interact_stream(self, note_id, note_type, action):
+            closed.clear()
+            try:
+                yield {"token": "회의"}
+                release.wait(5)
+                yield {"token": " 요약"}
+                yield {"done": True, "result": {"summary": "회의 요약"}}
+            finally:
+                closed.set()
+
+    worker = Worker(max_workers=2)
+    tab = MemoTab(FakeRepository(), worker)
+    label, button = Label(), Button()
+
+    release.set()
+    tab.stream_summary(1, "memo", label, button)
+    assert button.disabled
+    assert _tick_until(lambda: not button.disabled)
+    assert label.text == "회의 요약"
+
+    release.clear()
+    tab.stream_summary(1, "memo", label, button)
+    assert _tick_until(lambda: label.text == "회의")
+    tab.close()
+    release.set()
+    assert closed.wait(5)
+    _tick_until(lambda: False, timeout=0.1)
+    assert label.text == "회의" and not worker.busy(tab)
+    worker.shutdown()
+
+
+def test_write_behind_coalesces_rapid_toggles(tmp_path, note_server):
+    """연속된 체크박스 토글은 로컬에 바로 반영되고 서버에는 PATCH 한 번으로 보내지는지 테스트"""
+    server, notes = note_server
+    updates = []
+    notes.add_listener(lambda event, note, previous: updates.append(event))
+    repository = Repository(
+        PROTOCOL,
+        "127.0.0.1",
+        server.server_port,
+        local_store=str(tmp_path / "local.db"),
+        sync_interval=30,
+        write_delay=0.2,
+    )
+    repository.new_note(type="task", name="할 일", content="내용", done=False)
+
+    def wait_until(condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return condition()
+
+    assert wait_until(lambda: repository.get_all_notes()[0]["id"] > 0)
+    task_id = repository.get_all_notes()[0]["id"]
+    updates.clear()
+
+    for done in (True, False, True, False, True):
+        repository.update_note(task_id, done=done)
+        assert repository.get_note(task_id)["done"] is done
+    assert wait_until(lambda: repository.store.pending() == [])
+    assert updates == ["update"]
+    assert notes.read(task_id)["done"] is True
+    assert notes.read(task_id)["version"] == 2
+    assert repository.get_note(task_id)["version"] == 2
+    assert "PATCH /notes/<id>" in repository.latency_stats()
+    assert "PUT /notes/<id>" not in repository.latency_stats()
+    repository.close()
+
+
+def test_calendar_reuses_cells_and_prefetches_adjacent_months():
+    """달을 넘겨도 날짜 칸 위젯은 그대로이고, 미리 불러온 다음 달 일정이 바로 표시되는지 테스트"""
+    from datetime import date
+
+    class FakeRepository:
+        def __init__(self):
+            self.calls = []
+            self.listeners = []
+
+        def filtered_notes(self, note_type, date_start, date_end):
+            self.calls.append((date_start.year, date_start.month))
+            day = date_start.isoformat()
+            return [{"id": 1, "type": "event", "name": "회의", "date": f"{day}T10:00"}]
+
+        def add_listener(self, listener):
+            self.listeners.append(listener)
+
+        def remove_listener(self, listener):
+            self.listeners.remove(listener)
+
+    assert shift_month(2024, 12, 1) == (2025, 1)
+    assert shift_month(2024, 1, -1) == (2023, 12)
+
+    repository = FakeRepository()
+    worker = Worker(max_workers=1)
+    tab = CalendarTab(repository, worker, cache_size=4)
+    calendar = tab.calendar
+    cells = list(calendar.children)
+
+    def cell(day):
+        return next(cell for cell in calendar.cells if cell.date == day)
+
+    calendar.show_month(2024, 5)
+    loaded = {(2024, 4), (2024, 5), (2024, 6)}
+    assert _tick_until(lambda: loaded <= set(tab.months) and not worker.busy(tab))
+    assert "•" in cell(date(2024, 5, 1)).text
+    assert cell(date(2024, 4, 30)).disabled
+
+    # 다음 달은 이미 캐시에 있으므로 조회를 기다리지 않고 바로 표시
+    calls = len(repository.calls)
+    calendar.move_month(1)
+    assert "•" in cell(date(2024, 6, 1)).text
+    assert _tick_until(lambda: (2024, 7) in tab.months and not worker.busy(tab))
+    assert repository.calls[calls:] == [(2024, 7)]
+    assert calendar.children == cells
+    assert len(tab.months) == 4
+
+    # 바뀐 일정이 있는 달만 다시 조회
+    calls = len(repository.calls)
+    repository.listeners[0](
+        "update", {"id": 1, "type": "event", "date": "2024-06-15T09:00"}, None
+    )
+    assert _tick_until(lambda: len(repository.calls) > calls and not worker.busy(tab))
+    assert repository.calls[calls:] == [(2024, 6)]
+
+    tab.close()
+    assert repository.listeners == []
+    worker.shutdown()
+
+
+def test_note_events_push_changes_without_refetching(tmp_path, note_server):
+    """다른 클라이언트의 변경이 푸시로 로컬 사본에 반영되고, 전체 목록은 다시 받지 않는지 테스트"""
+    server, notes = note_server
+    task_id = notes.create(
+        {"type": "task", "name": "장보기", "content": "", "done": False}
+    )
+    repository = Repository(
+        PROTOCOL,
+        "127.0.0.1",
+        server.server_port,
+        local_store=str(tmp_path / "local.db"),
+        sync_interval=30,
+    )
+    changes = []
+    repository.add_listener(lambda event, note, previous: changes.append(event))
+
+    def wait_until(condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return condition()
+
+    assert wait_until(lambda: repository.pushing)
+    assert repository.get_note(task_id)["name"] == "장보기"
+    full_syncs = len(repository.latencies["GET /notes"])
+
+    # 다른 클라이언트의 쓰기
+    notes.patch(task_id, {"done": True})
+    memo_id = notes.create({"type": "memo", "name": "메모", "content": "푸시"})
+    assert wait_until(lambda: repository.store.get(memo_id) is not None)
+    assert repository.get_note(task_id)["done"] is True
+    assert repository.get_note(task_id)["version"] == 2
+    notes.delete(memo_id)
+    assert wait_until(lambda: repository.store.get(memo_id) is None)
+    assert changes[-3:] == ["update", "create", "delete"]
+
+    # 자기 쓰기가 되돌아온 메시지는 다시 반영하지 않음
+    repository.update_note(task_id, name="장보기 완료")
+    assert repository.sync(pull=False)
+    count = len(changes)
+    time.sleep(0.5)
+    assert len(changes) == count
+    assert repository.get_note(task_id)["name"] == "장보기 완료"
+
+    assert len(repository.latencies["GET /notes"]) == full_syncs
+    assert repository.events_token.endswith(":5")
+    repository.close()
+
+
+def test_note_events_fall_back_to_periodic_sync_when_busy(tmp_path, note_server):
+    """푸시 요청이 503을 받으면 재시도로 막히지 않고 주기적 동기화로 변경을 받는지 테스트"""
+    server, notes = note_server
+    server.feed.max_waiters = 0  # 새 변경을 기다리는 요청은 모두 거절
+    repository = Repository(
+        PROTOCOL,
+        "127.0.0.1",
+        server.server_port,
+        local_store=str(tmp_path / "local.db"),
+        sync_interval=0.3,
+    )
+
+    def wait_until(condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return condition()
+
+    assert wait_until(
+        lambda: len(repository.latencies.get("GET /notes/events", [])) >= 3
+    )
+    # 거절된 요청은 Retry-After(30초)를 기다리며 재시도하지 않음
+    assert max(repository.latencies["GET /notes/events"]) < 1.0
+    assert not repository.pushing
+
+    full_syncs = len(repository.latencies["GET /notes"])
+    memo_id = notes.create({"type": "memo", "name": "메모", "content": "폴링"})
+    assert wait_until(lambda: repository.store.get(memo_id) is not None)
+    assert wait_until(lambda: len(repository.latencies["GET /notes"]) > full_syncs)
+    repository.close()
+
+
+def test_lazy_tab_imports_and_loads_on_first_open(tmp_path):
+    """탭 모듈은 탭을 처음 열 때 불러오고, 데이터 조회도 그때 시작되는지 테스트"""
+    # client 패키지의 비 UI 모듈만 쓸 때는 Kivy 탭 모듈을 불러오지 않음
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, client.local_store; print('client.memo_tab' in sys.modules)",
+        ],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+    )
+    assert output.stdout.strip() == "False"
+
+    repository = Repository(
+        PROTOCOL,
+        "127.0.0.1",
+        1,
+        retries=0,
+        local_store=str(tmp_path / "local.db"),
+        sync_interval=0,
+    )
+    repository.new_note(
+        type="task", name="보고서", content="", tags=["work"], done=False
+    )
+    calls = []
+    filtered_notes = repository.filtered_notes
+    repository.filtered_notes = lambda **kwargs: calls.append(kwargs) or filtered_notes(
+        **kwargs
+    )
+
+    tab = LazyTab("client.todo_tab", "TodoTab", text="할 일")
+    placeholder = tab.content
+    assert tab.tab is None and calls == []
+
+    worker = Worker(max_workers=1)
+    tab.build(repository, worker)
+    tab.build(repository, worker)  # 이미 만든 탭은 다시 만들지 않음
+    assert tab.content is tab.tab and tab.content is not placeholder
+    assert _tick_until(lambda: len(tab.tab.task_list.data) == 2)
+    assert calls == [{"note_type": "task"}]
+
+    tab.close()
+    assert repository.store.listeners == []
+
+    # 생성이 예약된 뒤 닫힌 탭은 만들지 않아 구독이 남지 않음
+    from kivy.clock import Clock
+
+    removed = LazyTab("client.todo_tab", "TodoTab", text="할 일")
+    removed.schedule_build(lambda dt: removed.build(repository, worker))
+    removed.close()
+    Clock.tick()
+    removed.build(repository, worker)
+    assert removed.tab is None and repository.store.listeners == []
+    worker.shutdown()
+    repository.close()
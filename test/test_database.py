@@ -0,0 +1,271 @@
+import argparse
+import json
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from server import bulk
+from server.database import NoteRepository, VersionConflict
+from server.events import NoteEventFeed
+from server.models import Base, MemoModel, TaskModel
+
+
+def test_note_ids_are_global_and_resolve_without_type(note_repository):
+    """모든 타입이 하나의 ID 시퀀스를 공유하고, ID만으로 읽기/수정/삭제"""
+    memo_id = note_repository.create({"type": "memo", "name": "메모", "content": "a"})
+    task_id = note_repository.create({"type": "task", "name": "할 일", "content": "b"})
+    assert memo_id != task_id
+
+    assert note_repository.read(task_id)["type"] == "task"
+    assert note_repository.update(task_id, {"content": "수정"})
+    assert note_repository.read(task_id)["content"] == "수정"
+
+    assert note_repository.delete(memo_id)
+    assert note_repository.read(memo_id) is None
+    assert note_repository.resolve_type(memo_id) is None
+
+    # 삭제된 ID는 다시 쓰지 않음
+    assert (
+        note_repository.create({"type": "memo", "name": "새 메모", "content": "c"})
+        > task_id
+    )
+
+
+def test_existing_notes_are_registered_on_startup(tmp_path):
+    """레지스트리 이전 데이터베이스의 겹치는 ID는 새 ID로 옮겨 등록"""
+    db_url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            MemoModel.__table__.insert(),
+            [{"id": 1, "type": "memo", "name": "m", "content": "memo"}],
+        )
+        connection.execute(
+            TaskModel.__table__.insert(),
+            [{"id": 1, "type": "task", "name": "t", "content": "task"}],
+        )
+    engine.dispose()
+
+    note_repository = NoteRepository(db_url)
+    assert note_repository.read(1)["content"] == "memo"
+    tasks = note_repository.read_all("task")
+    assert tasks[0]["id"] != 1
+    assert note_repository.read(tasks[0]["id"])["content"] == "task"
+
+
+def test_patch_applies_only_changed_fields_with_version_check(note_repository):
+    """PATCH는 보낸 필드만 바꾸고 버전을 올리며, 기준 버전이 다르면 충돌"""
+    task_id = note_repository.create(
+        {"type": "task", "name": "할 일", "content": "내용", "done": False}
+    )
+    assert note_repository.read(task_id)["version"] == 1
+
+    patched = note_repository.patch(task_id, {"done": True}, version=1)
+    assert patched["done"] is True and patched["content"] == "내용"
+    assert patched["version"] == 2
+
+    with pytest.raises(VersionConflict) as conflict:
+        note_repository.patch(task_id, {"done": False}, version=1)
+    assert conflict.value.current["version"] == 2
+    assert note_repository.read(task_id)["done"] is True
+
+    with pytest.raises(ValueError):
+        note_repository.patch(task_id, {"version": 9})
+    assert note_repository.patch(task_id + 100, {"done": False}) is None
+
+    # PUT 수정도 버전을 올림
+    note_repository.update(task_id, {"content": "수정"})
+    assert note_repository.read(task_id)["version"] == 3
+
+
+def test_patch_rejects_null_and_mistyped_values_before_writing(note_repository):
+    """null을 허용하지 않는 필드나 타입이 맞지 않는 값은 저장 전에 ValueError"""
+    task_id = note_repository.create(
+        {"type": "task", "name": "할 일", "content": "내용", "done": False}
+    )
+
+    for changes in (
+        {"name": None},
+        {"done": "yes"},
+        {"content": 3},
+        {"due_date": "내일"},
+        {"tags": "work"},
+    ):
+        with pytest.raises(ValueError):
+            note_repository.patch(task_id, changes)
+
+    task = note_repository.read(task_id)
+    assert task["name"] == "할 일" and task["done"] is False
+    assert task["version"] == 1
+
+    # null을 허용하는 필드는 비울 수 있음
+    patched = note_repository.patch(task_id, {"due_date": "2024-01-02T09:00:00"})
+    assert patched["due_date"].startswith("2024-01-02")
+    assert note_repository.patch(task_id, {"due_date": None})["due_date"] is None
+
+
+def test_version_column_is_added_to_existing_tables(tmp_path):
+    """version 컬럼이 없던 데이터베이스는 시작할 때 컬럼을 추가하고 기존 노트는 버전 1"""
+    db_url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(db_url)
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE memos (id INTEGER PRIMARY KEY, type VARCHAR NOT NULL, "
+                "name VARCHAR NOT NULL, tags JSON, content VARCHAR NOT NULL, "
+                "created DATETIME, updated DATETIME)"
+            )
+        )
+        connection.execute(
+            text(
+                "INSERT INTO memos (id, type, name, content) VALUES (1, 'memo', 'm', 'c')"
+            )
+        )
+    engine.dispose()
+
+    note_repository = NoteRepository(db_url)
+    assert note_repository.read(1)["version"] == 1
+    assert note_repository.patch(1, {"content": "새 내용"}, version=1)["version"] == 2
+
+
+def test_note_event_feed_sends_compact_changes_and_resumes(note_repository):
+    """변경 메시지는 바뀐 필드만 담고, 토큰으로 놓친 메시지만 다시 받는지 테스트"""
+    feed = NoteEventFeed(max_events=3)
+    note_repository.add_listener(feed.on_note_changed)
+    task_id = note_repository.create({"type": "task", "name": "할 일", "content": "a"})
+
+    # 토큰이 없으면 기다리지 않고 현재 위치만 알려 줌
+    start = feed.poll(None, 1.0)
+    assert start == {"token": feed.token(1), "events": [], "reset": False}
+
+    note_repository.patch(task_id, {"done": True}, version=1)
+    result = feed.poll(start["token"], 1.0)
+    assert result["token"] == feed.token(2) and not result["reset"]
+    (message,) = result["events"]
+    assert message["event"] == "update" and message["base_version"] == 1
+    assert set(message["changes"]) == {"done", "version", "updated"}
+
+    note_repository.delete(task_id)
+    messages, reset = feed.since(result["token"])
+    assert not reset
+    assert [message for _, message in messages] == [
+        {"event": "delete", "id": task_id, "type": "task"}
+    ]
+
+    # 보관 범위를 넘겼거나 다른 서버 실행의 토큰이면 전체 목록을 다시 받아야 함
+    for i in range(3):
+        note_repository.create({"type": "memo", "name": f"메모 {i}", "content": ""})
+    assert feed.since(result["token"]) == ([], True)
+    assert feed.since("00000000:1") == ([], True)
+    assert feed.poll("00000000:1", 1.0) == {
+        "token": feed.token(6),
+        "events": [],
+        "reset": True,
+    }
+
+
+def test_note_event_feed_waits_for_changes_and_limits_waiters(note_repository):
+    """새 변경이 없으면 기다렸다가 변경이 오면 바로 돌아오고, 기다리는 요청 수를 제한하는지 테스트"""
+    feed = NoteEventFeed(max_waiters=1)
+    note_repository.add_listener(feed.on_note_changed)
+    token = feed.poll(None, 0)["token"]
+
+    # 변경이 없으면 timeout까지 기다렸다가 같은 토큰으로 빈 목록
+    assert feed.poll(token, 0.05) == {"token": token, "events": [], "reset": False}
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(feed.poll(token, 5.0)))
+    waiter.start()
+    deadline = time.monotonic() + 5.0
+    while feed.waiters == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # 자리가 없으면 기다리지 않고 None (서버는 503)
+    assert feed.poll(token, 5.0) is None
+
+    started = time.monotonic()
+    note_repository.create({"type": "memo", "name": "메모", "content": ""})
+    waiter.join(5.0)
+    assert time.monotonic() - started < 1.0
+    assert [message["event"] for message in results[0]["events"]] == ["create"]
+    assert feed.waiters == 0
+
+
+def test_bulk_export_import_preserves_notes_and_rolls_back_failed_chunk(
+    note_repository, tmp_path
+):
+    """내보낸 노트가 ID/시각/버전 그대로 들어가고, 실패한 묶음만 취소되는지 테스트"""
+    memo_id = note_repository.create({"type": "memo", "name": "메모", "content": "a"})
+    event_id = note_repository.create(
+        {"type": "event", "name": "일정", "content": "", "date": "2024-05-01T09:00:00"}
+    )
+    note_repository.patch(memo_id, {"content": "b"}, version=1)
+    exported = list(note_repository.export_notes(batch_size=1))
+    assert [note["id"] for note in exported] == [memo_id, event_id]
+    assert [note["id"] for note in note_repository.export_notes(after=memo_id)] == [
+        event_id
+    ]
+
+    target = NoteRepository(f"sqlite:///{tmp_path / 'target.db'}")
+    events = []
+    target.add_listener(lambda event, note, previous=None: events.append(event))
+    assert target.import_notes(exported, batch_size=1) == 2
+    assert target.read(memo_id) == note_repository.read(memo_id)
+    assert target.read(event_id) == note_repository.read(event_id)
+    assert events == ["import", "import"]
+
+    # 같은 ID를 다시 가져오면 바꿔 넣고, 새 노트는 가져온 ID 다음부터 발급
+    assert target.import_notes(exported) == 2
+    assert target.read_all("memo") == note_repository.read_all("memo")
+    assert target.create({"type": "task", "name": "할 일", "content": ""}) > event_id
+
+    broken = [{**exported[0], "id": 100}, {**exported[1], "id": 101, "date": None}]
+    with pytest.raises(ValueError):
+        target.import_notes([{**exported[0], "id": 50}] + broken, batch_size=1)
+    assert target.read(50) is not None
+    assert target.read(100) is not None and target.read(101) is None
+    with pytest.raises(ValueError):
+        target.import_notes([{**exported[0], "id": 60, "color": "red"}])
+
+
+def test_bulk_cli_resumes_interrupted_export_and_import(note_repository, tmp_path):
+    """중단된 내보내기/가져오기를 --resume으로 이어서 끝내는지 테스트"""
+    ids = [
+        note_repository.create({"type": "memo", "name": f"메모 {i}", "content": ""})
+        for i in range(5)
+    ]
+    source_url = f"sqlite:///{tmp_path / 'notes.db'}"
+    path = tmp_path / "notes.ndjson"
+
+    def run(command, db, **options):
+        args = argparse.Namespace(
+            command=command,
+            path=str(path),
+            server=None,
+            db=db,
+            type=None,
+            batch_size=2,
+            batches_per_request=1,
+            resume=True,
+            **options,
+        )
+        return getattr(bulk, f"{command}_notes")(args)
+
+    # 세 번째 노트를 쓰다가 중단된 파일
+    lines = [json.dumps(note) + "\n" for note in note_repository.export_notes()]
+    path.write_text("".join(lines[:2]) + lines[2][:10])
+    assert run("export", source_url) == 3
+    assert [json.loads(line)["id"] for line in path.read_text().splitlines()] == ids
+
+    # 첫 묶음(2개)까지 커밋된 뒤 중단된 가져오기
+    target_url = f"sqlite:///{tmp_path / 'target.db'}"
+    target = NoteRepository(target_url)
+    target.import_notes([json.loads(lines[0])])
+    with open(f"{path}.progress", "w") as f:
+        json.dump({"offset": len(lines[0].encode()) + len(lines[1].encode())}, f)
+    assert run("import", target_url) == 3
+    assert target.read(ids[1]) is None
+    assert [note["id"] for note in target.read_all("memo")] == [ids[0]] + ids[2:]
+    assert not (tmp_path / "notes.ndjson.progress").exists()
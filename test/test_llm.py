@@ -0,0 +1,754 @@
+import os
+import pytest
+import threading
+import sys
+import time
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from multiprocessing.connection import Listener
+from unittest.mock import patch
+
+from server.admission import AdmissionController, AdmissionRejected
+from server.batching import BatchScheduler
+from server.chunking import split_into_chunks
+from server.context import ContextPacker
+from server.embedding import EmbeddingIndex, HashingEmbedder, note_text
+from server.jobs import JobQueue
+from server.llm import LLMHandler
+from server.llm_backend import StubModel, resolve_profile
+from server.llm_cache import LLMResultCache
+from server.model_worker import (
+    ModelWorker,
+    default_address,
+    load_authkey,
+    ping,
+    private_dir,
+)
+from server.router import KNNEstimator, TieredRouter
+
+
+@pytest.fixture
+def llm_cache(note_repository):
+    """노트 저장소와 같은 데이터베이스를 사용하는 LLM 결과 캐시"""
+    cache = LLMResultCache(note_repository.engine, max_entries=3)
+    note_repository.add_listener(cache.on_note_changed)
+    return cache
+
+
+@pytest.fixture
+def memo(note_repository):
+    """테스트용 메모"""
+    note_id = note_repository.create(
+        {"type": "memo", "name": "회의록", "content": "프로젝트 상태 업데이트"}
+    )
+    return note_repository.read(note_id, "memo")
+
+
+def test_cache_hit_skips_llm(llm_cache, memo):
+    """같은 노트 내용에 대한 반복 요청은 캐시에서 반환"""
+    handler = LLMHandler(cache=llm_cache)
+
+    with patch.object(handler, "_run", wraps=handler._run) as mock_run:
+        first = handler.process(memo, "summarize")
+        second = handler.process(memo, "summarize")
+
+    assert first == second
+    assert mock_run.call_count == 1
+
+
+def test_cache_key_includes_model_and_params(llm_cache, memo):
+    """모델 식별자나 생성 파라미터가 다르면 다른 캐시 키 사용"""
+    key = LLMResultCache.make_key(memo["content"], "summarize", "a", {"t": 1})
+    assert key != LLMResultCache.make_key(memo["content"], "summarize", "b", {"t": 1})
+    assert key != LLMResultCache.make_key(memo["content"], "summarize", "a", {"t": 2})
+    assert key != LLMResultCache.make_key(
+        memo["content"], "link_suggestion", "a", {"t": 1}
+    )
+
+
+def test_cache_is_not_shared_between_precision_profiles(llm_cache, memo):
+    """int8 등 정밀도가 다른 프로필은 서로의 캐시 결과를 쓰지 않음"""
+    fp32 = LLMHandler(cache=llm_cache, profile="cpu")
+    int8 = LLMHandler(cache=llm_cache, profile="cpu-int8")
+    assert fp32._cache_key(memo, "summarize") != int8._cache_key(memo, "summarize")
+
+    fp32.process(memo, "summarize")
+    with patch.object(int8, "_run", wraps=int8._run) as mock_run:
+        int8.process(memo, "summarize")
+    assert mock_run.call_count == 1
+    assert len(llm_cache) == 2
+
+    # 결과에 영향이 없는 스레드 설정만 다르면 캐시를 공유
+    threads = LLMHandler(cache=llm_cache, profile={"base": "cpu", "num_threads": 2})
+    assert threads._cache_key(memo, "summarize") == fp32._cache_key(memo, "summarize")
+
+
+def test_cache_invalidated_on_content_update(note_repository, llm_cache, memo):
+    """노트 내용이 수정되면 해당 노트의 캐시 항목 제거"""
+    handler = LLMHandler(cache=llm_cache)
+    handler.process(memo, "summarize")
+    assert len(llm_cache) == 1
+
+    # 내용이 같은 수정은 캐시를 유지
+    note_repository.update(memo["id"], {"type": "memo", "name": "새 제목"})
+    assert len(llm_cache) == 1
+
+    note_repository.update(memo["id"], {"type": "memo", "content": "변경된 내용"})
+    assert len(llm_cache) == 0
+
+
+def test_cache_eviction_is_size_bounded(llm_cache):
+    """최대 항목 수를 넘으면 가장 오래 사용되지 않은 항목부터 제거"""
+    for i in range(3):
+        llm_cache.put(f"key-{i}", "summarize", {"summary": str(i)})
+    llm_cache.get("key-0")  # key-0을 최근 사용으로 갱신
+    llm_cache.put("key-3", "summarize", {"summary": "3"})
+
+    assert len(llm_cache) == 3
+    assert llm_cache.get("key-0") == {"summary": "0"}
+    assert llm_cache.get("key-1") is None
+
+
+def test_concurrent_requests_are_batched():
+    """동시에 들어온 요청은 하나의 generate 호출로 묶이고 결과는 각 요청으로 전달"""
+    model = StubModel(batch_delay=0.05)
+    handler = LLMHandler(model=model, max_batch_size=4, max_wait_ms=100)
+    notes = [{"type": "memo", "id": i, "content": f"메모 {i}"} for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda n: handler.process(n, "summarize"), notes))
+    handler.close()
+
+    assert [r["summary"] for r in results] == [n["content"] for n in notes]
+    assert max(model.batch_sizes) > 1
+    assert max(model.batch_sizes) <= 4
+    assert sum(model.batch_sizes) == 8
+
+
+def test_scheduler_groups_by_generation_params():
+    """생성 파라미터가 다른 요청은 별도의 generate 호출로 실행"""
+    model = StubModel()
+    scheduler = BatchScheduler(model, max_batch_size=8, max_wait_ms=50)
+    messages = [{"role": "user", "content": "하나 둘 셋"}]
+
+    short = scheduler.submit(messages, {"max_new_tokens": 1})
+    long = scheduler.submit(messages, {"max_new_tokens": 3})
+
+    assert short.result() == "하나"
+    assert long.result() == "하나 둘 셋"
+    scheduler.close()
+    assert model.batch_sizes == [1, 1]
+    assert len(scheduler.queue_waits) == 2
+    assert all(wait >= 0 for wait in scheduler.queue_waits)
+
+
+@pytest.mark.parametrize("extra", [-1, 1])
+def test_scheduler_fails_all_requests_on_output_count_mismatch(extra):
+    """모델이 요청 수와 다른 수의 결과를 반환하면 모든 요청이 실패로 끝남"""
+
+    class MismatchModel(StubModel):
+        def generate(self, batch, **params):
+            outputs = super().generate(batch, **params)
+            return outputs[:extra] if extra < 0 else outputs + ["extra"] * extra
+
+    scheduler = BatchScheduler(MismatchModel(), max_batch_size=8, max_wait_ms=50)
+    messages = [{"role": "user", "content": "하나"}]
+    futures = [scheduler.submit(messages) for _ in range(2)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=3)
+    scheduler.close()
+
+
+def test_handler_waits_for_generation_with_timeout(memo):
+    """생성 결과가 오지 않으면 요청이 무한히 기다리지 않고 시간 초과로 끝남"""
+    release = threading.Event()
+
+    class HangingModel(StubModel):
+        def generate(self, batch, **params):
+            release.wait(5)
+            return super().generate(batch, **params)
+
+    handler = LLMHandler(model=HangingModel(), request_timeout=0.1)
+    with pytest.raises(TimeoutError):
+        handler.process(memo, "summarize")
+    release.set()
+    handler.close()
+
+
+def test_stream_yields_tokens_then_result(llm_cache, memo):
+    """스트리밍은 토큰 이벤트 뒤에 최종 결과를 반환하고, 결과를 캐시에 저장"""
+    handler = LLMHandler(cache=llm_cache)
+
+    events = list(handler.stream(memo, "summarize"))
+    tokens = [event["token"] for event in events if "token" in event]
+
+    assert "".join(tokens) == memo["content"]
+    assert events[-1] == {"done": True, "result": {"summary": memo["content"]}}
+
+    # 두 번째 요청은 캐시에서 결과만 반환
+    assert list(handler.stream(memo, "summarize")) == [events[-1]]
+
+
+def test_stream_keeps_connection_alive_while_mapping_long_note():
+    """긴 노트는 청크 요약(map)이 끝날 때까지 연결 유지 이벤트를 보낸 뒤 토큰을 스트리밍"""
+    handler = LLMHandler(
+        model=StubModel(batch_delay=0.1),
+        generation_config={"max_new_tokens": 2},
+        chunk_tokens=8,
+        keepalive_interval=0.01,
+    )
+    content = "\n".join(f"문단{i} 첫째 둘째 셋째 넷째 다섯째" for i in range(4))
+    events = list(
+        handler.stream({"type": "memo", "id": 1, "content": content}, "summarize")
+    )
+
+    assert events[0] == {"keepalive": True}
+    first_token = next(i for i, event in enumerate(events) if "token" in event)
+    assert all(event == {"keepalive": True} for event in events[:first_token])
+    assert events[-1] == {"done": True, "result": {"summary": "문단0 첫째"}}
+    handler.close()
+
+
+def test_stream_ends_with_error_when_backend_fails(llm_cache, memo):
+    """생성 도중 백엔드가 실패하면 오류 이벤트와 종료 이벤트로 끝나고 결과는 캐시하지 않음"""
+
+    class FailingModel(StubModel):
+        def stream(self, messages, **params):
+            tokens = super().stream(messages, **params)
+            yield next(tokens)
+            yield next(tokens)
+            raise RuntimeError("backend crashed")
+
+    handler = LLMHandler(model=FailingModel(), cache=llm_cache)
+    events = list(handler.stream(memo, "summarize"))
+
+    assert [event for event in events if "token" in event] == [
+        {"token": "프로젝트"},
+        {"token": " 상태"},
+    ]
+    assert events[-2] == {"error": "Generation failed: backend crashed"}
+    assert events[-1] == {"done": True, "error": "Generation failed: backend crashed"}
+    assert len(llm_cache) == 0
+    handler.close()
+
+
+def wait_for_job(job_queue, job_id, timeout=5.0):
+    """작업이 끝날 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = job_queue.get(job_id)
+        if job["status"] in ("done", "failed", "cancelled"):
+            return job
+        time.sleep(0.01)
+    raise TimeoutError(f"Job {job_id} did not finish")
+
+
+def test_job_queue_eager_summary(note_repository, llm_cache):
+    """노트 생성 시 요약 작업이 등록되고, 완료 후에는 캐시에서 바로 반환"""
+    handler = LLMHandler(cache=llm_cache)
+    job_queue = JobQueue(
+        note_repository.engine,
+        note_repository,
+        handler,
+        eager_actions={"memo": ["summarize"]},
+    )
+    note_repository.add_listener(job_queue.on_note_changed)
+
+    note_id = note_repository.create(
+        {"type": "memo", "name": "회의록", "content": "미리 요약할 내용"}
+    )
+    job = wait_for_job(job_queue, 1)
+    job_queue.close()
+
+    assert job["note_id"] == note_id
+    assert job["status"] == "done"
+    assert job["result"] == {"summary": "미리 요약할 내용"}
+
+    memo = note_repository.read(note_id, "memo")
+    with patch.object(handler, "_run") as mock_run:
+        assert handler.process(memo, "summarize") == job["result"]
+    mock_run.assert_not_called()
+
+
+def test_job_queue_dedup_and_priority(note_repository, memo):
+    """같은 노트의 대기 중인 작업은 하나로 합쳐지고, 우선순위가 높은 작업부터 처리"""
+    handler = LLMHandler()
+    job_queue = JobQueue(note_repository.engine, note_repository, handler)
+    job_queue.close()  # 워커를 멈춘 상태에서 대기열만 확인
+
+    low = job_queue.enqueue("memo", memo["id"], "summarize", priority="low")
+    duplicate = job_queue.enqueue("memo", memo["id"], "summarize", priority="high")
+    other = job_queue.enqueue("memo", memo["id"], "link_suggestion", priority="normal")
+
+    assert duplicate == low
+    assert job_queue.get(low)["priority"] == JobQueue.PRIORITIES["high"]
+    assert job_queue._claim()["id"] == low
+    assert job_queue._claim()["id"] == other
+
+
+def test_job_worker_survives_failure_to_record_result(note_repository, memo):
+    """작업 결과를 기록하지 못해도 워커 스레드는 살아서 다음 작업을 처리"""
+    job_queue = JobQueue(note_repository.engine, note_repository, LLMHandler())
+    finish = job_queue._finish
+    calls = []
+
+    def flaky_finish(job_id, result, error):
+        calls.append(job_id)
+        if len(calls) <= 2:
+            raise RuntimeError("database is locked")
+        finish(job_id, result, error)
+
+    with patch.object(job_queue, "_finish", side_effect=flaky_finish):
+        lost = job_queue.enqueue("memo", memo["id"], "summarize")
+        deadline = time.monotonic() + 5
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        done = job_queue.enqueue("memo", memo["id"], "link_suggestion")
+        job = wait_for_job(job_queue, done)
+    job_queue.close()
+
+    assert calls[:2] == [lost, lost]
+    assert job_queue.get(lost)["status"] == "running"
+    assert job["status"] in ("done", "failed") and calls[-1] == done
+
+
+def test_link_suggestion_uses_embedding_index(tmp_path, note_repository):
+    """link_suggestion은 임베딩 인덱스에서 관련 노트를 찾고, 노트 변경 시 인덱스를 증분 갱신"""
+    index = EmbeddingIndex(str(tmp_path / "embeddings"))
+    note_repository.add_listener(index.on_note_changed)
+    handler = LLMHandler(embedding_index=index, related_count=2)
+
+    base = note_repository.create(
+        {"type": "memo", "name": "프로젝트 회의", "content": "프로젝트 일정 회의록"}
+    )
+    similar = note_repository.create(
+        {"type": "task", "name": "프로젝트 일정 정리", "content": "회의록 정리"}
+    )
+    other = note_repository.create(
+        {"type": "memo", "name": "장보기", "content": "우유 계란 사과"}
+    )
+
+    links = handler.process(note_repository.read(base, "memo"), "link_suggestion")
+    # links는 기존 형식(문자열 목록)을 유지하고, 타입/ID/점수는 related에 담김
+    assert links["links"][0] == f"/notes/task/{similar}"
+    assert links["related"][0]["type"] == "task"
+    assert links["related"][0]["id"] == similar
+
+    note_repository.delete(similar, "task")
+    links = handler.process(note_repository.read(base, "memo"), "link_suggestion")
+    assert links["links"] == [f"/notes/memo/{other}"]
+    assert [(l["type"], l["id"]) for l in links["related"]] == [("memo", other)]
+
+    # 메모리 맵 파일에서 다시 로드해도 같은 인덱스
+    reloaded = EmbeddingIndex(str(tmp_path / "embeddings"))
+    assert len(reloaded) == 2
+    assert reloaded.related("memo", base, k=1)[0][:2] == ("memo", other)
+
+
+def test_embedding_index_ivf_search(tmp_path):
+    """IVF는 일부 클러스터만 검색하고, 모든 클러스터를 확인하면 전체 검색과 같은 결과"""
+    words = ["회의", "일정", "장보기", "운동", "독서", "여행", "project", "report"]
+    items = [
+        ("memo", i, f"{words[i % 8]} {words[(i * 3) % 8]} 노트 {i}") for i in range(400)
+    ]
+
+    exact = EmbeddingIndex(str(tmp_path / "exact"), initial_capacity=16)
+    exact.upsert_many(items)
+    approx = EmbeddingIndex(str(tmp_path / "ivf"), ivf_threshold=100, nprobe=4)
+    approx.upsert_many(items)
+
+    assert exact.centroids is None
+    assert approx.centroids is not None
+    query = approx.embedder.embed(["회의 일정"])[0]
+    assert len(approx._candidates(query)) < len(items)
+
+    # 학습 이후 추가된 노트도 클러스터에 배정됨
+    approx.upsert("memo", 1000, "회의 일정 새 노트")
+    exact.upsert("memo", 1000, "회의 일정 새 노트")
+    assert 1000 in [
+        int(approx.keys[row, 1]) for cluster in approx.lists for row in cluster
+    ]
+
+    approx.nprobe = len(approx.lists)
+    for text in ["회의 일정", "운동 여행", "project report"]:
+        approx_scores = [score for _, _, score in approx.query(text, k=3)]
+        exact_scores = [score for _, _, score in exact.query(text, k=3)]
+        assert approx_scores == pytest.approx(exact_scores)
+
+
+def test_split_into_chunks_respects_budget_and_overlap():
+    """줄 단위로 청크를 채우고 앞 청크의 끝을 이어받으며, 긴 줄은 겹치는 토큰 창으로 자름"""
+    model = StubModel()
+    text = "가 나 다\n라 마\n" + " ".join(str(i) for i in range(10)) + "\n끝"
+
+    chunks = split_into_chunks(text, model, chunk_tokens=5, overlap=2)
+
+    assert chunks[0] == "가 나 다\n라 마"
+    assert chunks[1:] == ["0 1 2 3 4", "3 4 5 6 7", "6 7 8 9", "8 9\n끝"]
+    assert all(model.count_tokens(chunk) <= 5 for chunk in chunks)
+
+    # 여러 문단으로 채운 청크도 앞 청크의 마지막 토큰을 이어받음 (예산 안에서)
+    text = "가 나 다\n라 마 바\n사 아"
+    assert split_into_chunks(text, model, chunk_tokens=5, overlap=2) == [
+        "가 나 다",
+        "나 다\n라 마 바",
+        "마 바\n사 아",
+    ]
+    assert split_into_chunks(text, model, chunk_tokens=5) == [
+        "가 나 다",
+        "라 마 바\n사 아",
+    ]
+
+
+def test_long_note_map_reduce_reuses_chunk_summaries(note_repository, llm_cache):
+    """긴 노트는 청크별로 동시에 요약하고, 한 문단을 수정하면 그 청크와 다음 청크만 다시 요약"""
+    llm_cache.max_entries = 100
+    model = StubModel(batch_delay=0.01)
+    handler = LLMHandler(
+        cache=llm_cache,
+        model=model,
+        generation_config={"max_new_tokens": 2},
+        chunk_tokens=8,
+        max_wait_ms=50,
+    )
+    paragraphs = [f"문단{i} 첫째 둘째 셋째 넷째 다섯째" for i in range(4)]
+    note_id = note_repository.create(
+        {"type": "memo", "name": "긴 메모", "content": "\n".join(paragraphs)}
+    )
+
+    result = handler.process(note_repository.read(note_id, "memo"), "summarize")
+    assert result["summary"] == "문단0 첫째"
+    assert sum(model.batch_sizes) == 5  # 청크 4개 + reduce 1번
+    assert max(model.batch_sizes) > 1
+
+    paragraphs[2] = "문단2 수정된 내용"
+    note_repository.update(note_id, {"type": "memo", "content": "\n".join(paragraphs)})
+    model.batch_sizes.clear()
+
+    handler.process(note_repository.read(note_id, "memo"), "summarize")
+    # 바뀐 청크와 그 끝을 이어받는 다음 청크 + reduce 1번
+    assert sum(model.batch_sizes) == 3
+
+
+def test_prefix_cache_skips_system_prompt_prefill(memo):
+    """시스템 프롬프트 KV 캐시를 재사용하면 노트 내용만 새로 계산"""
+    note = {"type": "memo", "id": 1, "content": memo["content"]}
+    content_tokens = len(memo["content"].split())
+
+    model = StubModel()
+    handler = LLMHandler(model=model)
+    handler.process(note, "summarize")
+    list(handler.stream(note, "link_suggestion"))
+    assert model.prefill_tokens == [content_tokens, content_tokens]
+
+    model = StubModel()
+    handler = LLMHandler(model=model, prefix_cache=False)
+    handler.process(note, "summarize")
+    assert model.prefill_tokens[0] > content_tokens
+
+
+def test_estimate_priority_parses_label():
+    handler = LLMHandler(model=StubModel())
+    note = {"type": "task", "id": 1, "content": "보고서"}
+    with patch.object(handler.model, "_respond", return_value="High"):
+        assert handler.process(note, "estimate_priority") == {"priority": "high"}
+    with patch.object(handler.model, "_respond", return_value="모름"):
+        assert handler.process(note, "estimate_priority") == {"priority": "medium"}
+
+
+def test_model_worker_serves_and_respawns(tmp_path):
+    """모델 워커 프로세스를 공유하고, 워커가 죽으면 상태 확인 후 다시 띄움"""
+    address = (
+        default_address(tmp_path.name)
+        if sys.platform == "win32"
+        else str(tmp_path / "model.sock")
+    )
+    worker = ModelWorker("stub", "stub", address=address, health_interval=0.1)
+    model = worker.start()
+    try:
+        handler = LLMHandler(model=model)
+        note = {"type": "memo", "id": 1, "content": "프로젝트 상태 업데이트"}
+        assert handler.process(note, "summarize") == {
+            "summary": "프로젝트 상태 업데이트"
+        }
+        events = list(handler.stream(note, "summarize"))
+        assert events[-1]["result"] == {"summary": "프로젝트 상태 업데이트"}
+        handler.close()
+
+        # 인증 키 없이는 연결할 수 없고, 키는 사용자 전용 디렉터리에 보관
+        assert worker.authkey and ping(address) is None
+        if sys.platform != "win32":
+            assert os.stat(private_dir()).st_mode & 0o777 == 0o700
+
+        # 이미 실행 중인 워커는 다시 띄우지 않고 같은 키로 공유
+        other = ModelWorker("stub", "stub", address=address)
+        shared = other.start()
+        assert shared.count_tokens("a b c") == 3
+        with patch.object(shared, "_call") as call:
+            assert shared.count_tokens("a b c") == 3
+        call.assert_not_called()
+        other.close()
+
+        pid = worker.status()["pid"]
+        worker.process.kill()
+        deadline = time.monotonic() + 30
+        while worker.restarts == 0 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        assert worker.status()["pid"] != pid
+        assert model.generate([[{"role": "user", "content": "다시 연결"}]]) == [
+            "다시 연결"
+        ]
+    finally:
+        worker.close(stop_worker=True)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix 소켓 사용")
+def test_model_worker_ping_times_out_and_authkey_waits_for_writer(tmp_path):
+    """응답하지 않는 워커는 상태 확인이 멈추지 않고 실패로 처리, 쓰는 중인 키 파일은 다 쓸 때까지 기다림"""
+    address = str(tmp_path / "hung.sock")
+    key = b"secret"
+    listener = Listener(address, family="AF_UNIX", authkey=key)
+    connections = []
+    # 연결 인증까지만 하고 요청에는 응답하지 않는 워커
+    accept = threading.Thread(
+        target=lambda: connections.append(listener.accept()), daemon=True
+    )
+    accept.start()
+    try:
+        start = time.monotonic()
+        assert ping(address, key, timeout=0.2) is None
+        assert time.monotonic() - start < 5
+    finally:
+        accept.join(5)
+        for conn in connections:
+            conn.close()
+        listener.close()
+
+    worker_address = str(tmp_path / f"{tmp_path.name}.sock")
+    path = os.path.join(private_dir(), f"{tmp_path.name}.sock.key")
+    open(path, "wb").close()
+
+    def write_key():
+        with open(path, "wb") as f:
+            f.write(b"written")
+
+    writer = threading.Timer(0.1, write_key)
+    writer.start()
+    try:
+        assert load_authkey(worker_address) == b"written"
+    finally:
+        writer.join()
+        os.remove(path)
+
+
+def test_resolve_inference_profile():
+    assert resolve_profile(None) == {}
+    profile = resolve_profile("cpu-int8")
+    assert profile["quantize"] == "int8" and profile["num_threads"] >= 1
+    assert "mmap" not in profile and resolve_profile("cpu")["mmap"] is True
+
+    custom = resolve_profile({"base": "cpu", "num_threads": 2, "mmap": False})
+    assert custom == {
+        "device": "cpu",
+        "num_threads": 2,
+        "interop_threads": 1,
+        "mmap": False,
+    }
+    with pytest.raises(ValueError):
+        resolve_profile("gpu")
+
+
+def test_router_summarizes_short_notes_without_llm(note_repository):
+    """짧은 노트는 추출 요약으로 처리하고, 긴 노트만 LLM으로 넘김"""
+    model = StubModel()
+    router = TieredRouter(note_repository.engine, summary_max_tokens=20)
+    handler = LLMHandler(model=model, router=router)
+
+    short = {"type": "memo", "id": 1, "content": "엄마에게 전화하기."}
+    assert handler.process(short, "summarize") == {"summary": "엄마에게 전화하기."}
+    assert model.batch_sizes == []
+
+    long = {"type": "memo", "id": 2, "content": " ".join(["회의"] * 30)}
+    handler.process(long, "summarize")
+    assert model.batch_sizes == [1]
+
+    tiers = handler.stats()["tiers"]["summarize"]
+    assert tiers["fast"]["count"] == 1 and tiers["llm"]["count"] == 1
+    assert tiers["fast"]["hit_rate"] == 0.5
+
+
+def test_router_learns_task_duration_from_history(note_repository):
+    """완료된 할 일 기록과 비슷한 할 일은 k-NN으로 소요 시간을 추정"""
+    start = datetime(2024, 12, 1, 9, 0)
+    for i in range(12):
+        note_repository.create(
+            {
+                "type": "task",
+                "name": "엄마에게 전화",
+                "content": "엄마에게 안부 전화하기",
+                "done": True,
+                "created": start + timedelta(days=i),
+                "updated": start + timedelta(days=i, minutes=15),
+            }
+        )
+    model = StubModel()
+    router = TieredRouter(note_repository.engine, min_examples=10)
+    note_repository.add_listener(router.on_note_changed)
+    handler = LLMHandler(model=model, router=router)
+
+    task = {"type": "task", "id": 99, "name": "엄마에게 전화", "content": "안부 전화"}
+    assert handler.process(task, "estimate_duration") == {"duration_minutes": 15}
+    assert model.batch_sizes == []
+
+    # 기록과 무관한 할 일은 신뢰도가 낮아 LLM으로 넘어감
+    other = {"type": "task", "id": 100, "name": "xyz", "content": "qwerty 42"}
+    assert handler.process(other, "estimate_duration") == {"duration_minutes": 42}
+    assert model.batch_sizes == [1]
+
+
+def test_knn_estimator_predicts_while_refitting():
+    """예측 도중 다른 스레드가 다시 학습해도 예측은 짝이 맞는 예제와 목표값을 사용"""
+    large = ([f"할 일 {i}" for i in range(200)], [10 + i for i in range(200)])
+    small = (["회의 준비", "보고서 작성"], [30, 60])
+
+    class RefittingEmbedder(HashingEmbedder):
+        """질의를 임베딩하는 사이에 다른 스레드에서 작은 예제로 다시 학습"""
+
+        def embed(self, texts):
+            if texts == ["할 일 199"]:
+                fitter = threading.Thread(target=estimator.fit, args=small)
+                fitter.start()
+                fitter.join()
+            return super().embed(texts)
+
+    estimator = KNNEstimator(RefittingEmbedder(dim=64), k=5)
+    estimator.fit(*large)
+    duration, confidence = estimator.predict("할 일 199")
+    assert 10 <= duration <= 209 and confidence > 0
+    assert len(estimator) == 2
+
+
+def test_context_packer_ranks_and_respects_budget():
+    """최신/관련 노트부터 예산 안에서 담고, 프롬프트는 시간순으로 정렬"""
+    now = datetime(2024, 12, 8)
+    notes = [
+        {
+            "type": "memo",
+            "id": i,
+            "name": f"메모{i}",
+            "content": " ".join(["내용"] * 10),
+            "created": (now - timedelta(days=10 - i)).isoformat(),
+        }
+        for i in range(10)
+    ]
+    notes[0]["content"] = "프로젝트 마감 " + " ".join(["내용"] * 8)
+    packer = ContextPacker(StubModel(), min_note_tokens=5)
+
+    content, packed = packer.pack(notes, budget_tokens=40, now=now)
+    assert [note["id"] for note in packed] == [7, 8, 9]
+    assert packer.count_tokens(content) <= 40
+
+    content, packed = packer.pack(
+        notes, budget_tokens=40, query="프로젝트 마감", now=now
+    )
+    assert [note["id"] for note in packed] == [0, 8, 9]
+
+
+def test_context_packer_reuses_indexed_note_vectors(tmp_path):
+    """인덱스에 있는 노트는 다시 임베딩하지 않고 질의와 인덱스에 없는 노트만 임베딩"""
+    now = datetime(2024, 12, 8)
+    notes = [
+        {"type": "memo", "id": 1, "name": "장보기", "content": "우유 달걀"},
+        {"type": "memo", "id": 2, "name": "회의", "content": "프로젝트 마감 일정"},
+        {"type": "task", "name": "초안", "content": "프로젝트 보고서"},
+    ]
+    index = EmbeddingIndex(str(tmp_path / "embeddings"))
+    index.sync(notes[:2])
+    packer = ContextPacker(StubModel(), embedding_index=index)
+
+    with patch.object(index.embedder, "embed", wraps=index.embedder.embed) as embed:
+        ranked = packer.rank(notes, query="프로젝트 마감", now=now)
+    assert [note.get("id") for note in ranked][0] == 2
+    assert sorted(call.args[0] for call in embed.call_args_list) == [
+        [note_text(notes[2])],
+        ["프로젝트 마감"],
+    ]
+
+
+def test_process_notes_bounds_prompt_tokens():
+    """노트 수와 관계없이 프롬프트는 컨텍스트 예산을 넘지 않음"""
+    model = StubModel()
+    handler = LLMHandler(
+        model=model,
+        generation_config={"max_new_tokens": 16},
+        context_tokens=200,
+        prefix_cache=False,
+    )
+    notes = [
+        {
+            "type": "task",
+            "id": i,
+            "name": f"할 일 {i}",
+            "content": " ".join(["업무"] * 20),
+            "created": datetime(2024, 12, 1 + i % 7).isoformat(),
+        }
+        for i in range(500)
+    ]
+
+    result = handler.process_notes(notes, "summarize_notes")
+    assert 0 < len(result["notes"]) < 500
+    assert result["omitted"] == 500 - len(result["notes"])
+    assert model.prefill_tokens[0] <= 200 - 16
+    assert "error" in handler.process_notes(notes, "unknown")
+
+
+def test_admission_limits_clients_and_sheds_load():
+    """클라이언트별 한도와 대기열 한도를 넘으면 Retry-After와 함께 거절"""
+    admission = AdmissionController(
+        max_concurrent=1, max_queue={"interactive": 1}, per_client=1
+    )
+    running = admission.acquire("a")
+
+    with pytest.raises(AdmissionRejected):
+        admission.acquire("a")  # 클라이언트 a는 이미 실행 중
+
+    waiting = threading.Thread(target=lambda: admission.release(admission.acquire("b")))
+    waiting.start()
+    while admission.stats()["queued"]["interactive"] == 0:
+        time.sleep(0.01)
+
+    with pytest.raises(AdmissionRejected) as error:
+        admission.acquire("c")  # 대기열이 가득 참
+    assert error.value.retry_after >= 1
+
+    admission.release(running)
+    waiting.join()
+    assert admission.stats()["admitted"]["interactive"] == 2
+    assert admission.stats()["rejected"]["interactive"] == 2
+
+
+def test_admission_runs_interactive_before_background():
+    """슬롯이 나면 대기 중인 interactive 요청이 background보다 먼저 실행"""
+    admission = AdmissionController(max_concurrent=1)
+    running = admission.acquire("a")
+    order = []
+
+    def run(client, priority):
+        with admission.admit(client, priority, wait=priority == "background"):
+            order.append(priority)
+
+    background = threading.Thread(target=run, args=("jobs", "background"))
+    background.start()
+    while admission.stats()["queued"]["background"] == 0:
+        time.sleep(0.01)
+    interactive = threading.Thread(target=run, args=("b", "interactive"))
+    interactive.start()
+    while admission.stats()["queued"]["interactive"] == 0:
+        time.sleep(0.01)
+
+    admission.release(running)
+    background.join()
+    interactive.join()
+    assert order == ["interactive", "background"]